@@ -1,61 +1,178 @@
 import os
-import signal
-import subprocess
-import sys
+import json
 import time
+import atexit
 import threading
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import firebase_admin
 from firebase_admin import credentials, db
 from dataFusionAnalyzer import DataFusionAnalyzer
+from sensorManager import SensorManager, CameraService
+from dashboardCache import DashboardCache
+from fusionScheduler import FusionScheduler
+from collectorSupervisor import CollectorSupervisor
+from leaderElection import LeaderElector
+from batchUploader import BatchUploader
+from metrics import REGISTRY, CONTENT_TYPE, METRICS_DIR, MultiprocessExporter, CAMERA_FPS, CAMERA_FRAMES, FUSION_SECONDS_SINCE_RECOMPUTE
 
 app = Flask(__name__)
 
-running_processes = {
-    "webcam": None,
-    "opendata": None
-}
-
 if not firebase_admin._apps:
     cred = credentials.Certificate('firebase_config.json')
     firebase_admin.initialize_app(cred, {
-        'databaseURL': 'https://cs7ns4-assignment3-pylak-default-rtdb.europe-west1.firebasedatabase.app/'
+        'databaseURL': 'https://cs7ns4-assignment3-pylak-default-rtdb.europe-west1.firebasedatabase.app/',
+        'httpTimeout': 10
     })
 
 analyzer = DataFusionAnalyzer('firebase_config.json')
+dashboard_cache = DashboardCache(shared_path=os.path.join('data', 'dashboard.json'))
+
+login_writer = BatchUploader(
+    db.reference('app_analytics/logins'),
+    max_batch=200,
+    flush_interval=1.0,
+    spill_path=os.path.join('data', 'login_spill.jsonl'),
+    partition_by_date=False
+)
+
+def publish_dashboard(analysis, recommendation):
+    payload = {
+        'last_updated': datetime.now().strftime('%H:%M:%S'),
+        'score': recommendation['score'],
+        'text': "GO OUTSIDE" if recommendation['should_go_outside'] else "STAY INSIDE",
+        'reason': recommendation['reason'],
+        'metrics': recommendation['details'],
+        'analysis': analysis
+    }
+    dashboard_cache.update(payload)
+    if dashboard_cache.needs_remote_write(payload):
+        db.reference('live_dashboard').set(payload)
+        dashboard_cache.mark_remote_written(payload)
+
+def recompute_dashboard(dirty_hours):
+    scored, analysis, recommendation = analyzer.refresh_hours(dirty_hours, hours_back=24)
+    if recommendation:
+        publish_dashboard(analysis, recommendation)
+
+fusion_scheduler = FusionScheduler(recompute_dashboard, sources=analyzer.sources)
+camera_service = CameraService(lambda: SensorManager(
+    'firebase_config.json',
+    on_point=lambda point: fusion_scheduler.notify('motion', point.get('unix_time'))
+))
+
+def lead_fusion():
+    fusion_scheduler.start()
+    camera_service.start()
+
+def step_down_fusion():
+    camera_service.stop()
+    fusion_scheduler.stop()
+
+fusion_elector = LeaderElector('fusion', on_elected=lead_fusion, on_stepped_down=step_down_fusion)
+
+collector_supervisor = CollectorSupervisor()
+
+STREAM_LIFETIME = int(os.environ.get('DASHBOARD_STREAM_LIFETIME', 300))
+stream_slots = threading.BoundedSemaphore(int(os.environ.get('DASHBOARD_MAX_STREAMS', 8)))
+
+def refresh_gauges():
+    CAMERA_FPS.clear()
+    CAMERA_FRAMES.clear()
+    for device_id, health in camera_service.get_health().items():
+        if device_id.startswith('_'):
+            continue
+        CAMERA_FPS.set(health.get('fps', 0), device_id=device_id)
+        CAMERA_FRAMES.set(health.get('frames', 0), device_id=device_id)
+    
+    if fusion_elector.is_leader:
+        age = fusion_scheduler.get_stats()['seconds_since_recompute']
+        if age is not None:
+            FUSION_SECONDS_SINCE_RECOMPUTE.set(age)
+
+metrics_exporter = MultiprocessExporter(REGISTRY, METRICS_DIR, before_dump=refresh_gauges)
 
-def background_fusion_loop():
-    while True:
-        try:
-            scored, analysis, recommendation = analyzer.run_complete_analysis(hours_back=24)
-            if recommendation:
-                ref = db.reference('live_dashboard')
-                ref.set({
-                    'last_updated': datetime.now().strftime('%H:%M:%S'),
-                    'score': recommendation['score'],
-                    'text': "GO OUTSIDE" if recommendation['should_go_outside'] else "STAY INSIDE",
-                    'reason': recommendation['reason'],
-                    'metrics': recommendation['details'],
-                    'analysis': analysis
-                })
-            time.sleep(30)
-        except Exception as e:
-            print(f"Fusion Error: {e}")
-            time.sleep(10)
-
-threading.Thread(target=background_fusion_loop, daemon=True).start()
+background_started = False
+background_lock = threading.Lock()
+
+def start_background_services():
+    global background_started
+    with background_lock:
+        if background_started:
+            return
+        background_started = True
+    
+    login_writer.start()
+    fusion_elector.start()
+    collector_supervisor.start()
+    metrics_exporter.start()
+    atexit.register(stop_background_services)
+
+def stop_background_services():
+    global background_started
+    with background_lock:
+        if not background_started:
+            return
+        background_started = False
+    
+    collector_supervisor.shutdown()
+    fusion_elector.stop()
+    login_writer.stop()
+    metrics_exporter.stop()
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/api/dashboard', methods=['GET'])
+def dashboard():
+    payload, etag, _ = dashboard_cache.get()
+    if payload is None:
+        return jsonify({"status": "pending"}), 503
+    
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/dashboard/stream', methods=['GET'])
+def dashboard_stream():
+    if not stream_slots.acquire(blocking=False):
+        response = jsonify({"status": "error", "message": "Too many dashboard streams, poll /api/dashboard"})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    def events():
+        deadline = time.time() + STREAM_LIFETIME
+        yield "retry: 3000\n\n"
+        
+        payload, etag, score_version = dashboard_cache.get()
+        if payload is not None:
+            yield f"id: {etag}\nevent: dashboard\ndata: {json.dumps(payload, default=str)}\n\n"
+        
+        while time.time() < deadline:
+            timeout = min(15, max(0.1, deadline - time.time()))
+            payload, etag, version = dashboard_cache.wait_for_score_change(score_version, timeout=timeout)
+            if version == score_version:
+                yield ": keepalive\n\n"
+                continue
+            score_version = version
+            yield f"id: {etag}\nevent: dashboard\ndata: {json.dumps(payload, default=str)}\n\n"
+    
+    response = Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(stream_slots.release)
+    return response
+
 @app.route('/api/login', methods=['POST'])
 def login():
     data = request.json
     email = data.get('email')
     if email:
-        db.reference('app_analytics/logins').push({
+        login_writer.submit({
             'email': email,
             'timestamp': datetime.now().isoformat(),
             'ip': request.remote_addr
@@ -69,30 +186,36 @@ def control_sensor():
     sensor_type = data.get('type')
     action = data.get('action')
     
-    global running_processes
+    if sensor_type == 'camera':
+        if action not in ('start', 'stop', 'status'):
+            return jsonify({"status": "error", "message": "Unknown action"}), 400
+        
+        result = camera_service.control(action, data.get('device_id', 'webcam_001'), data.get('source', 0))
+        if result.get('status') == 'rejected':
+            return jsonify(result), 400
+        return jsonify(result), 500 if result.get('status') == 'error' else 200
     
-    script_map = {
-        'webcam': 'webcamSensorFirebase.py',
-        'opendata': 'openDataCollector.py'
-    }
+    if sensor_type not in collector_supervisor.collectors:
+        return jsonify({"status": "error", "message": "Unknown sensor type"}), 400
+    if action not in ('start', 'stop', 'restart', 'status'):
+        return jsonify({"status": "error", "message": "Unknown action"}), 400
+    
+    result = collector_supervisor.control(sensor_type, action)
+    return jsonify(result), 500 if result.get('status') == 'error' else 200
+
+@app.route('/api/collectors', methods=['GET'])
+def collector_status():
+    return jsonify(collector_supervisor.get_status())
+
+@app.route('/api/cameras', methods=['GET'])
+def camera_status():
+    return jsonify(camera_service.get_health())
 
-    if action == 'start':
-        if running_processes[sensor_type] is None:
-            cmd = [sys.executable, script_map[sensor_type]]
-            proc = subprocess.Popen(cmd)
-            running_processes[sensor_type] = proc
-            return jsonify({"status": "started", "pid": proc.pid})
-        else:
-            return jsonify({"status": "already_running"})
-
-    elif action == 'stop':
-        proc = running_processes[sensor_type]
-        if proc:
-            proc.terminate()
-            running_processes[sensor_type] = None
-            return jsonify({"status": "stopped"})
-        else:
-            return jsonify({"status": "not_running"})
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(metrics_exporter.render(), content_type=CONTENT_TYPE)
 
 if __name__ == '__main__':
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
     app.run(debug=True, port=5000)
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import queue
+import random
+import threading
+from contextlib import contextmanager
+from firebaseAccess import partition_key
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+PUSH_CHARS = '-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz'
+
+
+class PushIdGenerator:
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_push_time = 0
+        self.last_rand_chars = [0] * 12
+    
+    def next_id(self):
+        with self.lock:
+            now = int(time.time() * 1000)
+            duplicate_time = now == self.last_push_time
+            self.last_push_time = now
+            
+            time_chars = []
+            for _ in range(8):
+                time_chars.append(PUSH_CHARS[now % 64])
+                now //= 64
+            push_id = ''.join(reversed(time_chars))
+            
+            if not duplicate_time:
+                self.last_rand_chars = [random.randrange(64) for _ in range(12)]
+            else:
+                i = 11
+                while i >= 0 and self.last_rand_chars[i] == 63:
+                    self.last_rand_chars[i] = 0
+                    i -= 1
+                if i >= 0:
+                    self.last_rand_chars[i] += 1
+            
+            return push_id + ''.join(PUSH_CHARS[c] for c in self.last_rand_chars)
+
+
+class BatchUploader:
+    
+    def __init__(self, ref, max_batch=50, flush_interval=2.0, max_queue=5000,
+                 spill_path=os.path.join('data', 'upload_spill.jsonl'), max_backoff=60, partition_by_date=True):
+        self.ref = ref
+        self.partition_by_date = partition_by_date
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.max_backoff = max_backoff
+        
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.push_ids = PushIdGenerator()
+        self.stop_event = threading.Event()
+        self.spill_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.thread = None
+        
+        self.backoff = 0
+        self.retry_at = 0
+        
+        self.stats = {
+            'submitted': 0,
+            'uploaded': 0,
+            'dropped': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'failed_batches': 0,
+            'last_batch_size': 0,
+            'last_batch_latency_ms': 0.0,
+            'last_error': None
+        }
+    
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='batch-uploader', daemon=True)
+        self.thread.start()
+    
+    def _count(self, name, amount=1):
+        with self.stats_lock:
+            self.stats[name] += amount
+    
+    def _record(self, **values):
+        with self.stats_lock:
+            self.stats.update(values)
+    
+    def submit(self, data_point):
+        try:
+            self.queue.put_nowait(data_point)
+            self._count('submitted')
+            return True
+        except queue.Full:
+            self._count('dropped')
+            return False
+    
+    def get_stats(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats['queue_depth'] = self.queue.qsize()
+        stats['backoff_seconds'] = self.backoff
+        stats['spill_pending'] = os.path.exists(self.spill_path)
+        return stats
+    
+    def stop(self, timeout=10):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+    
+    def _date_key(self, data_point):
+        if 'unix_time' in data_point:
+            return partition_key(data_point['unix_time'])
+        return data_point['timestamp'][:10]
+    
+    def _key(self, data_point):
+        if self.partition_by_date:
+            return f"{self._date_key(data_point)}/{self.push_ids.next_id()}"
+        return self.push_ids.next_id()
+    
+    def _collect_batch(self):
+        batch = []
+        deadline = time.time() + self.flush_interval
+        
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _write(self, entries):
+        start = time.time()
+        self.ref.update(dict(entries))
+        self._record(last_batch_latency_ms=round((time.time() - start) * 1000, 1), last_batch_size=len(entries))
+    
+    def _flush(self, batch):
+        entries = [(self._key(point), point) for point in batch]
+        if time.time() < self.retry_at:
+            self._spill(entries)
+            return False
+        
+        try:
+            self._write(entries)
+            self._count('uploaded', len(entries))
+            self.backoff = 0
+            self.retry_at = 0
+            return True
+        
+        except Exception as e:
+            print(f"Batch upload failed ({len(entries)} points): {e}")
+            self._count('failed_batches')
+            self._record(last_error=str(e))
+            self.backoff = min(self.max_backoff, self.backoff * 2 if self.backoff else 1)
+            self.retry_at = time.time() + self.backoff
+            self._spill(entries)
+            return False
+    
+    @contextmanager
+    def _locked_spill(self):
+        with self.spill_lock:
+            spill_dir = os.path.dirname(self.spill_path)
+            if spill_dir and not os.path.exists(spill_dir):
+                os.makedirs(spill_dir, exist_ok=True)
+            
+            with open(f"{self.spill_path}.lock", 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _append_spill(self, entries):
+        with self._locked_spill():
+            with open(self.spill_path, 'a') as f:
+                for key, point in entries:
+                    f.write(json.dumps({'key': key, 'point': point}) + '\n')
+    
+    def _spill(self, entries):
+        self._append_spill(entries)
+        self._count('spilled', len(entries))
+    
+    def _spilled_entry(self, line):
+        entry = json.loads(line)
+        if set(entry) == {'key', 'point'}:
+            return entry['key'], entry['point']
+        return self._key(entry), entry
+    
+    def _replay_spill(self):
+        if time.time() < self.retry_at or not os.path.exists(self.spill_path):
+            return
+        
+        claimed = f"{self.spill_path}.{os.getpid()}.replay"
+        with self._locked_spill():
+            if not os.path.exists(self.spill_path):
+                return
+            os.replace(self.spill_path, claimed)
+        
+        with open(claimed) as f:
+            pending = [self._spilled_entry(line) for line in f if line.strip()]
+        os.remove(claimed)
+        
+        for i in range(0, len(pending), self.max_batch):
+            batch = pending[i:i + self.max_batch]
+            try:
+                self._write(batch)
+                self._count('replayed', len(batch))
+            except Exception as e:
+                print(f"Spill replay failed, {len(pending) - i} points kept on disk: {e}")
+                self._record(last_error=str(e))
+                self.backoff = min(self.max_backoff, self.backoff * 2 if self.backoff else 1)
+                self.retry_at = time.time() + self.backoff
+                self._append_spill(pending[i:])
+                return
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            batch = self._collect_batch()
+            if batch:
+                if self._flush(batch):
+                    self._replay_spill()
+            else:
+                self._replay_spill()
+        
+        remaining = []
+        while True:
+            try:
+                remaining.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        for i in range(0, len(remaining), self.max_batch):
+            self._flush(remaining[i:i + self.max_batch])
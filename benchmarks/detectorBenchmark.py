@@ -0,0 +1,108 @@
+import sys
+import json
+import time
+import argparse
+import cv2
+import numpy as np
+from motionDetectors import DETECTORS, create_detector
+from webcamSensorFirebase import MotionSensorFirebase
+
+
+def load_frames(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video: {path}")
+    
+    frames = []
+    while max_frames is None or len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    
+    cap.release()
+    return frames
+
+
+def run_engine(name, frames, process_width=None):
+    sensor = MotionSensorFirebase(
+        None,
+        headless=True,
+        process_width=process_width,
+        detector=create_detector(name)
+    )
+    
+    results = np.zeros((len(frames), 2), dtype=float)
+    
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        motion_detected, _, motion_area, _, _ = sensor.process_frame(frame)
+        results[i] = (motion_detected, motion_area)
+    elapsed = time.perf_counter() - start
+    
+    return results, elapsed
+
+
+def benchmark_video(path, engines, reference='frame_diff', process_width=None, max_frames=1000):
+    frames = load_frames(path, max_frames)
+    if not frames:
+        return {'video': path, 'frames': 0, 'engines': {}}
+    
+    runs = {name: run_engine(name, frames, process_width) for name in engines}
+    reference_run = runs[reference][0] if reference in runs else None
+    
+    report = {
+        'video': path,
+        'frames': len(frames),
+        'resolution': f"{frames[0].shape[1]}x{frames[0].shape[0]}",
+        'process_width': process_width,
+        'reference': reference,
+        'engines': {}
+    }
+    
+    for name, (results, elapsed) in runs.items():
+        detected = results[:, 0] > 0
+        entry = {
+            'fps': round(len(frames) / elapsed, 1) if elapsed > 0 else None,
+            'ms_per_frame': round(elapsed / len(frames) * 1000, 3),
+            'motion_rate': round(float(detected.mean()), 3),
+            'mean_motion_area': round(float(results[:, 1].mean()), 1)
+        }
+        
+        if reference_run is not None:
+            reference_detected = reference_run[:, 0] > 0
+            union = np.count_nonzero(detected | reference_detected)
+            entry['agreement'] = round(float((detected == reference_detected).mean()), 3)
+            entry['motion_jaccard'] = round(np.count_nonzero(detected & reference_detected) / union, 3) if union else 1.0
+        
+        report['engines'][name] = entry
+    
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded video through each motion detection engine')
+    parser.add_argument('videos', nargs='+')
+    parser.add_argument('--engines', default=','.join(DETECTORS))
+    parser.add_argument('--reference', default='frame_diff')
+    parser.add_argument('--process-width', type=int, default=None)
+    parser.add_argument('--max-frames', type=int, default=1000)
+    parser.add_argument('--output', default=None, help='write JSON report to this file instead of stdout')
+    args = parser.parse_args()
+    
+    engines = [name.strip() for name in args.engines.split(',') if name.strip()]
+    reports = [
+        benchmark_video(path, engines, args.reference, args.process_width, args.max_frames)
+        for path in args.videos
+    ]
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+    else:
+        json.dump(reports, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+import copy
+import time
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+import firebase_admin
+from firebase_admin import db
+from batchUploader import PushIdGenerator
+
+
+class FakeDatabase:
+    
+    def __init__(self, data=None, latency=0.0):
+        self.data = data if data is not None else {}
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.push_ids = PushIdGenerator()
+        self.stats = {'reads': 0, 'queries': 0, 'writes': 0}
+    
+    def reference(self, path='/'):
+        return FakeReference(self, path)
+    
+    def _split(self, path):
+        return [part for part in path.strip('/').split('/') if part]
+    
+    def _wait(self, kind):
+        with self.lock:
+            self.stats[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+    
+    def read(self, path):
+        node = self.data
+        for part in self._split(path):
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+    
+    def write(self, path, value):
+        parts = self._split(path)
+        with self.lock:
+            if not parts:
+                self.data = value if isinstance(value, dict) else {}
+                return
+            
+            node = self.data
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            
+            if value is None:
+                node.pop(parts[-1], None)
+            else:
+                node[parts[-1]] = copy.deepcopy(value)
+
+
+class FakeQuery:
+    
+    def __init__(self, reference, order_key):
+        self.reference = reference
+        self.order_key = order_key
+        self.start = None
+        self.end = None
+        self.first = None
+        self.last = None
+    
+    def start_at(self, value):
+        self.start = value
+        return self
+    
+    def end_at(self, value):
+        self.end = value
+        return self
+    
+    def limit_to_first(self, count):
+        self.first = count
+        return self
+    
+    def limit_to_last(self, count):
+        self.last = count
+        return self
+    
+    def get(self):
+        self.reference.database._wait('queries')
+        node = self.reference.database.read(self.reference.path)
+        if not isinstance(node, dict):
+            return OrderedDict()
+        
+        items = []
+        for key, value in node.items():
+            sort_value = value.get(self.order_key) if isinstance(value, dict) else None
+            if sort_value is None:
+                continue
+            if self.start is not None and sort_value < self.start:
+                continue
+            if self.end is not None and sort_value > self.end:
+                continue
+            items.append((sort_value, key, value))
+        
+        items.sort(key=lambda item: (item[0], item[1]))
+        if self.first is not None:
+            items = items[:self.first]
+        if self.last is not None:
+            items = items[-self.last:]
+        
+        return OrderedDict((key, value) for _, key, value in items)
+
+
+class FakeListener:
+    
+    def close(self):
+        pass
+
+
+class FakeReference:
+    
+    def __init__(self, database, path):
+        self.database = database
+        self.path = '/' + '/'.join(database._split(path))
+        self.key = self.path.rsplit('/', 1)[-1] or None
+    
+    def child(self, path):
+        return FakeReference(self.database, f"{self.path}/{path}")
+    
+    def get(self):
+        self.database._wait('reads')
+        return self.database.read(self.path)
+    
+    def order_by_child(self, key):
+        return FakeQuery(self, key)
+    
+    def set(self, value):
+        self.database._wait('writes')
+        self.database.write(self.path, value)
+    
+    def update(self, values):
+        self.database._wait('writes')
+        for path, value in values.items():
+            self.database.write(f"{self.path}/{path}", value)
+    
+    def push(self, value=''):
+        child = self.child(self.database.push_ids.next_id())
+        if value != '':
+            child.set(value)
+        return child
+    
+    def delete(self):
+        self.set(None)
+    
+    def listen(self, callback):
+        return FakeListener()
+
+
+@contextmanager
+def patched(database):
+    original_reference = db.reference
+    original_get_app = firebase_admin.get_app
+    
+    db.reference = lambda path='/', app=None, url=None: database.reference(path)
+    firebase_admin.get_app = lambda name='[DEFAULT]': None
+    
+    try:
+        yield database
+    finally:
+        db.reference = original_reference
+        firebase_admin.get_app = original_get_app
@@ -0,0 +1,80 @@
+import sys
+import json
+import time
+import argparse
+from dataFusionAnalyzer import DataFusionAnalyzer
+from benchmarks.syntheticData import synthetic_window
+
+
+def timed(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def benchmark_window(analyzer, days, granularities, motion_step=10, repeat=3):
+    raw_data = synthetic_window(days * 24, motion_step)
+    
+    report = {
+        'days': days,
+        'records': {source: len(records) for source, records in raw_data.items()},
+        'engines': {}
+    }
+    
+    legacy, elapsed = timed(lambda: analyzer.merge_sources(raw_data).ffill().bfill(), repeat)
+    report['engines']['hourly_merge_ffill_bfill'] = {
+        'ms': round(elapsed * 1000, 1),
+        'rows': len(legacy)
+    }
+    
+    for granularity in granularities:
+        fused, elapsed = timed(lambda: analyzer.fuse_asof(raw_data, granularity), repeat)
+        entry = {
+            'ms': round(elapsed * 1000, 1),
+            'rows': len(fused),
+            'missing_temperature': int(fused['temperature'].isna().sum())
+        }
+        
+        if granularity in ('1h', '60min', 'H'):
+            common = legacy.merge(fused, on='hour', suffixes=('_legacy', ''))
+            entry['temperature_mean_abs_diff'] = round(
+                float((common['temperature_legacy'] - common['temperature']).abs().mean()), 4
+            )
+        
+        report['engines'][f'asof_{granularity}'] = entry
+    
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare as-of fusion with the hourly merge chain on synthetic windows')
+    parser.add_argument('--days', default='1,7,30')
+    parser.add_argument('--granularities', default='1min,5min,15min,1h')
+    parser.add_argument('--motion-step', type=int, default=10, help='seconds between synthetic motion readings')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='write JSON report to this file instead of stdout')
+    args = parser.parse_args()
+    
+    analyzer = DataFusionAnalyzer(None)
+    granularities = [value.strip() for value in args.granularities.split(',') if value.strip()]
+    
+    reports = [
+        benchmark_window(analyzer, float(days), granularities, args.motion_step, args.repeat)
+        for days in args.days.split(',')
+    ]
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+    else:
+        json.dump(reports, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import sys
+import json
+import time
+import argparse
+import threading
+import numpy as np
+import requests
+from benchmarks.pipelineBenchmark import environment
+
+
+ROUTES = {
+    'login': ('POST', '/api/login'),
+    'dashboard': ('GET', '/api/dashboard'),
+    'dashboard_etag': ('GET', '/api/dashboard'),
+    'collectors': ('GET', '/api/collectors'),
+    'index': ('GET', '/')
+}
+
+
+def worker(base_url, route, deadline, samples, statuses, lock, worker_id):
+    method, path = ROUTES[route]
+    session = requests.Session()
+    etag = None
+    count = 0
+    
+    while time.perf_counter() < deadline:
+        kwargs = {'timeout': 10}
+        if route == 'login':
+            kwargs['json'] = {'email': f'load-{worker_id}-{count}@example.com'}
+        elif route == 'dashboard_etag' and etag:
+            kwargs['headers'] = {'If-None-Match': etag}
+        
+        start = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, **kwargs)
+            status = response.status_code
+            if route == 'dashboard_etag' and response.headers.get('ETag'):
+                etag = response.headers['ETag']
+        except requests.RequestException:
+            status = 'error'
+        elapsed = time.perf_counter() - start
+        
+        with lock:
+            samples.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+        count += 1
+    
+    session.close()
+
+
+def run_route(base_url, route, duration, concurrency):
+    samples = []
+    statuses = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    
+    threads = [
+        threading.Thread(target=worker, args=(base_url, route, deadline, samples, statuses, lock, i), daemon=True)
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    
+    latencies = np.array(samples) * 1000
+    report = {
+        'route': route,
+        'method': ROUTES[route][0],
+        'path': ROUTES[route][1],
+        'requests': len(samples),
+        'requests_per_second': round(len(samples) / wall, 1) if wall else 0.0,
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)}
+    }
+    if len(latencies):
+        report['latency_ms'] = {
+            'p50': round(float(np.percentile(latencies, 50)), 2),
+            'p95': round(float(np.percentile(latencies, 95)), 2),
+            'p99': round(float(np.percentile(latencies, 99)), 2),
+            'max': round(float(latencies.max()), 2)
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure requests/sec and latency percentiles of the dashboard API')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--routes', default='login,dashboard,dashboard_etag,collectors', help=f"comma separated, from {', '.join(ROUTES)}")
+    parser.add_argument('--duration', type=float, default=15, help='seconds per route')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--output', default=None, help='write JSON report to this file instead of stdout')
+    args = parser.parse_args()
+    
+    routes = [route.strip() for route in args.routes.split(',') if route.strip()]
+    unknown = [route for route in routes if route not in ROUTES]
+    if unknown:
+        parser.error(f"Unknown routes: {', '.join(unknown)}")
+    
+    results = {
+        'environment': environment(),
+        'target': args.url,
+        'concurrency': args.concurrency,
+        'duration_seconds': args.duration,
+        'results': [run_route(args.url.rstrip('/'), route, args.duration, args.concurrency) for route in routes]
+    }
+    
+    for result in results['results']:
+        latency = result.get('latency_ms', {})
+        print(f"{result['route']:>15}: {result['requests_per_second']:>8} req/s  "
+              f"p50 {latency.get('p50')} ms  p99 {latency.get('p99')} ms  {result['statuses']}", file=sys.stderr)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
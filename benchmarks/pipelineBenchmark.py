@@ -0,0 +1,136 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from benchmarks.fakeFirebase import FakeDatabase, patched
+from benchmarks.syntheticData import synthetic_window, forecast_records, firebase_tree
+
+
+SIZES = {
+    '1h': 1,
+    '6h': 6,
+    '1d': 24,
+    '7d': 24 * 7,
+    '30d': 24 * 30,
+    '90d': 24 * 90
+}
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, {
+        'best_ms': round(min(samples) * 1000, 3),
+        'median_ms': round(float(np.median(samples)) * 1000, 3)
+    }
+
+
+def benchmark_size(label, hours, motion_step=10, repeat=3, latency=0.0):
+    from dataFusionAnalyzer import DataFusionAnalyzer
+    from predictiveForecaster import OutdoorForecastPredictor
+    
+    end = datetime.now()
+    raw_data = synthetic_window(hours, motion_step, end=end)
+    database = FakeDatabase(firebase_tree(raw_data), latency=latency)
+    
+    report = {
+        'size': label,
+        'hours': hours,
+        'records': {source: len(records) for source, records in raw_data.items()},
+        'stages': {}
+    }
+    
+    with patched(database):
+        analyzer = DataFusionAnalyzer('firebase_config.json')
+        predictor = OutdoorForecastPredictor(None)
+        
+        fetched, report['stages']['fetch_recent_data'] = timed(lambda: analyzer.fetch_recent_data(hours), repeat)
+        fused, report['stages']['fuse_data_sources'] = timed(lambda: analyzer.fuse_data_sources(fetched), repeat)
+        scored, report['stages']['calculate_outdoor_score'] = timed(lambda: analyzer.calculate_outdoor_score(fused), repeat)
+        _, report['stages']['analyze_patterns'] = timed(lambda: analyzer.analyze_patterns(scored), repeat)
+        
+        forecast = forecast_records(max(hours, 3), step_hours=1, start=end)
+        predictions, report['stages']['predict_outdoor_scores'] = timed(
+            lambda: predictor.predict_outdoor_scores(forecast, 2), repeat
+        )
+        windows, report['stages']['identify_optimal_windows'] = timed(
+            lambda: predictor.identify_optimal_windows(predictions, min_score=70, min_duration_hours=3), repeat
+        )
+        _, report['stages']['identify_windows_by_threshold'] = timed(
+            lambda: predictor.identify_windows_by_threshold(predictions, range(50, 95, 5), min_duration_hours=3), repeat
+        )
+        
+        analyzer.fetch_pool.shutdown(wait=False)
+        predictor.analyzer.fetch_pool.shutdown(wait=False)
+    
+    report['rows'] = {
+        'fetched': {source: len(records) for source, records in fetched.items()},
+        'fused': len(fused),
+        'predictions': len(predictions),
+        'windows': len(windows)
+    }
+    report['firebase_calls'] = dict(database.stats)
+    
+    return report
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'time': datetime.now().isoformat()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the fusion, scoring and forecasting pipeline on synthetic data')
+    parser.add_argument('--sizes', default=','.join(SIZES), help=f"comma separated, from {', '.join(SIZES)}")
+    parser.add_argument('--motion-step', type=int, default=10, help='seconds between synthetic motion readings')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated seconds per Firebase call')
+    parser.add_argument('--output', default=None, help='write JSON report to this file instead of stdout')
+    args = parser.parse_args()
+    
+    labels = [label.strip() for label in args.sizes.split(',') if label.strip()]
+    unknown = [label for label in labels if label not in SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+    
+    results = {
+        'environment': environment(),
+        'results': [
+            benchmark_size(label, SIZES[label], args.motion_step, args.repeat, args.latency)
+            for label in labels
+        ]
+    }
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import numpy as np
+from datetime import datetime, timedelta
+from batchUploader import PushIdGenerator
+from firebaseAccess import SOURCE_PATHS, partition_key
+
+
+CONDITIONS = np.array(['Clear', 'Clouds', 'Rain', 'Drizzle', 'Mist'])
+
+
+def _records(start, end, step_seconds, fields):
+    times = np.arange(int(start.timestamp()), int(end.timestamp()), step_seconds)
+    columns = {key: make(len(times)) for key, make in fields.items()}
+    
+    records = []
+    for i, unix_time in enumerate(times.tolist()):
+        record = {'timestamp': datetime.fromtimestamp(unix_time).isoformat(), 'unix_time': unix_time}
+        for key, values in columns.items():
+            record[key] = values[i]
+        records.append(record)
+    return records
+
+
+def motion_records(start, end, step_seconds=10, device_id='webcam_001', rng=None):
+    rng = rng or np.random.default_rng(0)
+    return _records(start, end, step_seconds, {
+        'motion_detected': lambda n: rng.integers(0, 2, n).tolist(),
+        'motion_intensity': lambda n: np.round(rng.uniform(0, 20, n), 2).tolist(),
+        'motion_area': lambda n: rng.integers(0, 5000, n).tolist(),
+        'brightness': lambda n: np.round(rng.uniform(40, 200, n), 2).tolist(),
+        'sensor_type': lambda n: ['webcam_motion'] * n,
+        'device_id': lambda n: [device_id] * n
+    })
+
+
+def motion_point(unix_time, device_id='webcam_001', motion_detected=1, motion_intensity=5.0, motion_area=100):
+    return {
+        'timestamp': datetime.fromtimestamp(unix_time).isoformat(),
+        'unix_time': int(unix_time),
+        'motion_detected': motion_detected,
+        'motion_intensity': motion_intensity,
+        'motion_area': motion_area,
+        'brightness': 100.0,
+        'sensor_type': 'webcam_motion',
+        'device_id': device_id
+    }
+
+
+def weather_records(start, end, step_seconds=600, rng=None):
+    rng = rng or np.random.default_rng(1)
+    return _records(start, end, step_seconds, {
+        'temperature': lambda n: np.round(rng.normal(12, 5, n), 1).tolist(),
+        'humidity': lambda n: rng.integers(40, 96, n).tolist(),
+        'wind_speed': lambda n: np.round(rng.uniform(0, 12, n), 1).tolist(),
+        'weather': lambda n: CONDITIONS[rng.integers(0, len(CONDITIONS), n)].tolist(),
+        'weather_description': lambda n: ['synthetic'] * n
+    })
+
+
+def air_quality_records(start, end, step_seconds=1800, rng=None):
+    rng = rng or np.random.default_rng(2)
+    return _records(start, end, step_seconds, {
+        'aqi': lambda n: rng.integers(10, 160, n).tolist(),
+        'pm2_5': lambda n: np.round(rng.uniform(0, 40, n), 1).tolist(),
+        'pm10': lambda n: np.round(rng.uniform(0, 60, n), 1).tolist()
+    })
+
+
+def bikes_records(start, end, step_seconds=300, rng=None):
+    rng = rng or np.random.default_rng(3)
+    return _records(start, end, step_seconds, {
+        'total_bikes_available': lambda n: rng.integers(0, 40, n).tolist(),
+        'average_occupancy': lambda n: np.round(rng.uniform(0, 1, n), 3).tolist()
+    })
+
+
+def synthetic_window(hours, motion_step=10, end=None, seed=0):
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now()
+    start = end - timedelta(hours=hours)
+    
+    return {
+        'motion': motion_records(start, end, motion_step, rng=rng),
+        'weather': weather_records(start, end, rng=rng),
+        'air_quality': air_quality_records(start, end, rng=rng),
+        'bikes': bikes_records(start, end, rng=rng)
+    }
+
+
+def forecast_records(hours=48, step_hours=3, start=None, seed=0):
+    rng = np.random.default_rng(seed)
+    start = start or datetime.now()
+    count = max(1, int(hours // step_hours))
+    
+    forecasts = []
+    for i in range(count):
+        timestamp = start + timedelta(hours=i * step_hours)
+        temperature = round(12 + 6 * np.sin((timestamp.hour - 6) * np.pi / 12) + rng.normal(0, 1.5), 1)
+        forecasts.append({
+            'timestamp': timestamp,
+            'unix_time': int(timestamp.timestamp()),
+            'temperature': temperature,
+            'feels_like': round(temperature - 2, 1),
+            'humidity': int(rng.integers(50, 95)),
+            'weather': str(CONDITIONS[rng.integers(0, len(CONDITIONS))]),
+            'weather_description': 'synthetic forecast',
+            'wind_speed': round(float(rng.uniform(0, 10)), 1),
+            'clouds': int(rng.integers(0, 100)),
+            'pop': round(float(rng.uniform(0, 100)), 1)
+        })
+    
+    return forecasts
+
+
+def firebase_tree(raw_data):
+    push_ids = PushIdGenerator()
+    tree = {}
+    
+    for source, records in raw_data.items():
+        node = tree
+        for part in SOURCE_PATHS[source].split('/'):
+            node = node.setdefault(part, {})
+        
+        for record in records:
+            node.setdefault(partition_key(record['unix_time']), {})[push_ids.next_id()] = record
+    
+    return tree
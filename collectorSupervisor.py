@@ -0,0 +1,498 @@
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+from leaderElection import LeaderElector, CommandSpool, _atomic_write, _read_json, _pid_alive
+from metrics import REGISTRY
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+COLLECTOR_SCRIPTS = {
+    'webcam': 'webcamSensorFirebase.py',
+    'opendata': 'openDataCollector.py'
+}
+
+HEARTBEAT_ENV = 'COLLECTOR_HEARTBEAT_FILE'
+
+COLLECTOR_UP = REGISTRY.gauge('collector_up', 'Whether a supervised collector process is running', ('collector',))
+COLLECTOR_RESTARTS = REGISTRY.counter('collector_restarts_total', 'Collector restarts after a crash or stale heartbeat', ('collector',))
+COLLECTOR_CPU = REGISTRY.gauge('collector_cpu_percent', 'Collector CPU usage since the previous sample', ('collector',))
+COLLECTOR_RSS = REGISTRY.gauge('collector_rss_bytes', 'Collector resident memory', ('collector',))
+
+last_heartbeat = [0.0]
+
+
+def heartbeat(min_interval=1.0):
+    path = os.environ.get(HEARTBEAT_ENV)
+    now = time.time()
+    if not path or now - last_heartbeat[0] < min_interval:
+        return
+    
+    last_heartbeat[0] = now
+    try:
+        with open(path, 'a'):
+            os.utime(path, None)
+    except OSError:
+        pass
+
+
+def _cpu_seconds(pid):
+    if psutil is not None:
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def _rss_bytes(pid):
+    if psutil is not None:
+        return psutil.Process(pid).memory_info().rss
+    with open(f'/proc/{pid}/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class RestartPolicy:
+    
+    def __init__(self, mode='on-failure', initial_delay=1.0, max_delay=60.0, multiplier=2.0,
+                 max_restarts=10, reset_after=300):
+        self.mode = mode
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_restarts = max_restarts
+        self.reset_after = reset_after
+    
+    def should_restart(self, exit_code, restarts):
+        if self.mode == 'never' or restarts >= self.max_restarts:
+            return False
+        return self.mode == 'always' or exit_code != 0
+    
+    def delay(self, restarts):
+        return min(self.max_delay, self.initial_delay * self.multiplier ** restarts)
+
+
+class Collector:
+    
+    def __init__(self, name, command, policy):
+        self.name = name
+        self.command = command
+        self.policy = policy
+        
+        self.desired = 'stopped'
+        self.state = 'stopped'
+        self.process = None
+        self.pid = None
+        self.started = None
+        self.restarts = 0
+        self.last_exit = None
+        self.next_start = None
+        self.stop_requested = None
+        self.restart_requested = False
+        self.heartbeat_file = None
+        self.orphan_pid = None
+        self.orphan_since = None
+        
+        self.cpu_sample = None
+        self.cpu_percent = None
+        self.rss_bytes = None
+    
+    def status(self, now, heartbeat_timeout):
+        heartbeat_age = None
+        if self.heartbeat_file and os.path.exists(self.heartbeat_file) and self.state == 'running':
+            heartbeat_age = round(now - os.path.getmtime(self.heartbeat_file), 1)
+        
+        return {
+            'state': self.state,
+            'desired': self.desired,
+            'pid': self.pid,
+            'orphan_pid': self.orphan_pid,
+            'command': self.command,
+            'uptime_seconds': round(now - self.started, 1) if self.started and self.state == 'running' else None,
+            'restarts': self.restarts,
+            'last_exit': self.last_exit,
+            'next_start_in': round(max(0, self.next_start - now), 1) if self.next_start else None,
+            'heartbeat_age': heartbeat_age,
+            'stale': heartbeat_age is not None and heartbeat_age > heartbeat_timeout,
+            'cpu_percent': self.cpu_percent,
+            'rss_mb': round(self.rss_bytes / 2 ** 20, 1) if self.rss_bytes is not None else None
+        }
+
+
+class CollectorSupervisor:
+    
+    def __init__(self, scripts=None, state_dir=os.path.join('data', 'collectors'), policy=None,
+                 poll_interval=1.0, heartbeat_timeout=60, stop_timeout=10, command_ttl=30, resume=True):
+        self.state_dir = state_dir
+        self.status_path = os.path.join(state_dir, 'status.json')
+        self.poll_interval = poll_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.stop_timeout = stop_timeout
+        self.resume = resume
+        self.commands = CommandSpool(os.path.join(state_dir, 'commands'), ttl=command_ttl)
+        
+        self.lock = threading.RLock()
+        self.collectors = {
+            name: Collector(name, [sys.executable, script], policy or RestartPolicy())
+            for name, script in (scripts or COLLECTOR_SCRIPTS).items()
+        }
+        
+        self.elector = LeaderElector(
+            'collector-supervisor',
+            on_elected=self._take_over,
+            on_stepped_down=self._stop_all,
+            lock_dir=state_dir,
+            retry_interval=max(2.0, poll_interval * 2)
+        )
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    @property
+    def is_leader(self):
+        return self.elector.is_leader
+    
+    def start(self):
+        self.elector.start()
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._monitor_loop, name='collector-supervisor', daemon=True)
+            self.thread.start()
+    
+    def shutdown(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.poll_interval + 1)
+        self.elector.stop()
+    
+    def _take_over(self):
+        previous = _read_json(self.status_path) or {}
+        
+        with self.lock:
+            for name, saved in previous.get('collectors', {}).items():
+                collector = self.collectors.get(name)
+                if collector is None:
+                    continue
+                
+                pid = saved.get('pid')
+                if pid and saved.get('state') in ('running', 'stopping') and _pid_alive(pid):
+                    if self._signal_orphan(pid, collector):
+                        print(f"Reclaiming orphaned {name} collector (pid {pid}) from previous supervisor")
+                        collector.orphan_pid = pid
+                        collector.orphan_since = time.time()
+                
+                if self.resume and saved.get('desired') == 'running':
+                    collector.desired = 'running'
+                    collector.next_start = time.time()
+                    collector.state = 'backoff'
+            
+            self._write_status()
+    
+    def _signal_orphan(self, pid, collector, sig=signal.SIGTERM):
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                if collector.command[-1].encode('utf-8') not in f.read():
+                    return False
+        except OSError:
+            return False
+        
+        try:
+            os.kill(pid, sig)
+        except OSError as e:
+            print(f"Could not stop orphaned collector {pid}: {e}")
+            return False
+        return True
+    
+    def _orphan_exited(self, collector, now):
+        if collector.orphan_pid is None:
+            return True
+        if not _pid_alive(collector.orphan_pid):
+            collector.orphan_pid = None
+            collector.orphan_since = None
+            return True
+        
+        if now - collector.orphan_since > self.stop_timeout:
+            self._signal_orphan(collector.orphan_pid, collector, signal.SIGKILL)
+        return False
+    
+    def _spawn(self, collector):
+        log_path = os.path.join(self.state_dir, f'{collector.name}.log')
+        collector.heartbeat_file = os.path.join(self.state_dir, f'{collector.name}.heartbeat')
+        if os.path.exists(collector.heartbeat_file):
+            os.remove(collector.heartbeat_file)
+        
+        env = dict(os.environ)
+        env[HEARTBEAT_ENV] = collector.heartbeat_file
+        
+        try:
+            with open(log_path, 'a') as log:
+                collector.process = subprocess.Popen(
+                    collector.command,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    start_new_session=True
+                )
+        except Exception as e:
+            print(f"Failed to start collector {collector.name}: {e}")
+            collector.last_exit = {'code': None, 'error': str(e), 'time': time.time()}
+            self._schedule_restart(collector, exit_code=-1)
+            return
+        
+        collector.pid = collector.process.pid
+        collector.started = time.time()
+        collector.state = 'running'
+        collector.next_start = None
+        collector.stop_requested = None
+        collector.cpu_sample = None
+        COLLECTOR_UP.set(1, collector=collector.name)
+    
+    def _schedule_restart(self, collector, exit_code):
+        if collector.desired == 'running' and collector.policy.should_restart(exit_code, collector.restarts):
+            delay = collector.policy.delay(collector.restarts)
+            collector.restarts += 1
+            collector.state = 'backoff'
+            collector.next_start = time.time() + delay
+            COLLECTOR_RESTARTS.inc(collector=collector.name)
+            print(f"Collector {collector.name} exited with {exit_code}, restarting in {delay:.1f}s")
+        else:
+            collector.next_start = None
+            if collector.desired == 'running' and exit_code != 0:
+                collector.state = 'failed'
+            else:
+                collector.state = 'stopped'
+                collector.desired = 'stopped'
+    
+    def _reap(self, collector, now):
+        exit_code = collector.process.poll()
+        if exit_code is None:
+            return False
+        
+        ran = now - (collector.started or now)
+        if ran >= collector.policy.reset_after:
+            collector.restarts = 0
+        
+        collector.last_exit = {'code': exit_code, 'time': now, 'ran_seconds': round(ran, 1)}
+        collector.process = None
+        collector.pid = None
+        collector.cpu_percent = None
+        collector.rss_bytes = None
+        COLLECTOR_UP.set(0, collector=collector.name)
+        
+        if collector.state == 'stopping':
+            collector.stop_requested = None
+            if collector.restart_requested:
+                collector.restart_requested = False
+                collector.state = 'backoff'
+                collector.next_start = now
+            else:
+                collector.state = 'stopped'
+        else:
+            self._schedule_restart(collector, exit_code)
+        return True
+    
+    def _terminate(self, collector):
+        if collector.process is None:
+            collector.state = 'stopped'
+            collector.next_start = None
+            return
+        
+        collector.state = 'stopping'
+        collector.stop_requested = time.time()
+        try:
+            collector.process.send_signal(signal.SIGINT)
+        except OSError as e:
+            print(f"Failed to signal collector {collector.name}: {e}")
+    
+    def _escalate(self, collector, now):
+        elapsed = now - collector.stop_requested
+        try:
+            if elapsed > self.stop_timeout * 2:
+                collector.process.kill()
+            elif elapsed > self.stop_timeout:
+                collector.process.terminate()
+        except OSError as e:
+            print(f"Failed to stop collector {collector.name}: {e}")
+    
+    def _wait_or_kill(self, collector, timeout):
+        try:
+            collector.process.wait(timeout=max(0.1, timeout))
+        except subprocess.TimeoutExpired:
+            collector.process.kill()
+            collector.process.wait()
+        self._reap(collector, time.time())
+    
+    def _sample_usage(self, collector, now):
+        try:
+            cpu = _cpu_seconds(collector.pid)
+            collector.rss_bytes = _rss_bytes(collector.pid)
+        except Exception:
+            return
+        
+        if collector.cpu_sample is not None:
+            elapsed = now - collector.cpu_sample[0]
+            if elapsed > 0:
+                collector.cpu_percent = round(100 * (cpu - collector.cpu_sample[1]) / elapsed, 1)
+        collector.cpu_sample = (now, cpu)
+        
+        if collector.cpu_percent is not None:
+            COLLECTOR_CPU.set(collector.cpu_percent, collector=collector.name)
+        COLLECTOR_RSS.set(collector.rss_bytes, collector=collector.name)
+    
+    def _check_heartbeat(self, collector, now):
+        if not collector.heartbeat_file or not os.path.exists(collector.heartbeat_file):
+            return
+        if now - os.path.getmtime(collector.heartbeat_file) <= self.heartbeat_timeout:
+            return
+        
+        print(f"Collector {collector.name} heartbeat is stale, restarting it")
+        os.remove(collector.heartbeat_file)
+        try:
+            collector.process.kill()
+        except Exception as e:
+            print(f"Failed to kill stale collector {collector.name}: {e}")
+    
+    def _tick(self):
+        now = time.time()
+        
+        with self.lock:
+            for collector in self.collectors.values():
+                if collector.process is not None:
+                    if self._reap(collector, now):
+                        continue
+                    if collector.state == 'stopping':
+                        self._escalate(collector, now)
+                    else:
+                        self._check_heartbeat(collector, now)
+                        self._sample_usage(collector, now)
+                elif collector.state == 'backoff' and collector.desired == 'running' and now >= collector.next_start:
+                    if self._orphan_exited(collector, now):
+                        self._spawn(collector)
+            
+            self._process_commands()
+            self._write_status()
+    
+    def _monitor_loop(self):
+        while not self.stop_event.wait(self.poll_interval):
+            if not self.is_leader:
+                continue
+            try:
+                self._tick()
+            except Exception as e:
+                print(f"Collector supervisor tick failed: {e}")
+    
+    def _apply(self, name, action):
+        collector = self.collectors.get(name)
+        if collector is None:
+            return {'status': 'error', 'message': f"Unknown collector {name}"}
+        
+        if action == 'start':
+            if collector.process is not None:
+                if collector.state == 'stopping':
+                    collector.desired = 'running'
+                    collector.restart_requested = True
+                    return {'status': 'restarting', 'pid': collector.pid}
+                return {'status': 'already_running', 'pid': collector.pid}
+            collector.desired = 'running'
+            collector.restarts = 0
+            if not self._orphan_exited(collector, time.time()):
+                return self._after_orphan(collector)
+            self._spawn(collector)
+            if collector.process is None:
+                return {'status': 'error', 'message': 'failed to start', 'last_exit': collector.last_exit}
+            return {'status': 'started', 'pid': collector.pid}
+        
+        if action == 'stop':
+            collector.desired = 'stopped'
+            collector.restart_requested = False
+            if collector.process is None:
+                was_waiting = collector.state == 'backoff'
+                self._terminate(collector)
+                return {'status': 'stopped' if was_waiting else 'not_running'}
+            self._terminate(collector)
+            return {'status': 'stopping', 'pid': collector.pid}
+        
+        if action == 'restart':
+            collector.desired = 'running'
+            collector.restarts = 0
+            if collector.process is not None:
+                collector.restart_requested = True
+                if collector.state != 'stopping':
+                    self._terminate(collector)
+                return {'status': 'restarting', 'pid': collector.pid}
+            if not self._orphan_exited(collector, time.time()):
+                return self._after_orphan(collector)
+            self._spawn(collector)
+            return {'status': 'restarted', 'pid': collector.pid}
+        
+        if action == 'status':
+            return collector.status(time.time(), self.heartbeat_timeout)
+        
+        return {'status': 'error', 'message': f"Unknown action {action}"}
+    
+    def _after_orphan(self, collector):
+        collector.state = 'backoff'
+        collector.next_start = time.time()
+        return {'status': 'waiting_for_orphan', 'orphan_pid': collector.orphan_pid}
+    
+    def _process_commands(self):
+        self.commands.drain(lambda command: self._apply(command['collector'], command['action']))
+    
+    def _write_status(self):
+        now = time.time()
+        _atomic_write(self.status_path, {
+            'leader_pid': os.getpid(),
+            'updated': now,
+            'collectors': {
+                name: collector.status(now, self.heartbeat_timeout)
+                for name, collector in self.collectors.items()
+            }
+        })
+    
+    def control(self, name, action, timeout=5.0):
+        if name not in self.collectors:
+            return {'status': 'error', 'message': f"Unknown collector {name}"}
+        
+        if self.is_leader:
+            with self.lock:
+                result = self._apply(name, action)
+                self._write_status()
+            return result
+        
+        result = self.commands.submit({'collector': name, 'action': action}, timeout=timeout)
+        if result is None:
+            return {'status': 'queued', 'leader': self.elector.lock.holder()}
+        return result
+    
+    def get_status(self):
+        if self.is_leader:
+            with self.lock:
+                now = time.time()
+                collectors = {
+                    name: collector.status(now, self.heartbeat_timeout)
+                    for name, collector in self.collectors.items()
+                }
+            return {'leader_pid': os.getpid(), 'served_by': os.getpid(), 'updated': now, 'collectors': collectors}
+        
+        status = _read_json(self.status_path) or {'leader_pid': None, 'collectors': {}}
+        status['served_by'] = os.getpid()
+        if status.get('updated'):
+            status['age_seconds'] = round(time.time() - status['updated'], 1)
+        return status
+    
+    def _stop_all(self):
+        with self.lock:
+            running = [collector for collector in self.collectors.values() if collector.process is not None]
+            for collector in running:
+                self._terminate(collector)
+            
+            deadline = time.time() + self.stop_timeout
+            for collector in running:
+                self._wait_or_kill(collector, deadline - time.time())
+            
+            self._write_status()
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+class DashboardCache:
+    
+    def __init__(self, volatile_keys=('last_updated',), shared_path=None, poll_interval=1.0):
+        self.volatile_keys = set(volatile_keys)
+        self.condition = threading.Condition()
+        self.shared_path = shared_path
+        self.shared_mtime = None
+        self.poll_interval = poll_interval
+        
+        self.payload = None
+        self.fingerprint = None
+        self.version = 0
+        self.score = None
+        self.score_version = 0
+        self.remote_fingerprint = None
+    
+    def _fingerprint(self, payload):
+        stable = {key: value for key, value in payload.items() if key not in self.volatile_keys}
+        encoded = json.dumps(stable, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()
+    
+    def update(self, payload):
+        fingerprint = self._fingerprint(payload)
+        self._sync()
+        
+        with self.condition:
+            if fingerprint == self.fingerprint:
+                return False
+            
+            self.payload = payload
+            self.fingerprint = fingerprint
+            self.version += 1
+            
+            if payload.get('score') != self.score:
+                self.score = payload.get('score')
+                self.score_version = time.time_ns()
+                self.condition.notify_all()
+            
+            if self.shared_path:
+                self._publish()
+            
+            return True
+    
+    def needs_remote_write(self, payload):
+        return self._fingerprint(payload) != self.remote_fingerprint
+    
+    def mark_remote_written(self, payload):
+        self.remote_fingerprint = self._fingerprint(payload)
+    
+    @property
+    def etag(self):
+        if self.fingerprint is None:
+            return None
+        return f"{self.version}-{self.fingerprint[:16]}"
+    
+    def _publish(self):
+        snapshot = {
+            'payload': self.payload,
+            'fingerprint': self.fingerprint,
+            'version': self.version,
+            'score': self.score,
+            'score_version': self.score_version
+        }
+        
+        try:
+            shared_dir = os.path.dirname(self.shared_path)
+            if shared_dir and not os.path.exists(shared_dir):
+                os.makedirs(shared_dir, exist_ok=True)
+            
+            tmp_path = f"{self.shared_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f, default=str)
+            os.replace(tmp_path, self.shared_path)
+            self.shared_mtime = os.stat(self.shared_path).st_mtime_ns
+        except Exception as e:
+            print(f"Failed to share dashboard payload: {e}")
+    
+    def _sync(self):
+        if not self.shared_path:
+            return
+        
+        try:
+            mtime = os.stat(self.shared_path).st_mtime_ns
+            if mtime == self.shared_mtime:
+                return
+            with open(self.shared_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        with self.condition:
+            self.shared_mtime = mtime
+            if snapshot['version'] <= self.version and snapshot['fingerprint'] == self.fingerprint:
+                return
+            
+            self.payload = snapshot['payload']
+            self.fingerprint = snapshot['fingerprint']
+            self.version = snapshot['version']
+            self.score = snapshot['score']
+            if snapshot['score_version'] != self.score_version:
+                self.score_version = snapshot['score_version']
+                self.condition.notify_all()
+    
+    def get(self):
+        self._sync()
+        with self.condition:
+            return self.payload, self.etag, self.score_version
+    
+    def wait_for_score_change(self, last_score_version, timeout=15):
+        deadline = time.time() + timeout
+        
+        while True:
+            self._sync()
+            with self.condition:
+                remaining = deadline - time.time()
+                if self.score_version != last_score_version or remaining <= 0:
+                    return self.payload, self.etag, self.score_version
+                
+                wait = min(remaining, self.poll_interval) if self.shared_path else remaining
+                self.condition.wait_for(lambda: self.score_version != last_score_version, wait)
@@ -5,21 +5,67 @@ import numpy as np
 from datetime import datetime, timedelta
 import json
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from hourlyAggregator import HourlyAggregator
+from recordSchema import to_frame
+from firebaseAccess import SOURCE_PATHS, partition_keys, query_partition
+from metrics import FUSION_STAGE_SECONDS, FUSION_RECORDS_FETCHED, FUSION_FETCH_ERRORS
+
+MOTION_COLUMNS = ['motion_events', 'avg_intensity', 'avg_area', 'avg_brightness']
+
+ENVIRONMENT_COLUMNS = {
+    'weather': ['temperature', 'humidity', 'wind_speed', 'weather', 'weather_description'],
+    'air_quality': ['aqi', 'pm2_5', 'pm10'],
+    'bikes': ['total_bikes_available', 'average_occupancy']
+}
+
 
 class DataFusionAnalyzer:
-    def __init__(self, firebase_config_path='firebase_config.json'):
-        try:
-            firebase_admin.get_app()
-        except ValueError:
-            cred = credentials.Certificate(firebase_config_path)
-            firebase_admin.initialize_app(cred, {
-                'databaseURL': 'https://cs7ns4-assignment3-pylak-default-rtdb.europe-west1.firebasedatabase.app/'
-            })
-        
-        self.motion_ref = db.reference('sensor_data')
-        self.weather_ref = db.reference('open_data/weather')
-        self.air_quality_ref = db.reference('open_data/air_quality')
-        self.bikes_ref = db.reference('open_data/dublin_bikes')
+    def __init__(self, firebase_config_path='firebase_config.json', fetch_workers=8, store=None,
+                 granularity='1h', tolerances=None, clock=None, late_tolerance=600):
+        if firebase_config_path is not None:
+            try:
+                firebase_admin.get_app()
+            except ValueError:
+                cred = credentials.Certificate(firebase_config_path)
+                firebase_admin.initialize_app(cred, {
+                    'databaseURL': 'https://cs7ns4-assignment3-pylak-default-rtdb.europe-west1.firebasedatabase.app/',
+                    'httpTimeout': 10
+                })
+            
+            self.motion_ref = db.reference(SOURCE_PATHS['motion'])
+            self.weather_ref = db.reference(SOURCE_PATHS['weather'])
+            self.air_quality_ref = db.reference(SOURCE_PATHS['air_quality'])
+            self.bikes_ref = db.reference(SOURCE_PATHS['bikes'])
+        else:
+            self.motion_ref = self.weather_ref = self.air_quality_ref = self.bikes_ref = None
+        
+        self.sources = {
+            'motion': self.motion_ref,
+            'weather': self.weather_ref,
+            'air_quality': self.air_quality_ref,
+            'bikes': self.bikes_ref
+        }
+        
+        self.watermarks = {}
+        self.late_tolerance = late_tolerance
+        self.window = {source: {} for source in self.sources}
+        self.window_hours = None
+        self.new_points = {source: [] for source in self.sources}
+        self.aggregator = HourlyAggregator()
+        
+        self.fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix='fusion-fetch')
+        self.fetch_errors = {}
+        self.store = store
+        
+        self.clock = clock or datetime.now
+        self.granularity = granularity
+        self.tolerances = {
+            'weather': '3h',
+            'air_quality': '3h',
+            'bikes': '1h'
+        }
+        self.tolerances.update(tolerances or {})
         
         self.weights = {
             'temperature': 0.30,
@@ -36,72 +82,229 @@ class DataFusionAnalyzer:
             'bikes_good': 5,
             'motion_active': 0.5
         }
+        
+        self.weather_scores = {
+            'Clear': 100,
+            'Clouds': 80,
+            'Mist': 60,
+            'Fog': 50,
+            'Drizzle': 40,
+            'Rain': 20,
+            'Thunderstorm': 10,
+            'Snow': 30
+        }
+    
+    def _run_fetches(self, tasks, fetch, reset_errors=True):
+        if reset_errors:
+            self.fetch_errors = {}
+        futures = {self.fetch_pool.submit(fetch, *task): task for task in tasks}
+        
+        results = {}
+        for future in as_completed(futures):
+            task = futures[future]
+            source, date_key = task[:2]
+            try:
+                results[task] = future.result()
+            except Exception as e:
+                print(f"Fetch failed for {source}/{date_key}: {e}")
+                self.fetch_errors.setdefault(source, []).append(f"{date_key}: {e}")
+                FUSION_FETCH_ERRORS.inc(source=source)
+        
+        return results
     
-    def fetch_recent_data(self, hours_back=24):
-        end_time = datetime.now()
+    @FUSION_STAGE_SECONDS.timed(stage='fetch')
+    def fetch_recent_data(self, hours_back=24, backend='firebase'):
+        end_time = self.clock()
         start_time = end_time - timedelta(hours=hours_back)
         start_unix = int(start_time.timestamp())
+        end_unix = int(end_time.timestamp())
         
-        data = {
-            'motion': [],
-            'weather': [],
-            'air_quality': [],
-            'bikes': []
-        }
-
-        try:
-            for i in range(hours_back // 24 + 2):
-                date_key = (end_time - timedelta(days=i)).strftime('%Y-%m-%d')
-                date_data = self.motion_ref.child(date_key).get()
-                if date_data:
-                    for _, point in date_data.items():
-                        if point.get('unix_time', 0) >= start_unix:
-                            data['motion'].append(point)
-        except:
-            pass
-
-        try:
-            for i in range(hours_back // 24 + 2):
-                date_key = (end_time - timedelta(days=i)).strftime('%Y-%m-%d')
-                date_data = self.weather_ref.child(date_key).get()
-                if date_data:
-                    for _, point in date_data.items():
-                        if point.get('unix_time', 0) >= start_unix:
-                            data['weather'].append(point)
-        except:
-            pass
-
-        try:
-            for i in range(hours_back // 24 + 2):
-                date_key = (end_time - timedelta(days=i)).strftime('%Y-%m-%d')
-                date_data = self.air_quality_ref.child(date_key).get()
-                if date_data:
-                    for _, point in date_data.items():
-                        if point.get('unix_time', 0) >= start_unix:
-                            data['air_quality'].append(point)
-        except:
-            pass
-
-        try:
-            for i in range(hours_back // 24 + 2):
-                date_key = (end_time - timedelta(days=i)).strftime('%Y-%m-%d')
-                date_data = self.bikes_ref.child(date_key).get()
-                if date_data:
-                    for _, point in date_data.items():
-                        if point.get('unix_time', 0) >= start_unix:
-                            data['bikes'].append(point)
-        except:
-            pass
+        if backend == 'store':
+            return self.fetch_from_store(start_unix, end_unix)
+        
+        tasks = [
+            (source, date_key)
+            for source in self.sources
+            for date_key in partition_keys(start_unix, end_unix)
+        ]
+        
+        results = self._run_fetches(
+            tasks,
+            lambda source, date_key: query_partition(self.sources[source], date_key, start_unix, end_unix)
+        )
+        
+        data = {source: [] for source in self.sources}
+        
+        for task in tasks:
+            date_data = results.get(task)
+            if date_data:
+                data[task[0]].extend(date_data.values())
+        
+        for source, points in data.items():
+            FUSION_RECORDS_FETCHED.inc(len(points), source=source)
         
         return data
     
-    def aggregate_motion_hourly(self, motion_data):
-        if not motion_data:
+    def fetch_from_store(self, start_unix, end_unix=None):
+        if self.store is None:
+            raise ValueError("No local history store configured")
+        
+        columns = {
+            'motion': ['timestamp', 'unix_time', 'motion_detected', 'motion_intensity', 'motion_area', 'brightness'],
+            'weather': ['timestamp', 'unix_time', 'temperature', 'humidity', 'wind_speed', 'weather', 'weather_description'],
+            'air_quality': ['timestamp', 'unix_time', 'aqi', 'pm2_5', 'pm10'],
+            'bikes': ['timestamp', 'unix_time', 'total_bikes_available', 'average_occupancy']
+        }
+        
+        return {
+            source: self.store.read(source, start_unix, end_unix, columns=columns[source])
+            for source in self.sources
+        }
+    
+    def archive_to_store(self, hours_back=24):
+        if self.store is None:
+            raise ValueError("No local history store configured")
+        
+        raw_data = self.fetch_recent_data(hours_back)
+        
+        counts = {}
+        for source, records in raw_data.items():
+            if records:
+                identity = ['unix_time', 'device_id'] if source == 'motion' else ['unix_time']
+                times = [int(point.get('unix_time', 0)) for point in records]
+                stored = self.store.read(source, min(times), max(times), columns=identity)
+                seen = set(stored[identity].itertuples(index=False, name=None))
+                
+                fresh = []
+                for point, unix_time in zip(records, times):
+                    key = (unix_time,) + tuple(point.get(column) for column in identity[1:])
+                    if key not in seen:
+                        seen.add(key)
+                        fresh.append(point)
+                records = fresh
+            counts[source] = self.store.append(source, records)
+        
+        return counts
+    
+    def reset_incremental_state(self):
+        self.watermarks = {}
+        self.window = {source: {} for source in self.sources}
+        self.window_hours = None
+        self.new_points = {source: [] for source in self.sources}
+        self.aggregator.reset()
+    
+    @FUSION_STAGE_SECONDS.timed(stage='fetch_incremental')
+    def fetch_incremental(self, hours_back=24):
+        end_time = self.clock()
+        end_unix = int(end_time.timestamp())
+        start_unix = int((end_time - timedelta(hours=hours_back)).timestamp())
+        
+        if self.window_hours is not None and hours_back > self.window_hours:
+            self.reset_incremental_state()
+        self.window_hours = hours_back
+        
+        tasks = []
+        for source in self.sources:
+            for date_key in partition_keys(start_unix, end_unix):
+                watermark = self.watermarks.get((source, date_key))
+                since = start_unix if watermark is None else max(watermark - self.late_tolerance, start_unix)
+                tasks.append((source, date_key, since))
+        
+        results = self._run_fetches(
+            tasks,
+            lambda source, date_key, since: query_partition(self.sources[source], date_key, since)
+        )
+        
+        self.new_points = {source: [] for source in self.sources}
+        watermarks = {}
+        
+        for task in tasks:
+            source, date_key = task[:2]
+            watermark = self.watermarks.get((source, date_key))
+            if task not in results:
+                if watermark is not None:
+                    watermarks[(source, date_key)] = watermark
+                continue
+            
+            window = self.window[source]
+            for key, point in (results[task] or {}).items():
+                unix_time = point.get('unix_time', 0)
+                if watermark is None or unix_time > watermark:
+                    watermark = unix_time
+                if key in window:
+                    continue
+                window[key] = point
+                self.new_points[source].append(point)
+            
+            if watermark is not None:
+                watermarks[(source, date_key)] = watermark
+        
+        self.watermarks = watermarks
+        
+        for source, points in self.new_points.items():
+            FUSION_RECORDS_FETCHED.inc(len(points), source=source)
+        
+        for source, window in self.window.items():
+            self.window[source] = {
+                key: point for key, point in window.items()
+                if point.get('unix_time', 0) >= start_unix
+            }
+        
+        return {
+            source: list(window.values())
+            for source, window in self.window.items()
+        }
+    
+    def refetch_hours(self, hours):
+        if not hours:
+            return {source: [] for source in self.sources}
+        
+        ranges = []
+        for hour in sorted(set(hours)):
+            hour_start = int(pd.Timestamp(hour).floor('H').to_pydatetime().timestamp())
+            ranges.append((hour_start, hour_start + 3599))
+        
+        tasks = [
+            (source, date_key, hour_start, hour_end)
+            for source in self.sources
+            for hour_start, hour_end in ranges
+            for date_key in partition_keys(hour_start, hour_end, pad_days=0)
+        ]
+        
+        results = self._run_fetches(
+            tasks,
+            lambda source, date_key, hour_start, hour_end: query_partition(
+                self.sources[source], date_key, hour_start, hour_end
+            ),
+            reset_errors=False
+        )
+        
+        late = {source: [] for source in self.sources}
+        for task in tasks:
+            source = task[0]
+            window = self.window[source]
+            for key, point in (results.get(task) or {}).items():
+                if key in window:
+                    continue
+                window[key] = point
+                late[source].append(point)
+        
+        for source, points in late.items():
+            FUSION_RECORDS_FETCHED.inc(len(points), source=source)
+        
+        return late
+    
+    def _as_frame(self, records):
+        if isinstance(records, pd.DataFrame):
+            return records.copy()
+        return pd.DataFrame(records) if records else pd.DataFrame()
+    
+    def aggregate_motion_hourly(self, motion_data, freq='H'):
+        df = to_frame('motion', motion_data)
+        if df.empty:
             return pd.DataFrame()
         
-        df = pd.DataFrame(motion_data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['hour'] = df['timestamp'].dt.floor('H')
+        df['hour'] = df['timestamp'].dt.floor(freq)
         
         hourly = df.groupby('hour').agg({
             'motion_detected': 'sum',
@@ -113,17 +316,17 @@ class DataFusionAnalyzer:
         hourly.columns = ['hour', 'motion_events', 'avg_intensity', 
                           'avg_area', 'avg_brightness']
         
-        return hourly
+        return hourly.astype({'avg_intensity': float, 'avg_brightness': float})
     
-    def fuse_data_sources(self, raw_data):
+    def merge_sources(self, raw_data):
         motion_hourly = self.aggregate_motion_hourly(raw_data['motion'])
         
         if motion_hourly.empty:
             return pd.DataFrame()
         
-        weather_df = pd.DataFrame(raw_data['weather']) if raw_data['weather'] else pd.DataFrame()
-        aqi_df = pd.DataFrame(raw_data['air_quality']) if raw_data['air_quality'] else pd.DataFrame()
-        bikes_df = pd.DataFrame(raw_data['bikes']) if raw_data['bikes'] else pd.DataFrame()
+        weather_df = self._as_frame(raw_data['weather'])
+        aqi_df = self._as_frame(raw_data['air_quality'])
+        bikes_df = self._as_frame(raw_data['bikes'])
         
         if not weather_df.empty:
             weather_df['timestamp'] = pd.to_datetime(weather_df['timestamp'])
@@ -167,10 +370,75 @@ class DataFusionAnalyzer:
         if not bikes_df.empty:
             fused = fused.merge(bikes_df, on='hour', how='left')
         
-        fused = fused.fillna(method='ffill').fillna(method='bfill')
-        
         return fused
     
+    def fill_gaps(self, merged):
+        if merged.empty:
+            return merged
+        
+        filled = merged.sort_values('hour').reset_index(drop=True)
+        hours = filled['hour']
+        
+        for source, columns in ENVIRONMENT_COLUMNS.items():
+            tolerance = pd.Timedelta(self.tolerances[source])
+            for column in columns:
+                if column not in filled.columns:
+                    continue
+                last_seen = hours.where(filled[column].notna()).ffill()
+                filled[column] = filled[column].ffill().where(hours - last_seen <= tolerance)
+        
+        return filled
+    
+    def _readings_frame(self, source, records):
+        df = to_frame(source, records)
+        if df.empty:
+            return df
+        
+        df = df[['timestamp'] + ENVIRONMENT_COLUMNS[source]]
+        return df.sort_values('timestamp', kind='stable')
+    
+    def fuse_asof(self, raw_data, granularity=None):
+        freq = pd.Timedelta(granularity or self.granularity)
+        
+        with FUSION_STAGE_SECONDS.time(stage='frame_build'):
+            motion = self.aggregate_motion_hourly(raw_data['motion'], freq)
+            readings = {
+                source: self._readings_frame(source, raw_data[source])
+                for source in ENVIRONMENT_COLUMNS
+            }
+        
+        bins = [motion['hour']] if not motion.empty else []
+        bins += [frame['timestamp'].dt.floor(freq) for frame in readings.values() if not frame.empty]
+        if not bins:
+            return pd.DataFrame()
+        
+        with FUSION_STAGE_SECONDS.time(stage='merge'):
+            fused = pd.DataFrame({'hour': pd.concat(bins, ignore_index=True).drop_duplicates().sort_values()})
+            if not motion.empty:
+                fused = fused.merge(motion, on='hour', how='left')
+            
+            fused['as_of'] = fused['hour'] + freq
+            
+            for source, frame in readings.items():
+                if frame.empty:
+                    continue
+                
+                fused = pd.merge_asof(
+                    fused,
+                    frame.rename(columns={'timestamp': 'reading_time'}),
+                    left_on='as_of',
+                    right_on='reading_time',
+                    direction='backward',
+                    allow_exact_matches=False,
+                    tolerance=pd.Timedelta(self.tolerances[source])
+                ).drop(columns='reading_time')
+            
+            columns = ['hour'] + MOTION_COLUMNS + [column for columns in ENVIRONMENT_COLUMNS.values() for column in columns]
+            return fused.reindex(columns=columns).reset_index(drop=True)
+    
+    def fuse_data_sources(self, raw_data, granularity=None):
+        return self.fuse_asof(raw_data, granularity)
+    
     def score_temperature(self, temp):
         if pd.isna(temp):
             return 50
@@ -204,18 +472,7 @@ class DataFusionAnalyzer:
         if pd.isna(weather_condition):
             return 50
         
-        weather_scores = {
-            'Clear': 100,
-            'Clouds': 80,
-            'Mist': 60,
-            'Fog': 50,
-            'Drizzle': 40,
-            'Rain': 20,
-            'Thunderstorm': 10,
-            'Snow': 30
-        }
-        
-        return weather_scores.get(weather_condition, 50)
+        return self.weather_scores.get(weather_condition, 50)
     
     def score_bikes(self, bikes_available):
         if pd.isna(bikes_available):
@@ -228,59 +485,148 @@ class DataFusionAnalyzer:
         else:
             return 25
     
+    def _as_float_array(self, values):
+        return np.asarray(pd.to_numeric(values, errors='coerce'), dtype=float)
+    
+    def score_temperature_array(self, temps):
+        temps = self._as_float_array(temps)
+        
+        optimal_min, optimal_max = self.thresholds['temp_optimal']
+        accept_min, accept_max = self.thresholds['temp_acceptable']
+        
+        with np.errstate(invalid='ignore'):
+            conditions = [
+                np.isnan(temps),
+                (temps >= optimal_min) & (temps <= optimal_max),
+                (temps >= accept_min) & (temps < optimal_min),
+                (temps > optimal_max) & (temps <= accept_max)
+            ]
+        choices = [
+            50.0,
+            100.0,
+            50 + 50 * (temps - accept_min) / (optimal_min - accept_min),
+            50 + 50 * (accept_max - temps) / (accept_max - optimal_max)
+        ]
+        
+        return np.select(conditions, choices, default=np.maximum(0, 50 - np.abs(temps - 15) * 5))
+    
+    def score_air_quality_array(self, aqis):
+        aqis = self._as_float_array(aqis)
+        
+        good = self.thresholds['aqi_good']
+        acceptable = self.thresholds['aqi_acceptable']
+        
+        with np.errstate(invalid='ignore'):
+            conditions = [
+                np.isnan(aqis),
+                aqis <= good,
+                aqis <= acceptable
+            ]
+        choices = [
+            50.0,
+            100.0,
+            100 - 50 * (aqis - good) / (acceptable - good)
+        ]
+        
+        return np.select(conditions, choices, default=np.maximum(0, 50 * np.exp(-(aqis - acceptable) / 50)))
+    
+    def score_weather_array(self, conditions):
+        categories = list(self.weather_scores)
+        codes = pd.Categorical(np.asarray(conditions, dtype=object), categories=categories).codes
+        
+        lookup = np.array([self.weather_scores[c] for c in categories] + [50], dtype=float)
+        
+        return lookup[codes]
+    
+    def score_bikes_array(self, bikes_available):
+        bikes_available = self._as_float_array(bikes_available)
+        
+        bikes_good = self.thresholds['bikes_good']
+        
+        with np.errstate(invalid='ignore'):
+            conditions = [
+                np.isnan(bikes_available),
+                bikes_available >= bikes_good,
+                bikes_available > 0
+            ]
+        choices = [
+            50.0,
+            100.0,
+            50 + 50 * (bikes_available / bikes_good)
+        ]
+        
+        return np.select(conditions, choices, default=25.0)
+    
+    def combine_scores(self, temp_score, aqi_score, weather_score, bikes_score):
+        return (
+            temp_score * self.weights['temperature'] +
+            aqi_score * self.weights['air_quality'] +
+            weather_score * self.weights['weather'] +
+            bikes_score * self.weights['bikes']
+        )
+    
+    @FUSION_STAGE_SECONDS.timed(stage='score')
     def calculate_outdoor_score(self, fused_data):
         if fused_data.empty:
             return fused_data
         
         df = fused_data.copy()
         
-        df['temp_score'] = df['temperature'].apply(self.score_temperature)
-        df['aqi_score'] = df['aqi'].apply(self.score_air_quality)
-        df['weather_score'] = df['weather'].apply(self.score_weather)
-        df['bikes_score'] = df['total_bikes_available'].apply(self.score_bikes)
+        df['temp_score'] = self.score_temperature_array(df['temperature'])
+        df['aqi_score'] = self.score_air_quality_array(df['aqi'])
+        df['weather_score'] = self.score_weather_array(df['weather'])
+        df['bikes_score'] = self.score_bikes_array(df['total_bikes_available'])
         
-        df['outdoor_score'] = (
-            df['temp_score'] * self.weights['temperature'] +
-            df['aqi_score'] * self.weights['air_quality'] +
-            df['weather_score'] * self.weights['weather'] +
-            df['bikes_score'] * self.weights['bikes']
+        df['outdoor_score'] = self.combine_scores(
+            df['temp_score'],
+            df['aqi_score'],
+            df['weather_score'],
+            df['bikes_score']
         )
         
         df['outdoor_score'] = df['outdoor_score'].round(1)
         
         return df
     
+    @FUSION_STAGE_SECONDS.timed(stage='analyze')
     def analyze_patterns(self, scored_data):
         if scored_data.empty or len(scored_data) < 2:
             return {}
         
         analysis = {}
         
-        if 'outdoor_score' in scored_data.columns and 'motion_events' in scored_data.columns:
-            corr = scored_data['motion_events'].corr(scored_data['outdoor_score'])
-            analysis['motion_outdoor_correlation'] = round(corr, 3)
+        motion = scored_data.dropna(subset=['motion_events']) if 'motion_events' in scored_data.columns else scored_data.iloc[0:0]
+        analysis['motion_available'] = len(motion) >= 2
+        
+        if analysis['motion_available']:
+            corr = motion['motion_events'].corr(motion['outdoor_score'])
+            analysis['motion_outdoor_correlation'] = round(corr, 3) if pd.notna(corr) else None
             
-            if corr < -0.3:
+            if pd.isna(corr):
+                analysis['pattern_insight'] = "Not enough motion variation"
+            elif corr < -0.3:
                 analysis['pattern_insight'] = "Strong inverse correlation"
             elif corr > 0.3:
                 analysis['pattern_insight'] = "Positive correlation"
             else:
                 analysis['pattern_insight'] = "Weak correlation"
-        
-        high_activity = scored_data[scored_data['motion_events'] > scored_data['motion_events'].median()]
-        if not high_activity.empty:
-            analysis['high_activity_avg_score'] = round(high_activity['outdoor_score'].mean(), 1)
-            analysis['high_activity_avg_temp'] = round(high_activity['temperature'].mean(), 1)
+            
+            high_activity = motion[motion['motion_events'] > motion['motion_events'].median()]
+            if not high_activity.empty:
+                analysis['high_activity_avg_score'] = round(high_activity['outdoor_score'].mean(), 1)
+                analysis['high_activity_avg_temp'] = round(high_activity['temperature'].mean(), 1)
+        else:
+            analysis['pattern_insight'] = "No motion data (cameras offline)"
         
         good_conditions = scored_data[scored_data['outdoor_score'] >= 70]
         analysis['good_condition_hours'] = len(good_conditions)
         analysis['good_condition_percentage'] = round(len(good_conditions) / len(scored_data) * 100, 1)
         
-        if 'motion_events' in scored_data.columns:
-            high_motion_threshold = scored_data['motion_events'].quantile(0.75)
-            missed = scored_data[
-                (scored_data['outdoor_score'] >= 70) & 
-                (scored_data['motion_events'] > high_motion_threshold)
+        if analysis['motion_available']:
+            high_motion_threshold = motion['motion_events'].quantile(0.75)
+            missed = motion[
+                (motion['outdoor_score'] >= 70) & 
+                (motion['motion_events'] > high_motion_threshold)
             ]
             analysis['missed_opportunities'] = len(missed)
         
@@ -327,18 +673,60 @@ class DataFusionAnalyzer:
                 'urgency': 'none'
             }
         
+        temperature = latest.get('temperature')
+        aqi = latest.get('aqi')
+        weather = latest.get('weather')
+        bikes_available = latest.get('total_bikes_available')
+        
         recommendation['details'] = {
-            'temperature': f"{latest['temperature']:.1f}°C",
-            'aqi': int(latest['aqi']),
-            'weather': latest['weather'],
-            'bikes_available': int(latest['total_bikes_available']),
+            'temperature': f"{temperature:.1f}°C" if pd.notna(temperature) else 'n/a',
+            'aqi': int(aqi) if pd.notna(aqi) else None,
+            'weather': weather if pd.notna(weather) else None,
+            'bikes_available': int(bikes_available) if pd.notna(bikes_available) else None,
             'timestamp': latest['hour'].strftime('%Y-%m-%d %H:%M')
         }
         
         return recommendation
     
-    def run_complete_analysis(self, hours_back=24):
-        raw_data = self.fetch_recent_data(hours_back)
+    @FUSION_STAGE_SECONDS.timed(stage='refresh_total')
+    def refresh_hours(self, dirty_hours=None, hours_back=24):
+        now = self.clock()
+        self.fetch_incremental(hours_back)
+        
+        if dirty_hours:
+            window_start = now - timedelta(hours=hours_back)
+            dirty_hours = [hour for hour in dirty_hours if hour >= window_start.replace(minute=0, second=0, microsecond=0)]
+            for source, points in self.refetch_hours(dirty_hours).items():
+                self.new_points[source].extend(points)
+            self.aggregator.thaw(dirty_hours)
+        
+        with FUSION_STAGE_SECONDS.time(stage='aggregate'):
+            for source, points in self.new_points.items():
+                if points:
+                    self.aggregator.add(source, points)
+            
+            for source, count in self.aggregator.readmit_late().items():
+                print(f"Re-opened closed hours for {count} late {source} points")
+            
+            self.aggregator.evict_before(now - timedelta(hours=hours_back))
+            self.aggregator.freeze_closed(now)
+            
+            fused_data = self.fill_gaps(self.aggregator.to_frame())
+        if fused_data.empty:
+            return None, None, None
+        
+        scored_data = self.calculate_outdoor_score(fused_data)
+        analysis = self.analyze_patterns(scored_data)
+        recommendation = self.get_current_recommendation(scored_data)
+        
+        return scored_data, analysis, recommendation
+    
+    @FUSION_STAGE_SECONDS.timed(stage='analysis_total')
+    def run_complete_analysis(self, hours_back=24, incremental=False, backend='firebase'):
+        if incremental:
+            raw_data = self.fetch_incremental(hours_back)
+        else:
+            raw_data = self.fetch_recent_data(hours_back, backend=backend)
         fused_data = self.fuse_data_sources(raw_data)
         
         if fused_data.empty:
@@ -0,0 +1,118 @@
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+
+SOURCE_PATHS = {
+    'motion': 'sensor_data',
+    'weather': 'open_data/weather',
+    'air_quality': 'open_data/air_quality',
+    'bikes': 'open_data/dublin_bikes'
+}
+
+INDEX_FIELD = 'unix_time'
+
+unindexed_paths = set()
+unindexed_lock = threading.Lock()
+
+
+def partition_key(unix_time):
+    return datetime.fromtimestamp(int(unix_time), tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def partition_keys(start_unix, end_unix, pad_days=1):
+    first = datetime.fromtimestamp(int(start_unix), tz=timezone.utc).date() - timedelta(days=pad_days)
+    last = datetime.fromtimestamp(int(end_unix), tz=timezone.utc).date() + timedelta(days=pad_days)
+    return [(first + timedelta(days=i)).strftime('%Y-%m-%d') for i in range((last - first).days + 1)]
+
+
+def index_rules():
+    rules = {}
+    for source_path in SOURCE_PATHS.values():
+        node = rules
+        for part in source_path.split('/'):
+            node = node.setdefault(part, {})
+        node['$date'] = {'.indexOn': [INDEX_FIELD]}
+    return {'rules': rules}
+
+
+def is_missing_index(error):
+    # Firebase rejects an unindexed order_by_child query with
+    # 'Index not defined, add ".indexOn": "..." for path ...'
+    return 'index not defined' in str(error).lower()
+
+
+def _is_unindexed(path):
+    with unindexed_lock:
+        return path in unindexed_paths
+
+
+def _note_unindexed(path, error):
+    with unindexed_lock:
+        if path in unindexed_paths:
+            return
+        unindexed_paths.add(path)
+    print(f"Range query on {path} failed, reading whole partitions instead "
+          f"(add \".indexOn\": [\"{INDEX_FIELD}\"], see python firebaseAccess.py --print-rules): {error}")
+
+
+def query_partition(ref, date_key, start_unix, end_unix=None):
+    partition = ref.child(date_key)
+    
+    if not _is_unindexed(ref.path):
+        try:
+            query = partition.order_by_child(INDEX_FIELD).start_at(start_unix)
+            if end_unix is not None:
+                query = query.end_at(end_unix)
+            return query.get() or {}
+        except Exception as e:
+            if not is_missing_index(e):
+                raise
+            _note_unindexed(ref.path, e)
+    
+    date_data = partition.get()
+    if not date_data:
+        return {}
+    
+    return {
+        key: point for key, point in date_data.items()
+        if start_unix <= point.get(INDEX_FIELD, 0) and (end_unix is None or point.get(INDEX_FIELD, 0) <= end_unix)
+    }
+
+
+def validate_indexes(sources):
+    report = {}
+    probe_key = partition_key(time.time())
+    
+    for source, ref in sources.items():
+        try:
+            ref.child(probe_key).order_by_child(INDEX_FIELD).limit_to_last(1).get()
+            report[source] = 'ok'
+        except Exception as e:
+            report[source] = 'missing' if is_missing_index(e) else f"error: {e}"
+    
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Firebase index rules used by the time-range readers')
+    parser.add_argument('--print-rules', action='store_true', help='print the .indexOn rules to merge into database.rules.json')
+    parser.add_argument('--validate', action='store_true', help='probe each source with an indexed query')
+    parser.add_argument('--config', default='firebase_config.json')
+    args = parser.parse_args()
+    
+    if args.print_rules or not args.validate:
+        print(json.dumps(index_rules(), indent=2))
+    
+    if args.validate:
+        from dataFusionAnalyzer import DataFusionAnalyzer
+        
+        analyzer = DataFusionAnalyzer(args.config)
+        for source, status in validate_indexes(analyzer.sources).items():
+            print(f"{source} ({SOURCE_PATHS[source]}): {status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+import time
+import threading
+from datetime import datetime
+from firebaseAccess import partition_key
+
+
+class FusionScheduler:
+    
+    def __init__(self, recompute, sources=None, debounce=2.0, max_delay=10.0, max_staleness=120):
+        self.recompute = recompute
+        self.sources = sources or {}
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_staleness = max_staleness
+        
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        
+        self.dirty_hours = set()
+        self.full_refresh = False
+        self.first_event = None
+        self.last_event = None
+        self.last_run = 0
+        
+        self.listeners = {}
+        self.listen_dates = None
+        
+        self.stats = {
+            'events': 0,
+            'recomputes': 0,
+            'partial_recomputes': 0,
+            'staleness_recomputes': 0,
+            'last_duration_ms': 0.0,
+            'last_error': None
+        }
+    
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='fusion-scheduler', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        self._close_listeners()
+    
+    def _hour(self, unix_time):
+        return datetime.fromtimestamp(unix_time).replace(minute=0, second=0, microsecond=0)
+    
+    def notify(self, source, unix_time=None):
+        now = time.time()
+        
+        with self.lock:
+            if unix_time is None:
+                self.full_refresh = True
+            else:
+                self.dirty_hours.add(self._hour(unix_time))
+            
+            if self.first_event is None:
+                self.first_event = now
+            self.last_event = now
+            self.stats['events'] += 1
+        
+        self.wake.set()
+    
+    def _points_from_event(self, event):
+        if event.data is None:
+            return None
+        
+        path = event.path.strip('/')
+        
+        if event.event_type == 'patch' or not path:
+            if isinstance(event.data, dict) and all(isinstance(point, dict) for point in event.data.values()):
+                return list(event.data.values())
+            return None
+        
+        if '/' not in path and isinstance(event.data, dict):
+            return [event.data]
+        
+        return None
+    
+    def _listener(self, source):
+        state = {'initial': True}
+        
+        def callback(event):
+            if state['initial']:
+                state['initial'] = False
+                return
+            
+            try:
+                points = self._points_from_event(event)
+                if points is None:
+                    self.notify(source)
+                    return
+                
+                for point in points:
+                    self.notify(source, point.get('unix_time'))
+            
+            except Exception as e:
+                print(f"Scheduler event error for {source}: {e}")
+                self.notify(source)
+        
+        return callback
+    
+    def _close_listeners(self):
+        for registration in self.listeners.values():
+            try:
+                registration.close()
+            except Exception as e:
+                print(f"Failed to close listener: {e}")
+        self.listeners = {}
+    
+    def _ensure_listeners(self):
+        now = time.time()
+        date_keys = (partition_key(now - 86400), partition_key(now))
+        if date_keys == self.listen_dates or not self.sources:
+            return
+        
+        self._close_listeners()
+        
+        for source, ref in self.sources.items():
+            for date_key in date_keys:
+                try:
+                    self.listeners[f"{source}/{date_key}"] = ref.child(date_key).listen(self._listener(source))
+                except Exception as e:
+                    print(f"Could not subscribe to {source}/{date_key}: {e}")
+        
+        self.listen_dates = date_keys
+    
+    def _due(self, now):
+        with self.lock:
+            if self.first_event is not None:
+                quiet = now - self.last_event >= self.debounce
+                overdue = now - self.first_event >= self.max_delay
+                if quiet or overdue:
+                    return True, False
+        
+        return False, now - self.last_run >= self.max_staleness
+    
+    def _take_dirty(self):
+        with self.lock:
+            dirty_hours = None if self.full_refresh else self.dirty_hours
+            self.dirty_hours = set()
+            self.full_refresh = False
+            self.first_event = None
+            self.last_event = None
+        return dirty_hours
+    
+    def _restore_dirty(self, dirty_hours):
+        now = time.time()
+        with self.lock:
+            if dirty_hours is None:
+                self.full_refresh = True
+            else:
+                self.dirty_hours |= dirty_hours
+            
+            if self.first_event is None:
+                self.first_event = now
+            self.last_event = now
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            self._ensure_listeners()
+            
+            now = time.time()
+            event_due, stale = self._due(now)
+            
+            if event_due or stale:
+                dirty_hours = self._take_dirty() if event_due else None
+                
+                start = time.time()
+                try:
+                    self.recompute(dirty_hours)
+                    self.stats['last_error'] = None
+                except Exception as e:
+                    print(f"Fusion Error: {e}")
+                    self.stats['last_error'] = str(e)
+                    if event_due:
+                        self._restore_dirty(dirty_hours)
+                
+                self.last_run = time.time()
+                self.stats['recomputes'] += 1
+                self.stats['last_duration_ms'] = round((self.last_run - start) * 1000, 1)
+                if dirty_hours is not None:
+                    self.stats['partial_recomputes'] += 1
+                elif stale:
+                    self.stats['staleness_recomputes'] += 1
+                continue
+            
+            with self.lock:
+                pending = self.first_event is not None
+                if pending:
+                    timeout = min(
+                        self.debounce - (now - self.last_event),
+                        self.max_delay - (now - self.first_event)
+                    )
+            
+            if pending:
+                self.stop_event.wait(max(0.05, timeout))
+            else:
+                self.wake.wait(max(0.5, self.max_staleness - (now - self.last_run)))
+                self.wake.clear()
+    
+    def get_stats(self):
+        stats = dict(self.stats)
+        with self.lock:
+            stats['pending_hours'] = len(self.dirty_hours)
+        stats['seconds_since_recompute'] = round(time.time() - self.last_run, 1) if self.last_run else None
+        stats['listening'] = sorted(self.listeners)
+        return stats
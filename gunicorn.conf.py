@@ -0,0 +1,32 @@
+import os
+import multiprocessing
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+
+
+def worker_exit(server, worker):
+    from app import stop_background_services
+    stop_background_services()
+
+
+def on_starting(server):
+    import shutil
+    from metrics import METRICS_DIR
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+
+def child_exit(server, worker):
+    from metrics import METRICS_DIR, mark_process_dead
+    mark_process_dead(METRICS_DIR, worker.pid)
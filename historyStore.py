@@ -0,0 +1,272 @@
+import os
+import json
+import uuid
+import argparse
+import pandas as pd
+from datetime import datetime
+from firebaseAccess import partition_keys
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+def _schemas():
+    return {
+        'motion': pa.schema([
+            ('timestamp', pa.timestamp('us')),
+            ('unix_time', pa.int64()),
+            ('motion_detected', pa.int8()),
+            ('motion_intensity', pa.float32()),
+            ('motion_area', pa.int32()),
+            ('brightness', pa.float32()),
+            ('device_id', pa.string())
+        ]),
+        'weather': pa.schema([
+            ('timestamp', pa.timestamp('us')),
+            ('unix_time', pa.int64()),
+            ('temperature', pa.float32()),
+            ('humidity', pa.float32()),
+            ('wind_speed', pa.float32()),
+            ('weather', pa.string()),
+            ('weather_description', pa.string())
+        ]),
+        'air_quality': pa.schema([
+            ('timestamp', pa.timestamp('us')),
+            ('unix_time', pa.int64()),
+            ('aqi', pa.float32()),
+            ('pm2_5', pa.float32()),
+            ('pm10', pa.float32())
+        ]),
+        'bikes': pa.schema([
+            ('timestamp', pa.timestamp('us')),
+            ('unix_time', pa.int64()),
+            ('total_bikes_available', pa.int32()),
+            ('average_occupancy', pa.float32())
+        ])
+    }
+
+
+def _marker_path(partition_dir):
+    return os.path.join(partition_dir, '_compaction.json')
+
+
+def _read_marker(partition_dir):
+    try:
+        with open(_marker_path(partition_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_marker(partition_dir, marker):
+    path = _marker_path(partition_dir)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(marker, f)
+    os.replace(tmp_path, path)
+
+
+def _finish_compaction(partition_dir):
+    # Completes (or rolls back) a compaction that was interrupted: inputs are
+    # only removed once the compacted output is in place
+    marker = _read_marker(partition_dir)
+    if marker is None:
+        return
+    
+    if os.path.exists(os.path.join(partition_dir, marker['output'])):
+        for name in marker['inputs']:
+            try:
+                os.remove(os.path.join(partition_dir, name))
+            except FileNotFoundError:
+                pass
+    else:
+        try:
+            os.remove(os.path.join(partition_dir, marker['output'] + '.tmp'))
+        except FileNotFoundError:
+            pass
+    
+    os.remove(_marker_path(partition_dir))
+
+
+class HistoryStore:
+    
+    def __init__(self, root_dir='history'):
+        if pa is None:
+            raise ImportError("HistoryStore requires pyarrow (pip install pyarrow)")
+        
+        self.root_dir = root_dir
+        self.schemas = _schemas()
+    
+    def _partition_dir(self, source, date_key):
+        return os.path.join(self.root_dir, source, f'date={date_key}')
+    
+    def _to_table(self, source, df):
+        schema = self.schemas[source]
+        
+        if 'timestamp' in df.columns:
+            df = df.assign(timestamp=pd.to_datetime(df['timestamp']))
+        elif 'unix_time' in df.columns:
+            df = df.assign(timestamp=pd.to_datetime(df['unix_time'], unit='s'))
+        
+        if 'unix_time' not in df.columns and 'timestamp' in df.columns:
+            df = df.assign(unix_time=[int(t.timestamp()) for t in df['timestamp'].dt.to_pydatetime()])
+        
+        columns = []
+        for field in schema:
+            if field.name in df.columns:
+                columns.append(pa.array(df[field.name], from_pandas=True).cast(field.type, safe=False))
+            else:
+                columns.append(pa.nulls(len(df), type=field.type))
+        
+        return pa.Table.from_arrays(columns, schema=schema)
+    
+    def _live_files(self, partition_dir):
+        names = sorted(os.listdir(partition_dir))
+        files = [name for name in names if name.endswith('.parquet')]
+        
+        # A compaction in progress lists its inputs and output; readers see the
+        # inputs until the output is in place and only the output afterwards
+        marker = _read_marker(partition_dir)
+        if marker:
+            if marker['output'] in files:
+                files = [name for name in files if name not in marker['inputs']]
+            else:
+                files = [name for name in files if name != marker['output']]
+        
+        return [os.path.join(partition_dir, name) for name in files]
+    
+    def append(self, source, records):
+        if source not in self.schemas:
+            raise ValueError(f"Unknown source: {source}")
+        
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        if df.empty:
+            return 0
+        
+        table = self._to_table(source, df)
+        unix_times = pd.Series(table.column('unix_time').to_pandas())
+        date_keys = pd.to_datetime(unix_times, unit='s', utc=True).dt.strftime('%Y-%m-%d')
+        
+        for date_key in date_keys.unique():
+            mask = pa.array((date_keys == date_key).to_numpy())
+            partition = table.filter(mask).sort_by('unix_time')
+            
+            partition_dir = self._partition_dir(source, date_key)
+            os.makedirs(partition_dir, exist_ok=True)
+            
+            filename = f'part-{int(datetime.now().timestamp())}-{uuid.uuid4().hex[:8]}.parquet'
+            pq.write_table(partition, os.path.join(partition_dir, filename))
+        
+        return table.num_rows
+    
+    def partitions(self, source, start_unix, end_unix):
+        files = []
+        
+        # Partitions are UTC dates; the padding day also covers stores written
+        # before that with local-date partitions
+        for date_key in partition_keys(start_unix, end_unix):
+            partition_dir = self._partition_dir(source, date_key)
+            if os.path.isdir(partition_dir):
+                files.extend(self._live_files(partition_dir))
+        
+        return files
+    
+    def read(self, source, start_unix, end_unix=None, columns=None):
+        end_unix = end_unix if end_unix is not None else int(datetime.now().timestamp())
+        
+        schema = self.schemas[source]
+        if columns is not None:
+            columns = [name for name in columns if name in schema.names]
+        
+        try:
+            table = self._scan(source, start_unix, end_unix, columns)
+        except FileNotFoundError:
+            # A compaction removed its inputs between listing and reading
+            table = self._scan(source, start_unix, end_unix, columns)
+        
+        df = table.to_pandas()
+        if 'unix_time' in df.columns:
+            df = df.sort_values('unix_time', kind='stable').reset_index(drop=True)
+        
+        return df
+    
+    def _scan(self, source, start_unix, end_unix, columns):
+        schema = self.schemas[source]
+        files = self.partitions(source, start_unix, end_unix)
+        if not files:
+            return schema.empty_table().select(columns or schema.names)
+        
+        dataset = ds.dataset(files, schema=schema, format='parquet')
+        return dataset.to_table(
+            columns=columns,
+            filter=(ds.field('unix_time') >= start_unix) & (ds.field('unix_time') <= end_unix)
+        )
+    
+    def latest_unix(self, source):
+        source_dir = os.path.join(self.root_dir, source)
+        if not os.path.isdir(source_dir):
+            return None
+        
+        for partition in sorted(os.listdir(source_dir), reverse=True):
+            files = self._live_files(os.path.join(source_dir, partition))
+            if not files:
+                continue
+            
+            table = ds.dataset(files, schema=self.schemas[source], format='parquet').to_table(columns=['unix_time'])
+            if table.num_rows:
+                return int(pc.max(table.column('unix_time')).as_py())
+        
+        return None
+    
+    def compact(self, source, date_key):
+        partition_dir = self._partition_dir(source, date_key)
+        if not os.path.isdir(partition_dir):
+            return 0
+        
+        _finish_compaction(partition_dir)
+        
+        files = self._live_files(partition_dir)
+        if len(files) < 2:
+            return len(files)
+        
+        table = ds.dataset(files, schema=self.schemas[source], format='parquet').to_table()
+        table = table.sort_by('unix_time')
+        
+        output = f'part-compacted-{uuid.uuid4().hex[:8]}.parquet'
+        pending = os.path.join(partition_dir, output + '.tmp')
+        pq.write_table(table, pending)
+        
+        _write_marker(partition_dir, {
+            'output': output,
+            'inputs': [os.path.basename(path) for path in files]
+        })
+        os.replace(pending, os.path.join(partition_dir, output))
+        _finish_compaction(partition_dir)
+        
+        return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive Firebase history into the local columnar store')
+    parser.add_argument('--hours', type=int, default=24)
+    parser.add_argument('--root', default='history')
+    parser.add_argument('--config', default='firebase_config.json')
+    args = parser.parse_args()
+    
+    from dataFusionAnalyzer import DataFusionAnalyzer
+    
+    store = HistoryStore(args.root)
+    analyzer = DataFusionAnalyzer(args.config, store=store)
+    counts = analyzer.archive_to_store(hours_back=args.hours)
+    
+    for source, count in counts.items():
+        print(f"{source}: {count} records archived")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import pandas as pd
+from datetime import datetime, timedelta
+
+
+SOURCE_AGGREGATIONS = {
+    'motion': [
+        ('motion_detected', 'sum', 'motion_events'),
+        ('motion_intensity', 'mean', 'avg_intensity'),
+        ('motion_area', 'mean', 'avg_area'),
+        ('brightness', 'mean', 'avg_brightness')
+    ],
+    'weather': [
+        ('temperature', 'last', 'temperature'),
+        ('humidity', 'last', 'humidity'),
+        ('wind_speed', 'mean', 'wind_speed'),
+        ('weather', 'last', 'weather'),
+        ('weather_description', 'last', 'weather_description')
+    ],
+    'air_quality': [
+        ('aqi', 'last', 'aqi'),
+        ('pm2_5', 'last', 'pm2_5'),
+        ('pm10', 'last', 'pm10')
+    ],
+    'bikes': [
+        ('total_bikes_available', 'last', 'total_bikes_available'),
+        ('average_occupancy', 'last', 'average_occupancy')
+    ]
+}
+
+
+class HourBucket:
+    
+    __slots__ = ('sums', 'counts', 'last', 'last_order', 'points', 'frozen', 'row')
+    
+    def __init__(self):
+        self.sums = {}
+        self.counts = {}
+        self.last = {}
+        self.last_order = {}
+        self.points = 0
+        self.frozen = False
+        self.row = None
+
+
+class HourlyAggregator:
+    
+    def __init__(self, grace_minutes=10):
+        self.grace = timedelta(minutes=grace_minutes)
+        self.buckets = {source: {} for source in SOURCE_AGGREGATIONS}
+        self.late_points = 0
+        self.late = {}
+    
+    def reset(self):
+        self.buckets = {source: {} for source in SOURCE_AGGREGATIONS}
+        self.late_points = 0
+        self.late = {}
+    
+    @property
+    def empty(self):
+        return not any(self.buckets.values())
+    
+    def _hour_key(self, point):
+        timestamp = point.get('timestamp')
+        if isinstance(timestamp, str) and len(timestamp) >= 13:
+            return timestamp[:13]
+        return datetime.fromtimestamp(point.get('unix_time', 0)).strftime('%Y-%m-%dT%H')
+    
+    def add(self, source, points):
+        buckets = self.buckets[source]
+        aggregations = SOURCE_AGGREGATIONS[source]
+        touched = set()
+        
+        for point in points:
+            hour_key = self._hour_key(point)
+            bucket = buckets.get(hour_key)
+            if bucket is None:
+                bucket = buckets[hour_key] = HourBucket()
+            elif bucket.frozen:
+                self.late_points += 1
+                self.late.setdefault(source, []).append(point)
+                continue
+            
+            order = (point.get('unix_time', 0), point.get('timestamp', ''))
+            
+            for field, how, _ in aggregations:
+                value = point.get(field)
+                if value is None or value != value:
+                    continue
+                
+                if how == 'last':
+                    if field not in bucket.last_order or order >= bucket.last_order[field]:
+                        bucket.last[field] = value
+                        bucket.last_order[field] = order
+                else:
+                    bucket.sums[field] = bucket.sums.get(field, 0) + value
+                    bucket.counts[field] = bucket.counts.get(field, 0) + 1
+            
+            bucket.points += 1
+            bucket.row = None
+            touched.add(hour_key)
+        
+        return touched
+    
+    def freeze_closed(self, now=None):
+        now = now or datetime.now()
+        cutoff = (now - self.grace).strftime('%Y-%m-%dT%H')
+        
+        for source, buckets in self.buckets.items():
+            for hour_key, bucket in buckets.items():
+                if not bucket.frozen and hour_key < cutoff:
+                    bucket.row = self._row(source, hour_key)
+                    bucket.frozen = True
+    
+    def thaw(self, hours):
+        hour_keys = {hour.strftime('%Y-%m-%dT%H') for hour in hours}
+        for buckets in self.buckets.values():
+            for hour_key in hour_keys & buckets.keys():
+                buckets[hour_key].frozen = False
+    
+    def readmit_late(self):
+        late, self.late = self.late, {}
+        
+        for source, points in late.items():
+            buckets = self.buckets[source]
+            for hour_key in {self._hour_key(point) for point in points} & buckets.keys():
+                buckets[hour_key].frozen = False
+            self.add(source, points)
+        
+        return {source: len(points) for source, points in late.items()}
+    
+    def evict_before(self, start_time):
+        start_key = start_time.strftime('%Y-%m-%dT%H')
+        for source, buckets in self.buckets.items():
+            self.buckets[source] = {
+                hour_key: bucket for hour_key, bucket in buckets.items()
+                if hour_key >= start_key
+            }
+    
+    def _row(self, source, hour_key):
+        bucket = self.buckets[source][hour_key]
+        if bucket.row is not None:
+            return bucket.row
+        
+        row = {}
+        for field, how, column in SOURCE_AGGREGATIONS[source]:
+            if how == 'last':
+                row[column] = bucket.last.get(field)
+            elif how == 'sum':
+                row[column] = bucket.sums.get(field, 0)
+            else:
+                count = bucket.counts.get(field, 0)
+                row[column] = bucket.sums[field] / count if count else None
+        
+        bucket.row = row
+        return row
+    
+    def source_frame(self, source):
+        buckets = self.buckets[source]
+        if not buckets:
+            return pd.DataFrame()
+        
+        hour_keys = sorted(buckets)
+        rows = [self._row(source, hour_key) for hour_key in hour_keys]
+        
+        frame = pd.DataFrame(rows, columns=[column for _, _, column in SOURCE_AGGREGATIONS[source]])
+        frame.insert(0, 'hour', pd.to_datetime(hour_keys, format='%Y-%m-%dT%H'))
+        return frame
+    
+    def to_frame(self):
+        hour_keys = sorted(set().union(*self.buckets.values()))
+        if not hour_keys:
+            return pd.DataFrame()
+        
+        fused = pd.DataFrame({'hour': pd.to_datetime(hour_keys, format='%Y-%m-%dT%H')})
+        columns = ['hour']
+        
+        for source, aggregations in SOURCE_AGGREGATIONS.items():
+            columns += [column for _, _, column in aggregations]
+            frame = self.source_frame(source)
+            if not frame.empty:
+                fused = fused.merge(frame, on='hour', how='left')
+        
+        return fused.reindex(columns=columns)
+    
+    def get_stats(self):
+        stats = {'late_points': self.late_points, 'pending_late': sum(len(points) for points in self.late.values())}
+        for source, buckets in self.buckets.items():
+            stats[source] = {
+                'hours': len(buckets),
+                'frozen': sum(1 for bucket in buckets.values() if bucket.frozen),
+                'points': sum(bucket.points for bucket in buckets.values())
+            }
+        return stats
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import REGISTRY
+
+
+HTTP_CACHE_REQUESTS = REGISTRY.counter(
+    'http_cache_requests_total', 'Cached HTTP lookups by endpoint and outcome', ('endpoint', 'result')
+)
+
+
+class CachedHttpClient:
+    
+    def __init__(self, ttl=1800, stale_ttl=6 * 3600, cache_path=os.path.join('data', 'http_cache.json'),
+                 pool_size=10, timeout=10, retries=2):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cache_path = cache_path
+        self.timeout = timeout
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self.lock = threading.Lock()
+        self.persist_lock = threading.Lock()
+        self.cache = {}
+        self.inflight = {}
+        self.refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='http-refresh')
+        
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+        self._load()
+    
+    def cache_key(self, endpoint, lat=None, lon=None, cnt=None):
+        lat = None if lat is None else round(float(lat), 4)
+        lon = None if lon is None else round(float(lon), 4)
+        return f"{endpoint}|{lat}|{lon}|{cnt}"
+    
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        
+        try:
+            with open(self.cache_path) as f:
+                self.cache = json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable HTTP cache {self.cache_path}: {e}")
+            self.cache = {}
+    
+    def _persist(self):
+        if not self.cache_path:
+            return
+        
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir and not os.path.exists(cache_dir):
+                os.makedirs(cache_dir, exist_ok=True)
+            
+            with self.persist_lock:
+                with self.lock:
+                    snapshot = dict(self.cache)
+                
+                tmp_file = tempfile.NamedTemporaryFile('w', dir=cache_dir or '.', suffix='.tmp', delete=False)
+                try:
+                    with tmp_file:
+                        json.dump(snapshot, tmp_file)
+                    os.replace(tmp_file.name, self.cache_path)
+                except Exception:
+                    os.remove(tmp_file.name)
+                    raise
+        except Exception as e:
+            print(f"Failed to persist HTTP cache: {e}")
+    
+    def _fetch(self, key, url, params):
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+        
+        if not leader:
+            return future.result(timeout=self.timeout * 3)
+        
+        try:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            
+            with self.lock:
+                self.cache[key] = {'data': data, 'fetched': time.time()}
+            self._persist()
+            
+            future.set_result(data)
+            return data
+        
+        except Exception as e:
+            with self.lock:
+                self.stats['errors'] += 1
+            future.set_exception(e)
+            raise
+        
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+    
+    def _refresh(self, key, url, params):
+        try:
+            self._fetch(key, url, params)
+        except Exception as e:
+            print(f"Background refresh failed for {key}: {e}")
+    
+    def get_json(self, url, params, endpoint, lat=None, lon=None, cnt=None, ttl=None):
+        key = self.cache_key(endpoint, lat, lon, cnt)
+        ttl = self.ttl if ttl is None else ttl
+        result = 'miss'
+        
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                age = time.time() - entry['fetched']
+                if age < ttl:
+                    result = 'hit'
+                    self.stats['hits'] += 1
+                elif age < ttl + self.stale_ttl:
+                    result = 'stale'
+                    self.stats['stale_hits'] += 1
+                    refreshing = key in self.inflight
+            if result == 'miss':
+                self.stats['misses'] += 1
+        
+        HTTP_CACHE_REQUESTS.inc(endpoint=endpoint, result=result)
+        
+        if result == 'miss':
+            return self._fetch(key, url, params)
+        
+        if result == 'stale' and not refreshing:
+            self.refresh_pool.submit(self._refresh, key, url, dict(params))
+        
+        return entry['data']
+    
+    def invalidate(self, endpoint=None):
+        with self.lock:
+            if endpoint is None:
+                self.cache = {}
+            else:
+                self.cache = {key: entry for key, entry in self.cache.items() if not key.startswith(f"{endpoint}|")}
+        self._persist()
+    
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self.cache)
+            stats['inflight'] = len(self.inflight)
+        return stats
+    
+    def close(self):
+        self.refresh_pool.shutdown(wait=False)
+        self.session.close()
+
+
+default_client = None
+default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    global default_client
+    with default_client_lock:
+        if default_client is None:
+            default_client = CachedHttpClient()
+        return default_client
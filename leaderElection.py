@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import uuid
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+def _atomic_write(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+
+class FileLock:
+    
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+    
+    @property
+    def held(self):
+        return self.fd is not None
+    
+    def try_acquire(self):
+        if self.fd is not None:
+            return True
+        
+        lock_dir = os.path.dirname(self.path)
+        if lock_dir and not os.path.exists(lock_dir):
+            os.makedirs(lock_dir, exist_ok=True)
+        
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps({'pid': os.getpid(), 'since': time.time()}).encode('utf-8'))
+        os.fsync(fd)
+        self.fd = fd
+        return True
+    
+    def release(self):
+        if self.fd is None:
+            return
+        
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+    
+    def holder(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+class LeaderElector:
+    
+    def __init__(self, name, on_elected=None, on_stepped_down=None, lock_dir='data', retry_interval=5.0):
+        self.name = name
+        self.lock = FileLock(os.path.join(lock_dir, f'{name}.lock'))
+        self.on_elected = on_elected
+        self.on_stepped_down = on_stepped_down
+        self.retry_interval = retry_interval
+        
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.elected_at = None
+    
+    @property
+    def is_leader(self):
+        return self.lock.held
+    
+    def try_elect(self):
+        if self.lock.held:
+            return True
+        if not self.lock.try_acquire():
+            return False
+        
+        self.elected_at = time.time()
+        print(f"{self.name}: pid {os.getpid()} elected leader")
+        
+        if self.on_elected is not None:
+            try:
+                self.on_elected()
+            except Exception as e:
+                print(f"{self.name}: leader start-up failed, stepping down: {e}")
+                self.lock.release()
+                self.elected_at = None
+                return False
+        return True
+    
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return self.is_leader
+        
+        elected = self.try_elect()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._campaign, name=f'{self.name}-election', daemon=True)
+        self.thread.start()
+        return elected
+    
+    def _campaign(self):
+        while not self.stop_event.wait(self.retry_interval):
+            if not self.lock.held:
+                self.try_elect()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.retry_interval + 1)
+        
+        if self.lock.held:
+            if self.on_stepped_down is not None:
+                try:
+                    self.on_stepped_down()
+                except Exception as e:
+                    print(f"{self.name}: step-down failed: {e}")
+            self.lock.release()
+            self.elected_at = None
+    
+    def get_status(self):
+        return {
+            'name': self.name,
+            'is_leader': self.is_leader,
+            'pid': os.getpid(),
+            'leader': self.lock.holder(),
+            'elected_at': self.elected_at
+        }
+
+
+class CommandSpool:
+    
+    def __init__(self, command_dir, ttl=30):
+        self.command_dir = command_dir
+        self.ttl = ttl
+        os.makedirs(command_dir, exist_ok=True)
+    
+    def submit(self, command, timeout=5.0):
+        command_id = f"{time.time():.6f}-{uuid.uuid4().hex[:8]}"
+        base = os.path.join(self.command_dir, command_id)
+        _atomic_write(base + '.json', dict(command, pid=os.getpid(), time=time.time()))
+        
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            result = _read_json(base + '.result')
+            if result is not None:
+                os.remove(base + '.result')
+                return result
+            time.sleep(0.1)
+        return None
+    
+    def drain(self, handler):
+        now = time.time()
+        
+        for filename in sorted(os.listdir(self.command_dir)):
+            path = os.path.join(self.command_dir, filename)
+            
+            if filename.endswith('.result'):
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+                continue
+            if not filename.endswith('.json'):
+                continue
+            
+            command = _read_json(path)
+            os.remove(path)
+            if command is None or now - command.get('time', 0) > self.ttl:
+                continue
+            
+            try:
+                result = handler(command)
+            except Exception as e:
+                result = {'status': 'error', 'message': str(e)}
+            _atomic_write(path[:-len('.json')] + '.result', result)
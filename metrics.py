@@ -0,0 +1,350 @@
+import os
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from leaderElection import _atomic_write, _read_json, _pid_alive
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(label_names, labels):
+    if set(labels) != set(label_names):
+        raise ValueError(f"Expected labels {label_names}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in label_names)
+
+
+def _format_labels(label_names, key, extra=None):
+    pairs = list(zip(label_names, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+class Metric:
+    
+    kind = 'untyped'
+    
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}
+    
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+    
+    def render(self):
+        lines = self._header()
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+    
+    def snapshot(self):
+        with self.lock:
+            values = [[list(key), value] for key, value in self.values.items()]
+        return {'kind': self.kind, 'documentation': self.documentation, 'labels': list(self.label_names), 'values': values}
+    
+    def merge(self, values):
+        with self.lock:
+            for key, value in values:
+                self.values[tuple(key)] = value
+
+
+class Counter(Metric):
+    
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.label_names, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(_label_key(self.label_names, labels), 0)
+    
+    def merge(self, values):
+        with self.lock:
+            for key, value in values:
+                key = tuple(key)
+                self.values[key] = self.values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    
+    kind = 'gauge'
+    
+    def set(self, value, **labels):
+        key = _label_key(self.label_names, labels)
+        with self.lock:
+            self.values[key] = value
+    
+    def clear(self):
+        with self.lock:
+            self.values = {}
+
+
+class Histogram(Metric):
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        key = _label_key(self.label_names, labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def timed(self, **labels):
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def summary(self, **labels):
+        with self.lock:
+            series = self.values.get(_label_key(self.label_names, labels))
+            if series is None:
+                return {'count': 0, 'sum': 0.0}
+            return {'count': series['count'], 'sum': series['sum']}
+    
+    def snapshot(self):
+        with self.lock:
+            values = [[list(key), dict(series, counts=list(series['counts']))] for key, series in self.values.items()]
+        return {'kind': self.kind, 'documentation': self.documentation, 'labels': list(self.label_names),
+                'buckets': list(self.buckets), 'values': values}
+    
+    def merge(self, values):
+        with self.lock:
+            for key, other in values:
+                series = self.values.setdefault(tuple(key), {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+                series['counts'] = [a + b for a, b in zip(series['counts'], other['counts'])]
+                series['sum'] += other['sum']
+                series['count'] += other['count']
+    
+    def render(self):
+        lines = self._header()
+        with self.lock:
+            for key, series in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    labels = _format_labels(self.label_names, key, ('le', repr(float(bound))))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, key, ('le', '+Inf'))
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+    
+    def _get_or_create(self, cls, name, documentation, labels, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, documentation, labels, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(labels):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+    
+    def counter(self, name, documentation, labels=()):
+        return self._get_or_create(Counter, name, documentation, labels)
+    
+    def gauge(self, name, documentation, labels=()):
+        return self._get_or_create(Gauge, name, documentation, labels)
+    
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labels, buckets=buckets)
+    
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+    
+    def snapshot(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+    
+    def merge(self, snapshot, gauges=True):
+        for name, data in snapshot.items():
+            if data['kind'] == 'gauge' and not gauges:
+                continue
+            if data['kind'] == 'histogram':
+                metric = self.histogram(name, data['documentation'], data['labels'], buckets=data['buckets'])
+            else:
+                metric = getattr(self, data['kind'])(name, data['documentation'], data['labels'])
+            metric.merge(data['values'])
+
+
+def _dead_path(directory):
+    return os.path.join(directory, 'dead.json')
+
+
+def _dump_pids(directory):
+    return [
+        int(filename[:-len('.json')]) for filename in os.listdir(directory)
+        if filename.endswith('.json') and filename[:-len('.json')].isdigit()
+    ]
+
+
+def collect(directory):
+    merged = Registry()
+    dead = _read_json(_dead_path(directory))
+    if dead is not None:
+        merged.merge(dead, gauges=False)
+    
+    dumps = []
+    for pid in _dump_pids(directory):
+        dump = _read_json(os.path.join(directory, f'{pid}.json'))
+        if dump is not None:
+            dumps.append(dump)
+    
+    for dump in sorted(dumps, key=lambda dump: dump['updated']):
+        merged.merge(dump['metrics'], gauges=_pid_alive(dump['pid']))
+    return merged
+
+
+def mark_process_dead(directory, pid):
+    path = os.path.join(directory, f'{pid}.json')
+    dump = _read_json(path)
+    if dump is None:
+        return
+    
+    dead = Registry()
+    dead.merge(_read_json(_dead_path(directory)) or {}, gauges=False)
+    dead.merge(dump['metrics'], gauges=False)
+    _atomic_write(_dead_path(directory), dead.snapshot())
+    os.remove(path)
+
+
+class MultiprocessExporter:
+    
+    def __init__(self, registry, directory, interval=5.0, before_dump=None):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.before_dump = before_dump
+        self.stop_event = threading.Event()
+        self.thread = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def dump(self):
+        if self.before_dump is not None:
+            self.before_dump()
+        _atomic_write(os.path.join(self.directory, f'{os.getpid()}.json'), {
+            'pid': os.getpid(),
+            'updated': time.time(),
+            'metrics': self.registry.snapshot()
+        })
+    
+    def _dump_loop(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.dump()
+            except Exception as e:
+                print(f"Metrics dump failed: {e}")
+    
+    def start(self):
+        others = [pid for pid in _dump_pids(self.directory) if pid != os.getpid() and _pid_alive(pid)]
+        if not others:
+            for filename in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, filename))
+        
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._dump_loop, name='metrics-dump', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 1)
+        self.dump()
+    
+    def render(self):
+        self.dump()
+        return collect(self.directory).render()
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join('data', 'metrics'))
+
+FUSION_STAGE_SECONDS = REGISTRY.histogram(
+    'fusion_stage_seconds', 'Time spent in each data fusion stage', ('stage',)
+)
+FUSION_RECORDS_FETCHED = REGISTRY.counter(
+    'fusion_records_fetched_total', 'Records fetched per source', ('source',)
+)
+FUSION_FETCH_ERRORS = REGISTRY.counter(
+    'fusion_fetch_errors_total', 'Failed Firebase reads per source', ('source',)
+)
+FORECAST_STAGE_SECONDS = REGISTRY.histogram(
+    'forecast_stage_seconds', 'Time spent in each forecasting stage', ('stage',)
+)
+FORECAST_API_ERRORS = REGISTRY.counter(
+    'forecast_api_errors_total', 'Failed OpenWeatherMap requests that fell back to defaults', ('endpoint',)
+)
+MOTION_FRAMES_PROCESSED = REGISTRY.counter(
+    'motion_frames_processed_total', 'Frames run through motion detection', ('device_id',)
+)
+MOTION_READ_FAILURES = REGISTRY.counter(
+    'motion_read_failures_total', 'Camera reads that returned no frame', ('device_id',)
+)
+MOTION_FRAME_SECONDS = REGISTRY.histogram(
+    'motion_frame_seconds', 'Motion detection time per frame', ('device_id',),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.25)
+)
+CAMERA_FPS = REGISTRY.gauge(
+    'camera_fps', 'Frames per second from the latest camera worker heartbeat', ('device_id',)
+)
+CAMERA_FRAMES = REGISTRY.gauge(
+    'camera_frames_processed', 'Frames processed by each camera worker process', ('device_id',)
+)
+FUSION_SECONDS_SINCE_RECOMPUTE = REGISTRY.gauge(
+    'fusion_seconds_since_recompute', 'Age of the dashboard fusion result'
+)
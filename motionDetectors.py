@@ -0,0 +1,160 @@
+import cv2
+import numpy as np
+from abc import ABC, abstractmethod
+
+
+class MotionDetector(ABC):
+    
+    name = 'base'
+    
+    def __init__(self, threshold=25, min_area=500):
+        self.threshold = threshold
+        self.base_min_area = min_area
+        self.min_area = min_area
+        self.dilate_iterations = 2
+        self.mask = None
+        self.primed = False
+    
+    def configure(self, shape, scale=1.0):
+        self.min_area = self.base_min_area * scale * scale
+        self.dilate_iterations = max(1, int(round(2 * scale)))
+        self.mask = np.empty(shape, dtype=np.uint8)
+        self.reset()
+    
+    def reset(self):
+        self.primed = False
+    
+    def prime(self, gray):
+        self.primed = True
+    
+    @abstractmethod
+    def foreground(self, gray, want_boxes):
+        pass
+    
+    def _contours(self, mask, want_boxes):
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        motion_detected = 0
+        total_area = 0
+        boxes = []
+        
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area > self.min_area:
+                motion_detected = 1
+                total_area += area
+                if want_boxes:
+                    boxes.append(cv2.boundingRect(contour))
+        
+        return motion_detected, total_area, boxes
+    
+    def detect(self, gray, want_boxes=True):
+        if self.mask is None or self.mask.shape != gray.shape:
+            self.configure(gray.shape)
+        
+        if not self.primed:
+            self.prime(gray)
+            return 0, 0, []
+        
+        return self.foreground(gray, want_boxes)
+
+
+class FrameDiffDetector(MotionDetector):
+    
+    name = 'frame_diff'
+    
+    def configure(self, shape, scale=1.0):
+        super().configure(shape, scale)
+        self.previous = np.empty(shape, dtype=np.uint8)
+        self.delta = np.empty(shape, dtype=np.uint8)
+        self.thresholded = np.empty(shape, dtype=np.uint8)
+    
+    def prime(self, gray):
+        np.copyto(self.previous, gray)
+        self.primed = True
+    
+    def foreground(self, gray, want_boxes):
+        cv2.absdiff(self.previous, gray, dst=self.delta)
+        cv2.threshold(self.delta, self.threshold, 255, cv2.THRESH_BINARY, dst=self.thresholded)
+        cv2.dilate(self.thresholded, None, dst=self.mask, iterations=self.dilate_iterations)
+        np.copyto(self.previous, gray)
+        
+        return self._contours(self.mask, want_boxes)
+
+
+class RunningAverageDetector(MotionDetector):
+    
+    name = 'running_average'
+    
+    def __init__(self, threshold=25, min_area=500, alpha=0.05):
+        super().__init__(threshold, min_area)
+        self.alpha = alpha
+    
+    def configure(self, shape, scale=1.0):
+        super().configure(shape, scale)
+        self.average = np.empty(shape, dtype=np.float32)
+        self.background = np.empty(shape, dtype=np.uint8)
+        self.delta = np.empty(shape, dtype=np.uint8)
+        self.thresholded = np.empty(shape, dtype=np.uint8)
+    
+    def prime(self, gray):
+        self.average[...] = gray
+        self.primed = True
+    
+    def foreground(self, gray, want_boxes):
+        cv2.convertScaleAbs(self.average, dst=self.background)
+        cv2.absdiff(self.background, gray, dst=self.delta)
+        cv2.accumulateWeighted(gray, self.average, self.alpha)
+        cv2.threshold(self.delta, self.threshold, 255, cv2.THRESH_BINARY, dst=self.thresholded)
+        cv2.dilate(self.thresholded, None, dst=self.mask, iterations=self.dilate_iterations)
+        
+        return self._contours(self.mask, want_boxes)
+
+
+class BackgroundSubtractorDetector(MotionDetector):
+    
+    def __init__(self, method='MOG2', threshold=25, min_area=500, history=500, learning_rate=-1):
+        super().__init__(threshold, min_area)
+        self.method = method.upper()
+        self.name = self.method.lower()
+        self.history = history
+        self.learning_rate = learning_rate
+        self.subtractor = None
+    
+    def configure(self, shape, scale=1.0):
+        super().configure(shape, scale)
+        self.raw_mask = np.empty(shape, dtype=np.uint8)
+        self.thresholded = np.empty(shape, dtype=np.uint8)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    
+    def reset(self):
+        super().reset()
+        if self.method == 'KNN':
+            self.subtractor = cv2.createBackgroundSubtractorKNN(history=self.history, detectShadows=True)
+        else:
+            self.subtractor = cv2.createBackgroundSubtractorMOG2(history=self.history, varThreshold=16, detectShadows=True)
+    
+    def prime(self, gray):
+        self.subtractor.apply(gray, self.raw_mask, 1.0)
+        self.primed = True
+    
+    def foreground(self, gray, want_boxes):
+        self.subtractor.apply(gray, self.raw_mask, self.learning_rate)
+        cv2.threshold(self.raw_mask, 200, 255, cv2.THRESH_BINARY, dst=self.thresholded)
+        cv2.morphologyEx(self.thresholded, cv2.MORPH_OPEN, self.kernel, dst=self.mask)
+        
+        return self._contours(self.mask, want_boxes)
+
+
+DETECTORS = {
+    'frame_diff': FrameDiffDetector,
+    'running_average': RunningAverageDetector,
+    'mog2': lambda: BackgroundSubtractorDetector('MOG2'),
+    'knn': lambda: BackgroundSubtractorDetector('KNN')
+}
+
+
+def create_detector(name='frame_diff'):
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown motion detector: {name} (choose from {', '.join(DETECTORS)})")
+    return DETECTORS[name]()
@@ -0,0 +1,225 @@
+import time
+import threading
+from collections import deque
+import cv2
+import numpy as np
+
+
+class StageStats:
+    
+    def __init__(self, name, window=120):
+        self.name = name
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.count = 0
+        self.dropped = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.recent = deque(maxlen=window)
+    
+    def record(self, latency, dropped=0):
+        now = time.time()
+        with self.lock:
+            self.count += 1
+            self.dropped += dropped
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.recent.append((now, latency))
+    
+    def snapshot(self):
+        with self.lock:
+            if len(self.recent) >= 2:
+                span = self.recent[-1][0] - self.recent[0][0]
+                fps = (len(self.recent) - 1) / span if span > 0 else 0.0
+                recent_latency = sum(latency for _, latency in self.recent) / len(self.recent)
+            else:
+                fps = 0.0
+                recent_latency = self.recent[-1][1] if self.recent else 0.0
+            
+            return {
+                'frames': self.count,
+                'dropped': self.dropped,
+                'fps': round(fps, 1),
+                'latency_ms': round(recent_latency * 1000, 1),
+                'avg_latency_ms': round(self.latency_total / self.count * 1000, 1) if self.count else 0.0,
+                'max_latency_ms': round(self.latency_max * 1000, 1)
+            }
+
+
+class FrameRing:
+    
+    def __init__(self, capacity, shape, dtype=np.uint8):
+        if capacity < 3:
+            raise ValueError("FrameRing needs at least 3 slots")
+        
+        self.frames = [np.empty(shape, dtype=dtype) for _ in range(capacity)]
+        self.timestamps = [0.0] * capacity
+        self.sequences = [0] * capacity
+        self.condition = threading.Condition()
+        self.latest = -1
+        self.reading = -1
+        self.sequence = 0
+    
+    def acquire_write_slot(self):
+        with self.condition:
+            slot = (self.latest + 1) % len(self.frames)
+            while slot == self.latest or slot == self.reading:
+                slot = (slot + 1) % len(self.frames)
+            return slot
+    
+    def publish(self, slot, timestamp):
+        with self.condition:
+            self.sequence += 1
+            self.sequences[slot] = self.sequence
+            self.timestamps[slot] = timestamp
+            self.latest = slot
+            self.condition.notify_all()
+    
+    def acquire_latest(self, last_sequence, timeout=0.5):
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.sequence > last_sequence, timeout):
+                return None
+            self.reading = self.latest
+            return self.reading, self.sequences[self.reading], self.timestamps[self.reading]
+    
+    def release(self):
+        with self.condition:
+            self.reading = -1
+
+
+class MotionPipeline:
+    
+    def __init__(self, sensor, display=True, ring_size=4, report_interval=10):
+        self.sensor = sensor
+        self.display = display
+        self.ring_size = ring_size
+        self.report_interval = report_interval
+        
+        self.stop_event = threading.Event()
+        self.ring = None
+        self.threads = []
+        
+        self.display_lock = threading.Lock()
+        self.display_frame = None
+        self.display_sequence = 0
+        
+        self.stats = {
+            'capture': StageStats('capture'),
+            'process': StageStats('process'),
+            'display': StageStats('display')
+        }
+    
+    def _capture_loop(self):
+        cap = self.sensor.cap
+        
+        while not self.stop_event.is_set():
+            slot = self.ring.acquire_write_slot()
+            buffer = self.ring.frames[slot]
+            
+            start = time.time()
+            ret, frame = cap.read(buffer)
+            if not ret:
+                print("Capture stage: camera returned no frame")
+                self.stop_event.set()
+                break
+            
+            if frame is not buffer:
+                np.copyto(buffer, frame)
+            
+            captured = time.time()
+            self.ring.publish(slot, captured)
+            self.stats['capture'].record(captured - start)
+    
+    def _process_loop(self):
+        last_sequence = 0
+        
+        while not self.stop_event.is_set():
+            acquired = self.ring.acquire_latest(last_sequence)
+            if acquired is None:
+                continue
+            
+            slot, sequence, captured = acquired
+            dropped = sequence - last_sequence - 1 if last_sequence else 0
+            last_sequence = sequence
+            
+            try:
+                frame = self.ring.frames[slot]
+                motion_detected, motion_intensity, motion_area, brightness, boxes = self.sensor.process_frame(frame)
+                
+                if self.display:
+                    with self.display_lock:
+                        if self.display_frame is None:
+                            self.display_frame = np.empty_like(frame)
+                        np.copyto(self.display_frame, frame)
+                        self.sensor.draw_overlay(self.display_frame, motion_detected, motion_intensity, boxes)
+                        self.display_sequence = sequence
+            finally:
+                self.ring.release()
+            
+            self.sensor.record_point(motion_detected, motion_intensity, motion_area, brightness)
+            self.stats['process'].record(time.time() - captured, dropped)
+            
+            if not self.sensor.is_collecting:
+                self.stop_event.set()
+    
+    def get_stats(self):
+        return {name: stage.snapshot() for name, stage in self.stats.items()}
+    
+    def _report(self):
+        stats = self.get_stats()
+        print(" | ".join(
+            f"{name}: {stage['fps']} fps, {stage['latency_ms']} ms, dropped {stage['dropped']}"
+            for name, stage in stats.items()
+            if name != 'display' or self.display
+        ))
+    
+    def run(self):
+        ret, frame = self.sensor.cap.read()
+        if not ret:
+            print("Error: Could not read from webcam")
+            return
+        
+        self.ring = FrameRing(self.ring_size, frame.shape, frame.dtype)
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name='motion-capture', daemon=True),
+            threading.Thread(target=self._process_loop, name='motion-process', daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+        
+        last_shown = 0
+        last_report = time.time()
+        
+        try:
+            while not self.stop_event.is_set():
+                if self.display:
+                    with self.display_lock:
+                        sequence = self.display_sequence
+                        if sequence != last_shown:
+                            start = time.time()
+                            cv2.imshow('Motion Sensor', self.display_frame)
+                            self.stats['display'].record(time.time() - start, max(0, sequence - last_shown - 1) if last_shown else 0)
+                            last_shown = sequence
+                    
+                    key = cv2.waitKey(1) & 0xFF
+                    if key == ord('q') or key == ord('Q'):
+                        self.sensor.is_collecting = False
+                        self.stop_event.set()
+                    elif key == ord('s') or key == ord('S'):
+                        self.sensor.save_data()
+                else:
+                    self.stop_event.wait(0.1)
+                
+                if time.time() - last_report >= self.report_interval:
+                    self._report()
+                    last_report = time.time()
+        
+        except KeyboardInterrupt:
+            self.sensor.is_collecting = False
+            raise
+        
+        finally:
+            self.stop_event.set()
+            for thread in self.threads:
+                thread.join(timeout=2)
+            self._report()
@@ -1,36 +1,44 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from dataFusionAnalyzer import DataFusionAnalyzer
-import requests
+from metrics import FORECAST_STAGE_SECONDS, FORECAST_API_ERRORS
+from httpClient import get_default_client
+from recordSchema import to_frame
 import json
 
 class OutdoorForecastPredictor:
     
-    def __init__(self, firebase_config_path='firebase_config.json', api_key=None):
+    def __init__(self, firebase_config_path='firebase_config.json', api_key=None, http_client=None):
         self.analyzer = DataFusionAnalyzer(firebase_config_path)
         self.api_key = api_key or 'e134970c8051ece1251fdc280a62154f'
+        self.http = http_client or get_default_client()
         
         self.location = {
             'lat': 53.3498,
             'lon': -6.2603
         }
     
-    def fetch_weather_forecast(self, hours=48):
+    @FORECAST_STAGE_SECONDS.timed(stage='fetch_forecast')
+    def fetch_weather_forecast(self, hours=48, location=None):
         url = "https://api.openweathermap.org/data/2.5/forecast"
+        location = location or self.location
         
         params = {
-            'lat': self.location['lat'],
-            'lon': self.location['lon'],
+            'lat': location['lat'],
+            'lon': location['lon'],
             'appid': self.api_key,
             'units': 'metric',
             'cnt': min(hours // 3, 40)
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self.http.get_json(
+                url, params, 'forecast',
+                lat=params['lat'], lon=params['lon'], cnt=params['cnt'],
+                ttl=3 * 3600
+            )
             forecasts = []
             
             for item in data['list']:
@@ -50,7 +58,9 @@ class OutdoorForecastPredictor:
             
             return forecasts
             
-        except:
+        except Exception as e:
+            print(f"Forecast request failed, using simulated forecast: {e}")
+            FORECAST_API_ERRORS.inc(endpoint='forecast')
             return self._generate_mock_forecast(hours)
     
     def _generate_mock_forecast(self, hours):
@@ -78,128 +88,197 @@ class OutdoorForecastPredictor:
         
         return forecasts
     
-    def fetch_air_quality_forecast(self):
+    @FORECAST_STAGE_SECONDS.timed(stage='fetch_air_quality')
+    def fetch_air_quality_forecast(self, location=None):
         url = "https://api.openweathermap.org/data/2.5/air_pollution"
+        location = location or self.location
         
         params = {
-            'lat': self.location['lat'],
-            'lon': self.location['lon'],
+            'lat': location['lat'],
+            'lon': location['lon'],
             'appid': self.api_key
         }
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self.http.get_json(
+                url, params, 'air_pollution',
+                lat=params['lat'], lon=params['lon'],
+                ttl=3600
+            )
             current_aqi = data['list'][0]['main']['aqi']
             return current_aqi
             
-        except:
+        except Exception as e:
+            print(f"Air pollution request failed, assuming AQI 2: {e}")
+            FORECAST_API_ERRORS.inc(endpoint='air_pollution')
             return 2
     
+    @FORECAST_STAGE_SECONDS.timed(stage='predict')
     def predict_outdoor_scores(self, forecast_data, baseline_aqi=2):
-        predictions = []
+        if len(forecast_data) == 0:
+            return pd.DataFrame()
         
         aqi_to_pm25 = {1: 12, 2: 35, 3: 55, 4: 150, 5: 250}
-        estimated_aqi_value = aqi_to_pm25.get(baseline_aqi, 50)
         
-        for forecast in forecast_data:
-            hour_of_day = forecast['timestamp'].hour
-            
-            if 7 <= hour_of_day <= 9 or 17 <= hour_of_day <= 19:
-                bikes_available = np.random.randint(800, 1000)
-            elif 22 <= hour_of_day or hour_of_day <= 6:
-                bikes_available = np.random.randint(1200, 1500)
-            else:
-                bikes_available = np.random.randint(1000, 1300)
-            
-            temp_score = self.analyzer.score_temperature(forecast['temperature'])
-            aqi_score = self.analyzer.score_air_quality(estimated_aqi_value)
-            weather_score = self.analyzer.score_weather(forecast['weather'])
-            bikes_score = self.analyzer.score_bikes(bikes_available)
-            
-            if forecast['pop'] > 50:
-                weather_score *= 0.6
-            
-            outdoor_score = (
-                temp_score * self.analyzer.weights['temperature'] +
-                aqi_score * self.analyzer.weights['air_quality'] +
-                weather_score * self.analyzer.weights['weather'] +
-                bikes_score * self.analyzer.weights['bikes']
-            )
-            
-            hours_ahead = (forecast['timestamp'] - datetime.now()).total_seconds() / 3600
-            confidence = max(0.5, 1.0 - (hours_ahead / 48) * 0.4)
-            
-            prediction = {
-                'timestamp': forecast['timestamp'],
-                'hour_label': forecast['timestamp'].strftime('%a %H:%M'),
-                'temperature': forecast['temperature'],
-                'weather': forecast['weather'],
-                'weather_description': forecast['weather_description'],
-                'pop': forecast['pop'],
-                'temp_score': round(temp_score, 1),
-                'aqi_score': round(aqi_score, 1),
-                'weather_score': round(weather_score, 1),
-                'bikes_score': round(bikes_score, 1),
-                'outdoor_score': round(outdoor_score, 1),
-                'confidence': round(confidence, 2),
-                'bikes_estimated': bikes_available
-            }
-            
-            predictions.append(prediction)
+        df = to_frame('forecast', forecast_data)
+        baseline = pd.Series(np.broadcast_to(baseline_aqi, len(df)), index=df.index)
+        estimated_aqi_value = baseline.map(aqi_to_pm25).fillna(50).to_numpy(dtype=float)
+        timestamps = df['timestamp']
+        hour_of_day = timestamps.dt.hour.to_numpy()
+        
+        rush_hour = ((hour_of_day >= 7) & (hour_of_day <= 9)) | ((hour_of_day >= 17) & (hour_of_day <= 19))
+        night = (hour_of_day >= 22) | (hour_of_day <= 6)
+        low = np.select([rush_hour, night], [800, 1200], default=1000)
+        high = np.select([rush_hour, night], [1000, 1500], default=1300)
+        bikes_available = np.random.randint(low, high)
+        
+        temp_score = self.analyzer.score_temperature_array(df['temperature'])
+        aqi_score = self.analyzer.score_air_quality_array(estimated_aqi_value)
+        weather_score = self.analyzer.score_weather_array(df['weather'])
+        bikes_score = self.analyzer.score_bikes_array(bikes_available)
+        
+        pop = df['pop'].to_numpy(dtype=float)
+        weather_score = np.where(pop > 50, weather_score * 0.6, weather_score)
+        
+        outdoor_score = self.analyzer.combine_scores(temp_score, aqi_score, weather_score, bikes_score)
         
-        df = pd.DataFrame(predictions)
-        return df
+        hours_ahead = (timestamps - datetime.now()).dt.total_seconds().to_numpy() / 3600
+        confidence = np.maximum(0.5, 1.0 - (hours_ahead / 48) * 0.4)
+        
+        predictions = pd.DataFrame({
+            'timestamp': df['timestamp'],
+            'hour_label': timestamps.dt.strftime('%a %H:%M'),
+            'temperature': df['temperature'],
+            'weather': df['weather'],
+            'weather_description': df['weather_description'],
+            'pop': df['pop'],
+            'temp_score': np.round(temp_score, 1),
+            'aqi_score': np.round(aqi_score, 1),
+            'weather_score': np.round(weather_score, 1),
+            'bikes_score': np.round(bikes_score, 1),
+            'outdoor_score': np.round(outdoor_score, 1),
+            'confidence': np.round(confidence, 2),
+            'bikes_estimated': bikes_available
+        })
+        
+        return predictions
     
-    def identify_optimal_windows(self, predictions, min_score=70, min_duration_hours=2):
+    def _grid_cell(self, lat, lon, resolution):
+        if not resolution:
+            return round(lat, 4), round(lon, 4)
+        return round(round(lat / resolution) * resolution, 4), round(round(lon / resolution) * resolution, 4)
+    
+    def _normalize_locations(self, locations):
+        if isinstance(locations, pd.DataFrame):
+            return list(zip(locations['location'], locations['lat'], locations['lon']))
+        if isinstance(locations, dict):
+            return [(name, point[0], point[1]) for name, point in locations.items()]
+        return [tuple(location) for location in locations]
+    
+    def _fetch_cell(self, cell, hours):
+        location = {'lat': cell[0], 'lon': cell[1]}
+        return self.fetch_weather_forecast(hours, location), self.fetch_air_quality_forecast(location)
+    
+    @FORECAST_STAGE_SECONDS.timed(stage='batch')
+    def predict_locations(self, locations, forecast_hours=48, grid_resolution=0.05, max_workers=8):
+        locations = self._normalize_locations(locations)
+        if not locations:
+            return pd.DataFrame()
+        
+        members = pd.DataFrame(locations, columns=['location', 'lat', 'lon'])
+        cells = [self._grid_cell(lat, lon, grid_resolution) for lat, lon in zip(members['lat'], members['lon'])]
+        members['cell_lat'] = [cell[0] for cell in cells]
+        members['cell_lon'] = [cell[1] for cell in cells]
+        
+        unique_cells = list(dict.fromkeys(cells))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_cells)), thread_name_prefix='forecast-fetch') as pool:
+            fetched = list(pool.map(lambda cell: self._fetch_cell(cell, forecast_hours), unique_cells))
+        
+        frames = []
+        baselines = []
+        for cell, (forecasts, baseline_aqi) in zip(unique_cells, fetched):
+            if not forecasts:
+                continue
+            frame = pd.DataFrame(forecasts)
+            frame['cell_lat'], frame['cell_lon'] = cell
+            frames.append(frame)
+            baselines.append(np.full(len(frame), baseline_aqi))
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        combined = pd.concat(frames, ignore_index=True)
+        predictions = self.predict_outdoor_scores(combined, np.concatenate(baselines))
+        predictions['cell_lat'] = combined['cell_lat']
+        predictions['cell_lon'] = combined['cell_lon']
+        predictions['baseline_aqi'] = np.concatenate(baselines)
+        
+        result = members.merge(predictions, on=['cell_lat', 'cell_lon'], how='inner')
+        result['timestamp'] = pd.to_datetime(result['timestamp'])
+        return result.set_index(['location', 'timestamp']).sort_index()
+    
+    def _slot_hours(self, timestamps):
+        if len(timestamps) < 2:
+            return 3.0
+        steps = np.diff(timestamps).astype('timedelta64[s]').astype(float) / 3600
+        return float(np.median(steps))
+    
+    @FORECAST_STAGE_SECONDS.timed(stage='windows')
+    def identify_windows_by_threshold(self, predictions, thresholds, min_duration_hours=2):
+        thresholds = [float(threshold) for threshold in np.atleast_1d(thresholds)]
         if predictions.empty:
-            return []
-        
-        predictions['is_good'] = predictions['outdoor_score'] >= min_score
-        
-        windows = []
-        current_window = None
-        
-        for idx, row in predictions.iterrows():
-            if row['is_good']:
-                if current_window is None:
-                    current_window = {
-                        'start_time': row['timestamp'],
-                        'start_score': row['outdoor_score'],
-                        'scores': [row['outdoor_score']],
-                        'hours': [row['hour_label']],
-                        'conditions': [row['weather']]
-                    }
-                else:
-                    current_window['scores'].append(row['outdoor_score'])
-                    current_window['hours'].append(row['hour_label'])
-                    current_window['conditions'].append(row['weather'])
-            else:
-                if current_window is not None:
-                    current_window['end_time'] = predictions.iloc[idx-1]['timestamp']
-                    current_window['duration_hours'] = len(current_window['scores']) * 3
-                    current_window['avg_score'] = np.mean(current_window['scores'])
-                    current_window['max_score'] = max(current_window['scores'])
-                    
-                    if current_window['duration_hours'] >= min_duration_hours:
-                        windows.append(current_window)
-                    
-                    current_window = None
-        
-        if current_window is not None:
-            current_window['end_time'] = predictions.iloc[-1]['timestamp']
-            current_window['duration_hours'] = len(current_window['scores']) * 3
-            current_window['avg_score'] = np.mean(current_window['scores'])
-            current_window['max_score'] = max(current_window['scores'])
-            
-            if current_window['duration_hours'] >= min_duration_hours:
-                windows.append(current_window)
+            return {threshold: [] for threshold in thresholds}
         
-        windows.sort(key=lambda x: x['avg_score'], reverse=True)
+        scores = predictions['outdoor_score'].to_numpy(dtype=float)
+        timestamps = pd.to_datetime(predictions['timestamp']).to_numpy()
+        slot_hours = self._slot_hours(timestamps)
+        
+        good = scores[np.newaxis, :] >= np.asarray(thresholds)[:, np.newaxis]
+        padded = np.pad(good, ((0, 0), (1, 1))).astype(np.int8)
+        rows, edges = np.nonzero(np.diff(padded, axis=1))
+        
+        owners = rows[0::2]
+        starts = edges[0::2]
+        ends = edges[1::2]
+        
+        durations = (timestamps[ends - 1] - timestamps[starts]).astype('timedelta64[s]').astype(float) / 3600 + slot_hours
+        
+        cumulative = np.concatenate(([0.0], np.cumsum(scores)))
+        averages = (cumulative[ends] - cumulative[starts]) / (ends - starts)
+        bounds = np.column_stack([starts, ends]).ravel()
+        maxima = np.maximum.reduceat(np.append(scores, -np.inf), bounds)[0::2] if len(bounds) else bounds
+        
+        keep = durations >= min_duration_hours
+        order = np.lexsort((-averages, owners))
+        
+        labels = predictions['hour_label'].tolist()
+        conditions = predictions['weather'].tolist()
+        score_list = scores.tolist()
+        
+        windows = {threshold: [] for threshold in thresholds}
+        for i in order:
+            if not keep[i]:
+                continue
+            
+            start, end = starts[i], ends[i]
+            windows[thresholds[owners[i]]].append({
+                'start_time': pd.Timestamp(timestamps[start]),
+                'start_score': score_list[start],
+                'scores': score_list[start:end],
+                'hours': labels[start:end],
+                'conditions': conditions[start:end],
+                'end_time': pd.Timestamp(timestamps[end - 1]),
+                'duration_hours': round(float(durations[i]), 2),
+                'avg_score': float(averages[i]),
+                'max_score': float(maxima[i])
+            })
         
         return windows
     
+    def identify_optimal_windows(self, predictions, min_score=70, min_duration_hours=2):
+        return self.identify_windows_by_threshold(predictions, [min_score], min_duration_hours)[float(min_score)]
+    
+    @FORECAST_STAGE_SECONDS.timed(stage='report')
     def generate_forecast_report(self, predictions, windows):
         if predictions.empty:
             return {
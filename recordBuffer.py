@@ -0,0 +1,180 @@
+import os
+import csv
+import threading
+import numpy as np
+from datetime import datetime
+
+
+MOTION_RECORD_DTYPE = np.dtype([
+    ('time', 'f8'),
+    ('motion_detected', 'i1'),
+    ('motion_intensity', 'f4'),
+    ('motion_area', 'i4'),
+    ('brightness', 'f4')
+])
+
+CSV_FIELDS = [
+    'timestamp', 'unix_time', 'motion_detected',
+    'motion_intensity', 'motion_area',
+    'brightness', 'sensor_type', 'device_id'
+]
+
+
+class MotionRecordBuffer:
+    
+    def __init__(self, capacity=10000, rotate_interval=300, data_dir='data',
+                 sensor_type='webcam_motion', device_id='webcam_001', store=None):
+        self.capacity = capacity
+        self.rotate_interval = rotate_interval
+        self.data_dir = data_dir
+        self.sensor_type = sensor_type
+        self.device_id = device_id
+        self.store = store
+        
+        self.active = np.zeros(capacity, dtype=MOTION_RECORD_DTYPE)
+        self.spare = np.zeros(capacity, dtype=MOTION_RECORD_DTYPE)
+        self.start = 0
+        self.count = 0
+        
+        self.total_count = 0
+        self.overwritten = 0
+        self.rotations = 0
+        self.last_point = None
+        
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.flush_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        
+        session = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.filename = os.path.join(data_dir, f'motion_sensor_data_{device_id}_{session}.csv')
+    
+    def __len__(self):
+        return self.count
+    
+    def start_rotation(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._rotate_loop, name='record-rotation', daemon=True)
+        self.thread.start()
+    
+    def stop_rotation(self):
+        self.stop_event.set()
+        self.flush_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=10)
+        return self.flush()
+    
+    def append(self, data_point, timestamp=None):
+        with self.lock:
+            if self.count == self.capacity:
+                index = self.start
+                self.start = (self.start + 1) % self.capacity
+                self.overwritten += 1
+            else:
+                index = (self.start + self.count) % self.capacity
+                self.count += 1
+            
+            self.active[index] = (
+                timestamp if timestamp is not None else data_point['unix_time'],
+                data_point['motion_detected'],
+                data_point['motion_intensity'],
+                data_point['motion_area'],
+                data_point['brightness']
+            )
+            
+            self.total_count += 1
+            self.last_point = data_point
+            fill = self.count
+        
+        if fill >= self.capacity * 0.75:
+            self.flush_event.set()
+    
+    def _take(self):
+        with self.lock:
+            count = self.count
+            head = min(count, self.capacity - self.start)
+            
+            self.spare[:head] = self.active[self.start:self.start + head]
+            self.spare[head:count] = self.active[:count - head]
+            
+            self.start = 0
+            self.count = 0
+        
+        return self.spare[:count] if count else None
+    
+    def to_records(self, records):
+        return [
+            {
+                'timestamp': datetime.fromtimestamp(record['time']).isoformat(),
+                'unix_time': int(record['time']),
+                'motion_detected': int(record['motion_detected']),
+                'motion_intensity': round(float(record['motion_intensity']), 2),
+                'motion_area': int(record['motion_area']),
+                'brightness': round(float(record['brightness']), 2),
+                'sensor_type': self.sensor_type,
+                'device_id': self.device_id
+            }
+            for record in records
+        ]
+    
+    def snapshot(self):
+        with self.lock:
+            count = self.count
+            head = min(count, self.capacity - self.start)
+            records = np.concatenate([
+                self.active[self.start:self.start + head],
+                self.active[:count - head]
+            ])
+        return self.to_records(records)
+    
+    def flush(self):
+        with self.write_lock:
+            records = self._take()
+            if records is None:
+                return self.filename if os.path.exists(self.filename) else None
+            
+            if not os.path.exists(self.data_dir):
+                os.makedirs(self.data_dir)
+            
+            rows = self.to_records(records)
+            write_header = not os.path.exists(self.filename)
+            
+            with open(self.filename, 'a', newline='') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDS)
+                if write_header:
+                    writer.writeheader()
+                writer.writerows(rows)
+            
+            if self.store is not None:
+                try:
+                    self.store.append('motion', rows)
+                except Exception as e:
+                    print(f"History store append failed: {e}")
+            
+            self.rotations += 1
+            return self.filename
+    
+    def _rotate_loop(self):
+        while not self.stop_event.is_set():
+            self.flush_event.wait(self.rotate_interval)
+            self.flush_event.clear()
+            if self.stop_event.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Record rotation failed: {e}")
+    
+    def get_stats(self):
+        return {
+            'buffered': self.count,
+            'capacity': self.capacity,
+            'total': self.total_count,
+            'overwritten': self.overwritten,
+            'rotations': self.rotations,
+            'file': self.filename
+        }
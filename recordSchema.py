@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from functools import lru_cache
+
+
+class Record:
+    
+    __slots__ = ()
+    fields = ()
+    
+    def __init__(self, **values):
+        for name, _ in self.fields:
+            setattr(self, name, values.get(name))
+    
+    @classmethod
+    def from_dict(cls, point):
+        return cls(**point)
+    
+    def to_dict(self):
+        point = {name: getattr(self, name) for name, _ in self.fields}
+        point['timestamp'] = datetime.fromtimestamp(self.unix_time).isoformat()
+        return point
+    
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name, _ in self.fields)
+        return f"{type(self).__name__}({values})"
+
+
+class MotionRecord(Record):
+    
+    fields = (
+        ('unix_time', 'i8'),
+        ('motion_detected', 'i1'),
+        ('motion_intensity', 'f4'),
+        ('motion_area', 'i4'),
+        ('brightness', 'f4'),
+        ('device_id', 'O')
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class WeatherRecord(Record):
+    
+    fields = (
+        ('unix_time', 'i8'),
+        ('temperature', 'f8'),
+        ('humidity', 'i2'),
+        ('wind_speed', 'f8'),
+        ('weather', 'O'),
+        ('weather_description', 'O')
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class AirQualityRecord(Record):
+    
+    fields = (
+        ('unix_time', 'i8'),
+        ('aqi', 'i2'),
+        ('pm2_5', 'f8'),
+        ('pm10', 'f8')
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class BikesRecord(Record):
+    
+    fields = (
+        ('unix_time', 'i8'),
+        ('total_bikes_available', 'i4'),
+        ('average_occupancy', 'f8')
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class ForecastRecord(Record):
+    
+    fields = (
+        ('unix_time', 'i8'),
+        ('temperature', 'f8'),
+        ('feels_like', 'f8'),
+        ('humidity', 'i2'),
+        ('weather', 'O'),
+        ('weather_description', 'O'),
+        ('wind_speed', 'f8'),
+        ('clouds', 'i2'),
+        ('pop', 'f8')
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class PredictionRecord(Record):
+    
+    fields = (
+        ('unix_time', 'i8'),
+        ('temperature', 'f8'),
+        ('weather', 'O'),
+        ('pop', 'f8'),
+        ('temp_score', 'f4'),
+        ('aqi_score', 'f4'),
+        ('weather_score', 'f4'),
+        ('bikes_score', 'f4'),
+        ('outdoor_score', 'f4'),
+        ('confidence', 'f4'),
+        ('bikes_estimated', 'i4')
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+RECORD_TYPES = {
+    'motion': MotionRecord,
+    'weather': WeatherRecord,
+    'air_quality': AirQualityRecord,
+    'bikes': BikesRecord,
+    'forecast': ForecastRecord,
+    'prediction': PredictionRecord
+}
+
+DTYPES = {source: np.dtype(list(record_type.fields)) for source, record_type in RECORD_TYPES.items()}
+
+
+@lru_cache(maxsize=8192)
+def _utc_offset(hour):
+    return int(datetime.fromtimestamp(hour * 3600, timezone.utc).astimezone().utcoffset().total_seconds())
+
+
+def local_times(unix_times):
+    unix_times = np.asarray(unix_times, dtype='i8')
+    if len(unix_times) == 0:
+        return unix_times.astype('datetime64[ns]')
+    
+    hours, inverse = np.unique(unix_times // 3600, return_inverse=True)
+    offsets = np.array([_utc_offset(hour) for hour in hours.tolist()], dtype='i8')
+    return (unix_times + offsets[inverse]).astype('datetime64[s]').astype('datetime64[ns]')
+
+
+def _typed(values, dtype):
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'O':
+        return np.asarray(values, dtype=object)
+    
+    array = np.asarray(pd.to_numeric(values, errors='coerce'), dtype='f8')
+    if dtype.kind in 'iu' and np.isnan(array).any():
+        return array
+    return array.astype(dtype)
+
+
+def _field_values(records, name):
+    if isinstance(records, pd.DataFrame):
+        return records[name].to_numpy() if name in records.columns else np.full(len(records), np.nan)
+    if isinstance(records[0], Record):
+        return [getattr(record, name, None) for record in records]
+    return [record.get(name) for record in records]
+
+
+def to_columns(source, records):
+    fields = RECORD_TYPES[source].fields
+    if len(records) == 0:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in fields}
+    
+    columns = {name: _typed(_field_values(records, name), dtype) for name, dtype in fields}
+    
+    missing = np.isnan(columns['unix_time']) if columns['unix_time'].dtype.kind == 'f' else None
+    if missing is not None and missing.any():
+        parsed = pd.to_datetime(pd.Series(_field_values(records, 'timestamp'))[missing], format='ISO8601')
+        unix_time = columns['unix_time']
+        unix_time[missing] = [moment.to_pydatetime().timestamp() for moment in parsed]
+        columns['unix_time'] = unix_time.astype('i8')
+    
+    return columns
+
+
+def to_array(source, records):
+    columns = to_columns(source, records)
+    array = np.empty(len(columns['unix_time']), dtype=DTYPES[source])
+    for name in DTYPES[source].names:
+        array[name] = columns[name]
+    return array
+
+
+def to_frame(source, records, time_column='timestamp'):
+    if len(records) == 0:
+        return pd.DataFrame()
+    
+    columns = to_columns(source, records)
+    frame = pd.DataFrame({time_column: local_times(columns['unix_time'])})
+    for name, values in columns.items():
+        frame[name] = pd.Categorical(values) if values.dtype == object else values
+    return frame
@@ -0,0 +1,241 @@
+import os
+import glob
+import json
+import argparse
+import pandas as pd
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from dataFusionAnalyzer import DataFusionAnalyzer
+from firebaseAccess import SOURCE_PATHS, partition_keys
+
+
+class SimulatedClock:
+    
+    def __init__(self, start):
+        self.current = start
+    
+    def __call__(self):
+        return self.current
+    
+    def set(self, when):
+        self.current = when
+    
+    def advance(self, delta):
+        self.current += delta
+        return self.current
+
+
+def _in_range(df, start_unix, end_unix):
+    if df.empty:
+        return df
+    df = df[(df['unix_time'] >= start_unix) & (df['unix_time'] < end_unix)]
+    df = df.assign(timestamp=pd.to_datetime(df['timestamp'], format='ISO8601'))
+    return df.reset_index(drop=True)
+
+
+def load_firebase_export(path, start_unix, end_unix):
+    with open(path) as f:
+        tree = json.load(f)
+    
+    date_keys = set(partition_keys(start_unix, end_unix))
+    
+    frames = {}
+    for source, source_path in SOURCE_PATHS.items():
+        node = tree
+        for part in source_path.split('/'):
+            node = node.get(part, {}) if isinstance(node, dict) else {}
+        
+        records = [
+            point
+            for date_key, points in node.items()
+            if date_key in date_keys and isinstance(points, dict)
+            for point in points.values()
+        ]
+        frames[source] = _in_range(pd.DataFrame(records), start_unix, end_unix)
+    
+    return frames
+
+
+def load_motion_csvs(patterns, start_unix, end_unix):
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    frames = [pd.read_csv(path) for path in paths]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return {'motion': pd.DataFrame()}
+    return {'motion': _in_range(pd.concat(frames, ignore_index=True), start_unix, end_unix)}
+
+
+def load_store(root_dir, start_unix, end_unix):
+    from historyStore import HistoryStore
+    
+    store = HistoryStore(root_dir)
+    return {
+        source: _in_range(store.read(source, start_unix, end_unix - 1), start_unix, end_unix)
+        for source in SOURCE_PATHS
+    }
+
+
+def combine_sources(*loaded):
+    combined = {}
+    for source in SOURCE_PATHS:
+        frames = [frames[source] for frames in loaded if not frames.get(source, pd.DataFrame()).empty]
+        if not frames:
+            combined[source] = pd.DataFrame()
+            continue
+        
+        df = pd.concat(frames, ignore_index=True)
+        key = [column for column in ('unix_time', 'timestamp', 'device_id') if column in df.columns]
+        combined[source] = df.drop_duplicates(subset=key).sort_values('unix_time', kind='stable').reset_index(drop=True)
+    
+    return combined
+
+
+def replay_chunk(payload):
+    chunk_start = payload['start']
+    chunk_end = payload['end']
+    
+    analyzer = DataFusionAnalyzer(
+        None,
+        fetch_workers=1,
+        granularity=payload['granularity'],
+        tolerances=payload['tolerances'],
+        clock=SimulatedClock(chunk_end)
+    )
+    analyzer.weights.update(payload['weights'] or {})
+    analyzer.thresholds.update(payload['thresholds'] or {})
+    
+    try:
+        fused = analyzer.fuse_data_sources(payload['frames'])
+        if fused.empty:
+            return fused
+        
+        fused = fused[(fused['hour'] >= chunk_start) & (fused['hour'] < chunk_end)].reset_index(drop=True)
+        return analyzer.calculate_outdoor_score(fused)
+    finally:
+        analyzer.fetch_pool.shutdown(wait=False)
+
+
+class ReplayEngine:
+    
+    def __init__(self, frames, chunk_hours=24, granularity='1h', tolerances=None, weights=None,
+                 thresholds=None, workers=None):
+        self.frames = frames
+        self.chunk = timedelta(hours=chunk_hours)
+        self.granularity = granularity
+        self.tolerances = dict(tolerances or {})
+        self.weights = dict(weights or {})
+        self.thresholds = dict(thresholds or {})
+        self.workers = workers or os.cpu_count() or 1
+        
+        defaults = DataFusionAnalyzer(None, tolerances=self.tolerances)
+        self.lookback = max(pd.Timedelta(value) for value in defaults.tolerances.values())
+        defaults.fetch_pool.shutdown(wait=False)
+        
+        self.clock = SimulatedClock(None)
+    
+    def _slice(self, start, end):
+        start_unix = int((start - self.lookback).timestamp())
+        end_unix = int(end.timestamp())
+        
+        sliced = {}
+        for source, df in self.frames.items():
+            if df.empty:
+                sliced[source] = df
+                continue
+            lo, hi = df['unix_time'].searchsorted([start_unix, end_unix])
+            sliced[source] = df.iloc[lo:hi]
+        return sliced
+    
+    def payloads(self, start, end):
+        self.clock.set(pd.Timestamp(start).floor('H').to_pydatetime())
+        
+        while self.clock() < end:
+            chunk_start = self.clock()
+            chunk_end = min(self.clock.advance(self.chunk), end)
+            
+            yield {
+                'start': chunk_start,
+                'end': chunk_end,
+                'frames': self._slice(chunk_start, chunk_end),
+                'granularity': self.granularity,
+                'tolerances': self.tolerances,
+                'weights': self.weights,
+                'thresholds': self.thresholds
+            }
+    
+    def run(self, start, end, output_path=None):
+        payloads = self.payloads(start, end)
+        
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(replay_chunk, payloads))
+        else:
+            results = [replay_chunk(payload) for payload in payloads]
+        
+        results = [result for result in results if not result.empty]
+        scored = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+        
+        if output_path and not scored.empty:
+            if output_path.endswith('.parquet'):
+                scored.to_parquet(output_path, index=False)
+            else:
+                scored.to_csv(output_path, index=False)
+        
+        return scored
+
+
+def parse_assignments(text):
+    values = {}
+    for item in (text or '').split(','):
+        if '=' in item:
+            key, value = item.split('=', 1)
+            values[key.strip()] = float(value)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay historical sensor and open data through fusion and scoring')
+    parser.add_argument('--start', required=True, help='local start date/time, e.g. 2026-07-01')
+    parser.add_argument('--end', required=True, help='local end date/time (exclusive)')
+    parser.add_argument('--export', action='append', default=[], help='Firebase JSON export (repeatable)')
+    parser.add_argument('--motion-csv', action='append', default=[], help='glob of motion CSVs written by save_data')
+    parser.add_argument('--store', default=None, help='HistoryStore root directory')
+    parser.add_argument('--chunk-hours', type=int, default=24)
+    parser.add_argument('--granularity', default='1h')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--weights', default=None, help='e.g. temperature=0.4,air_quality=0.3')
+    parser.add_argument('--thresholds', default=None, help='JSON object merged into analyzer.thresholds')
+    parser.add_argument('--output', default='replay_scores.csv')
+    args = parser.parse_args()
+    
+    start = pd.Timestamp(args.start).to_pydatetime()
+    end = pd.Timestamp(args.end).to_pydatetime()
+    
+    margin = timedelta(hours=6)
+    start_unix = int((start - margin).timestamp())
+    end_unix = int(end.timestamp())
+    
+    loaded = [load_firebase_export(path, start_unix, end_unix) for path in args.export]
+    if args.motion_csv:
+        loaded.append(load_motion_csvs(args.motion_csv, start_unix, end_unix))
+    if args.store:
+        loaded.append(load_store(args.store, start_unix, end_unix))
+    
+    if not loaded:
+        parser.error('Provide at least one of --export, --motion-csv or --store')
+    
+    engine = ReplayEngine(
+        combine_sources(*loaded),
+        chunk_hours=args.chunk_hours,
+        granularity=args.granularity,
+        weights=parse_assignments(args.weights),
+        thresholds=json.loads(args.thresholds) if args.thresholds else None,
+        workers=args.workers
+    )
+    
+    scored = engine.run(start, end, args.output)
+    print(f"Replayed {start} to {end}: {len(scored)} scored rows written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+import os
+import re
+import time
+import queue
+import threading
+import multiprocessing as mp
+import firebase_admin
+from firebase_admin import credentials, db
+from batchUploader import BatchUploader
+from leaderElection import CommandSpool, _atomic_write, _read_json
+
+
+CAMERA_CONFIG = os.environ.get('CAMERA_CONFIG', 'cameras.json')
+DEVICE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+MAX_DEVICE_INDEX = 16
+
+
+def load_camera_config(path=CAMERA_CONFIG):
+    config = _read_json(path) or {}
+    return {
+        'sources': {str(name): source for name, source in config.get('sources', {}).items()},
+        'max_devices': int(config.get('max_devices', 4))
+    }
+
+
+def resolve_source(source, named_sources):
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    if isinstance(source, int) and not isinstance(source, bool):
+        if 0 <= source < MAX_DEVICE_INDEX:
+            return source
+        raise ValueError(f"Device index {source} out of range")
+    if isinstance(source, str) and source in named_sources:
+        return named_sources[source]
+    raise ValueError("Source must be a device index or a name from the camera config")
+
+
+def camera_worker(device_id, source, process_width, points_queue, status_queue, stop_event, heartbeat_interval=2.0):
+    from webcamSensorFirebase import MotionSensorFirebase
+    
+    dropped = [0]
+    
+    def forward(data_point):
+        try:
+            points_queue.put_nowait(data_point)
+        except queue.Full:
+            dropped[0] += 1
+    
+    sensor = MotionSensorFirebase(
+        None,
+        headless=True,
+        process_width=process_width,
+        source=source,
+        device_id=device_id,
+        point_sink=forward
+    )
+    
+    if not sensor.initialize_camera():
+        status_queue.put({'device_id': device_id, 'state': 'failed', 'time': time.time()})
+        return
+    
+    sensor.is_collecting = True
+    sensor.target_points = None
+    sensor.data_points.start_rotation()
+    
+    frames = 0
+    window_frames = 0
+    window_start = time.time()
+    
+    try:
+        while sensor.is_collecting and not stop_event.is_set():
+            result = sensor.detect_motion()
+            
+            if result is not None:
+                sensor.record_point(*result)
+                frames += 1
+                window_frames += 1
+            elif sensor.read_failures >= 30:
+                print(f"{device_id}: source {source} stopped delivering frames")
+                break
+            
+            now = time.time()
+            if now - window_start >= heartbeat_interval:
+                status_queue.put({
+                    'device_id': device_id,
+                    'state': 'running',
+                    'pid': os.getpid(),
+                    'fps': round(window_frames / (now - window_start), 1),
+                    'frames': frames,
+                    'points': sensor.data_points.total_count,
+                    'dropped': dropped[0],
+                    'time': now
+                })
+                window_frames = 0
+                window_start = now
+    
+    finally:
+        sensor.cleanup()
+        status_queue.put({'device_id': device_id, 'state': 'stopped', 'frames': frames, 'time': time.time()})
+
+
+class SensorManager:
+    
+    def __init__(self, firebase_config_path='firebase_config.json', process_width=320, heartbeat_timeout=10,
+                 on_point=None, camera_config=None):
+        config = camera_config or load_camera_config()
+        self.named_sources = config['sources']
+        self.max_devices = config['max_devices']
+        self.process_width = process_width
+        self.on_point = on_point
+        self.heartbeat_timeout = heartbeat_timeout
+        
+        self.context = mp.get_context('spawn')
+        self.points_queue = self.context.Queue(maxsize=10000)
+        self.status_queue = self.context.Queue()
+        
+        self.lock = threading.Lock()
+        self.workers = {}
+        self.health = {}
+        
+        self.uploader = self._create_uploader(firebase_config_path)
+        self.stop_event = threading.Event()
+        self.forward_thread = threading.Thread(target=self._forward_loop, name='sensor-forward', daemon=True)
+        self.forward_thread.start()
+    
+    def _create_uploader(self, config_path):
+        try:
+            firebase_admin.get_app()
+        except ValueError:
+            if not config_path or not os.path.exists(config_path):
+                print("Sensor manager: Firebase not configured, points stay local")
+                return None
+            cred = credentials.Certificate(config_path)
+            firebase_admin.initialize_app(cred, {
+                'databaseURL': 'https://cs7ns4-assignment3-pylak-default-rtdb.europe-west1.firebasedatabase.app/'
+            })
+        
+        uploader = BatchUploader(db.reference('sensor_data'))
+        uploader.start()
+        return uploader
+    
+    def _forward_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                data_point = self.points_queue.get(timeout=0.5)
+                if self.uploader is not None:
+                    self.uploader.submit(data_point)
+                if self.on_point is not None:
+                    self.on_point(data_point)
+            except queue.Empty:
+                pass
+            
+            while True:
+                try:
+                    status = self.status_queue.get_nowait()
+                except queue.Empty:
+                    break
+                with self.lock:
+                    self.health.setdefault(status['device_id'], {}).update(status)
+    
+    def start_device(self, device_id, source):
+        if not isinstance(device_id, str) or not DEVICE_ID_PATTERN.match(device_id):
+            return {'status': 'rejected', 'message': 'device_id must be 1-32 letters, digits, "_" or "-"'}
+        try:
+            source = resolve_source(source, self.named_sources)
+        except ValueError as e:
+            return {'status': 'rejected', 'message': str(e)}
+        
+        with self.lock:
+            worker = self.workers.get(device_id)
+            if worker is not None and worker['process'].is_alive():
+                return {'status': 'already_running', 'pid': worker['process'].pid}
+            
+            running = sum(1 for worker in self.workers.values() if worker['process'].is_alive())
+            if running >= self.max_devices:
+                return {'status': 'rejected', 'message': f"At most {self.max_devices} cameras can run at once"}
+            
+            stop_event = self.context.Event()
+            process = self.context.Process(
+                target=camera_worker,
+                args=(device_id, source, self.process_width, self.points_queue, self.status_queue, stop_event),
+                name=f'camera-{device_id}',
+                daemon=True
+            )
+            process.start()
+            
+            self.workers[device_id] = {
+                'process': process,
+                'stop_event': stop_event,
+                'source': source,
+                'started': time.time()
+            }
+            self.health[device_id] = {'device_id': device_id, 'state': 'starting', 'time': time.time()}
+            
+            return {'status': 'started', 'pid': process.pid}
+    
+    def stop_device(self, device_id, timeout=5):
+        with self.lock:
+            worker = self.workers.pop(device_id, None)
+        
+        if worker is None:
+            return {'status': 'not_running'}
+        
+        worker['stop_event'].set()
+        worker['process'].join(timeout)
+        if worker['process'].is_alive():
+            worker['process'].terminate()
+            worker['process'].join(timeout)
+        
+        return {'status': 'stopped'}
+    
+    def stop_all(self):
+        for device_id in list(self.workers):
+            self.stop_device(device_id)
+        
+        self.stop_event.set()
+        self.forward_thread.join(timeout=2)
+        if self.uploader is not None:
+            self.uploader.stop()
+    
+    def get_health(self):
+        now = time.time()
+        report = {}
+        
+        with self.lock:
+            for device_id, worker in self.workers.items():
+                health = dict(self.health.get(device_id, {}))
+                health['source'] = str(worker['source'])
+                health['alive'] = worker['process'].is_alive()
+                health['uptime_seconds'] = round(now - worker['started'], 1)
+                health['stale'] = now - health.get('time', 0) > self.heartbeat_timeout
+                report[device_id] = health
+        
+        if self.uploader is not None:
+            report['_uploader'] = self.uploader.get_stats()
+        
+        return report
+
+
+class CameraService:
+    
+    def __init__(self, manager_factory, state_dir=os.path.join('data', 'cameras'), poll_interval=1.0, command_ttl=30):
+        self.manager_factory = manager_factory
+        self.status_path = os.path.join(state_dir, 'status.json')
+        self.poll_interval = poll_interval
+        self.commands = CommandSpool(os.path.join(state_dir, 'commands'), ttl=command_ttl)
+        
+        self.lock = threading.Lock()
+        self.manager = None
+        self.active = False
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        with self.lock:
+            self.active = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._serve_loop, name='camera-service', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.poll_interval + 1)
+        
+        with self.lock:
+            self.active = False
+            manager, self.manager = self.manager, None
+        if manager is not None:
+            manager.stop_all()
+        _atomic_write(self.status_path, {'leader_pid': None, 'updated': time.time(), 'cameras': {}})
+    
+    def _serve_loop(self):
+        while True:
+            try:
+                self.commands.drain(self._apply)
+                self._write_status()
+            except Exception as e:
+                print(f"Camera service tick failed: {e}")
+            if self.stop_event.wait(self.poll_interval):
+                break
+    
+    def _apply(self, command):
+        action = command.get('action')
+        device_id = command.get('device_id', 'webcam_001')
+        
+        with self.lock:
+            if not self.active:
+                return {'status': 'error', 'message': 'camera service is not running in this worker'}
+            if self.manager is None and action == 'start':
+                self.manager = self.manager_factory()
+            manager = self.manager
+        
+        if action == 'start':
+            return manager.start_device(device_id, command.get('source', 0))
+        if action == 'stop':
+            return manager.stop_device(device_id) if manager is not None else {'status': 'not_running'}
+        if action == 'status':
+            return manager.get_health() if manager is not None else {}
+        return {'status': 'error', 'message': f"Unknown action {action}"}
+    
+    def _write_status(self):
+        manager = self.manager
+        _atomic_write(self.status_path, {
+            'leader_pid': os.getpid(),
+            'updated': time.time(),
+            'cameras': manager.get_health() if manager is not None else {}
+        })
+    
+    def control(self, action, device_id='webcam_001', source=0, timeout=5.0):
+        command = {'action': action, 'device_id': device_id, 'source': source}
+        if self.active:
+            result = self._apply(command)
+            if action != 'status':
+                self._write_status()
+            return result
+        
+        result = self.commands.submit(command, timeout=timeout)
+        if result is None:
+            return {'status': 'queued'}
+        return result
+    
+    def get_health(self):
+        manager = self.manager
+        if self.active:
+            return manager.get_health() if manager is not None else {}
+        
+        status = _read_json(self.status_path) or {}
+        return status.get('cameras', {})
@@ -0,0 +1,45 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakeFirebase import FakeDatabase, patched
+from benchmarks.syntheticData import synthetic_window, firebase_tree
+from firebaseAccess import SOURCE_PATHS, partition_key
+
+
+@pytest.fixture
+def now():
+    return datetime(2026, 7, 1, 12, 30)
+
+
+@pytest.fixture
+def database(now):
+    database = FakeDatabase(firebase_tree(synthetic_window(8, motion_step=60, end=now)))
+    with patched(database):
+        yield database
+
+
+@pytest.fixture
+def push_point(database):
+    def push(source, point):
+        return database.reference(SOURCE_PATHS[source]).child(partition_key(point['unix_time'])).push(point)
+    return push
+
+
+@pytest.fixture
+def make_analyzer(database, now):
+    from dataFusionAnalyzer import DataFusionAnalyzer
+    analyzers = []
+    
+    def make(**kwargs):
+        analyzer = DataFusionAnalyzer('firebase_config.json', clock=lambda: now, **kwargs)
+        analyzers.append(analyzer)
+        return analyzer
+    
+    yield make
+    for analyzer in analyzers:
+        analyzer.fetch_pool.shutdown(wait=False)
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from benchmarks.syntheticData import motion_point
+from historyStore import HistoryStore
+
+
+def test_archive_keeps_same_second_and_late_points(make_analyzer, push_point, now, tmp_path):
+    store = HistoryStore(str(tmp_path))
+    analyzer = make_analyzer(store=store)
+    
+    first = analyzer.archive_to_store(hours_back=4)
+    assert first['motion'] > 0
+    assert analyzer.archive_to_store(hours_back=4)['motion'] == 0
+    
+    latest = store.latest_unix('motion')
+    late = (now - timedelta(hours=2, minutes=10, seconds=7)).timestamp()
+    push_point('motion', motion_point(latest, 'webcam_002'))
+    push_point('motion', motion_point(late))
+    
+    assert analyzer.archive_to_store(hours_back=4)['motion'] == 2
+    assert analyzer.archive_to_store(hours_back=4)['motion'] == 0
+    assert len(store.read('motion', 0, int(now.timestamp()))) == first['motion'] + 2
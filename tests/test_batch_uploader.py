@@ -0,0 +1,89 @@
+import json
+import threading
+
+from batchUploader import BatchUploader
+from benchmarks.fakeFirebase import FakeDatabase
+from benchmarks.syntheticData import motion_point
+from firebaseAccess import partition_key
+
+
+class FlakyReference:
+    
+    def __init__(self, reference, failures=1, apply_before_failing=True):
+        self.reference = reference
+        self.failures = failures
+        self.apply_before_failing = apply_before_failing
+    
+    def update(self, values):
+        if self.failures:
+            self.failures -= 1
+            if self.apply_before_failing:
+                self.reference.update(values)
+            raise ConnectionError('connection reset')
+        self.reference.update(values)
+
+
+def stored_points(database):
+    return [point for day in (database.read('/sensor_data') or {}).values() for point in day.values()]
+
+
+def make_uploader(tmp_path, ref, **kwargs):
+    return BatchUploader(ref, max_batch=10, flush_interval=0.01, spill_path=str(tmp_path / 'spill.jsonl'), **kwargs)
+
+
+def test_points_are_written_under_their_utc_partition(tmp_path):
+    database = FakeDatabase()
+    uploader = make_uploader(tmp_path, database.reference('sensor_data'))
+    points = [motion_point(1782863400 + 3600 * i) for i in range(30)]
+    
+    assert uploader._flush(points[:10]) and uploader._flush(points[10:20]) and uploader._flush(points[20:])
+    
+    days = database.read('/sensor_data')
+    assert sum(len(day) for day in days.values()) == 30
+    assert set(days) == {partition_key(point['unix_time']) for point in points}
+
+
+def test_replayed_spill_keeps_original_keys(tmp_path):
+    database = FakeDatabase()
+    ref = FlakyReference(database.reference('sensor_data'))
+    uploader = make_uploader(tmp_path, ref)
+    points = [motion_point(1782863400 + i) for i in range(5)]
+    
+    assert not uploader._flush(points)
+    with open(uploader.spill_path) as f:
+        spilled_keys = [json.loads(line)['key'] for line in f]
+    
+    uploader.retry_at = 0
+    uploader._replay_spill()
+    
+    assert len(stored_points(database)) == 5
+    day = database.read('/sensor_data')[partition_key(points[0]['unix_time'])]
+    assert sorted(day) == sorted(key.split('/')[1] for key in spilled_keys)
+    assert uploader.get_stats()['replayed'] == 5
+
+
+def test_legacy_spill_lines_are_replayed(tmp_path):
+    database = FakeDatabase()
+    uploader = make_uploader(tmp_path, database.reference('sensor_data'))
+    with open(uploader.spill_path, 'w') as f:
+        f.write(json.dumps(motion_point(1782863400)) + '\n')
+    
+    uploader._replay_spill()
+    assert len(stored_points(database)) == 1
+
+
+def test_submit_counts_are_exact_under_contention(tmp_path):
+    uploader = make_uploader(tmp_path, FakeDatabase().reference('sensor_data'))
+    uploader.queue.maxsize = 0
+    
+    def submit():
+        for i in range(2000):
+            uploader.submit({'unix_time': i})
+    
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert uploader.get_stats()['submitted'] == 16000
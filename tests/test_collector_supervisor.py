@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import signal
+import subprocess
+import textwrap
+import threading
+
+import pytest
+
+from collectorSupervisor import CollectorSupervisor, RestartPolicy, HEARTBEAT_ENV
+from leaderElection import _pid_alive
+
+
+SCRIPTS = {
+    'crash': "import sys; sys.exit(1)",
+    'silent': """
+        import os, time
+        open(os.environ['{env}'], 'a').close()
+        while True:
+            time.sleep(0.05)
+    """,
+    'slow_stop': """
+        import signal, sys, time
+        signal.signal(signal.SIGINT, lambda *args: (time.sleep(0.5), sys.exit(0)))
+        signal.signal(signal.SIGTERM, lambda *args: (time.sleep(0.5), sys.exit(0)))
+        while True:
+            time.sleep(0.05)
+    """
+}
+
+
+@pytest.fixture
+def script(tmp_path):
+    def write(kind):
+        path = tmp_path / f'{kind}_collector.py'
+        path.write_text(textwrap.dedent(SCRIPTS[kind].format(env=HEARTBEAT_ENV)))
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def supervisors():
+    created = []
+    yield created
+    for supervisor in created:
+        supervisor.shutdown()
+        with supervisor.lock:
+            supervisor._stop_all()
+
+
+def make_supervisor(supervisors, tmp_path, path, elect=True, **kwargs):
+    kwargs.setdefault('policy', RestartPolicy(initial_delay=0.05, multiplier=2.0, max_restarts=3))
+    kwargs.setdefault('poll_interval', 0.05)
+    supervisor = CollectorSupervisor(scripts={'job': path}, state_dir=str(tmp_path / 'state'), **kwargs)
+    supervisors.append(supervisor)
+    if elect:
+        assert supervisor.elector.try_elect()
+    return supervisor
+
+
+def tick_until(supervisor, condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        supervisor._tick()
+        if condition(supervisor.collectors['job']):
+            return supervisor.collectors['job']
+        time.sleep(0.02)
+    raise AssertionError(f"condition not met, collector is {supervisor.collectors['job'].status(time.time(), 60)}")
+
+
+def test_crashing_collector_backs_off_then_fails(supervisors, tmp_path, script):
+    supervisor = make_supervisor(supervisors, tmp_path, script('crash'))
+    assert supervisor.control('job', 'start')['status'] == 'started'
+    
+    collector = tick_until(supervisor, lambda collector: collector.state == 'failed')
+    assert collector.restarts == 3
+    assert collector.last_exit['code'] == 1
+    assert [supervisor.collectors['job'].policy.delay(i) for i in range(3)] == [0.05, 0.1, 0.2]
+
+
+def test_stale_heartbeat_is_killed_and_restarted(supervisors, tmp_path, script):
+    supervisor = make_supervisor(supervisors, tmp_path, script('silent'), heartbeat_timeout=0.3)
+    first_pid = supervisor.control('job', 'start')['pid']
+    
+    collector = tick_until(supervisor, lambda collector: collector.restarts == 1 and collector.state == 'running')
+    assert collector.pid != first_pid
+    assert not _pid_alive(first_pid)
+
+
+def test_start_while_stopping_waits_for_the_old_process(supervisors, tmp_path, script):
+    supervisor = make_supervisor(supervisors, tmp_path, script('slow_stop'))
+    first_pid = supervisor.control('job', 'start')['pid']
+    time.sleep(0.2)
+    
+    assert supervisor.control('job', 'stop')['status'] == 'stopping'
+    assert supervisor.control('job', 'start') == {'status': 'restarting', 'pid': first_pid}
+    
+    collector = tick_until(supervisor, lambda collector: collector.state == 'running' and collector.pid != first_pid)
+    assert not _pid_alive(first_pid)
+    assert collector.desired == 'running'
+
+
+def test_restart_does_not_block_on_the_stop(supervisors, tmp_path, script):
+    supervisor = make_supervisor(supervisors, tmp_path, script('slow_stop'))
+    first_pid = supervisor.control('job', 'start')['pid']
+    time.sleep(0.2)
+    
+    started = time.time()
+    assert supervisor.control('job', 'restart')['status'] == 'restarting'
+    assert time.time() - started < 0.2
+    
+    tick_until(supervisor, lambda collector: collector.state == 'running' and collector.pid != first_pid)
+
+
+def test_non_leader_forwards_commands_to_the_leader(supervisors, tmp_path, script):
+    leader = make_supervisor(supervisors, tmp_path, script('silent'), elect=False)
+    leader.start()
+    assert leader.is_leader
+    follower = make_supervisor(supervisors, tmp_path, script('silent'), elect=False)
+    assert not follower.elector.try_elect()
+    
+    result = follower.control('job', 'start', timeout=5)
+    assert result['status'] == 'started'
+    assert leader.collectors['job'].pid == result['pid']
+    assert follower.collectors['job'].process is None
+    
+    deadline = time.time() + 5
+    while follower.get_status()['collectors'].get('job', {}).get('state') != 'running':
+        assert time.time() < deadline
+        time.sleep(0.05)
+
+
+def write_status(tmp_path, pid):
+    state_dir = tmp_path / 'state'
+    state_dir.mkdir(exist_ok=True)
+    (state_dir / 'status.json').write_text(json.dumps({
+        'collectors': {'job': {'pid': pid, 'state': 'running', 'desired': 'running'}}
+    }))
+
+
+def test_takeover_waits_for_the_orphan_to_exit(supervisors, tmp_path, script):
+    path = script('slow_stop')
+    orphan = subprocess.Popen([sys.executable, path])
+    reaper = threading.Thread(target=orphan.wait, daemon=True)
+    reaper.start()
+    time.sleep(0.3)
+    write_status(tmp_path, orphan.pid)
+    
+    supervisor = make_supervisor(supervisors, tmp_path, path)
+    collector = supervisor.collectors['job']
+    assert collector.orphan_pid == orphan.pid
+    
+    supervisor._tick()
+    assert collector.process is None
+    assert supervisor.control('job', 'start')['status'] == 'waiting_for_orphan'
+    
+    collector = tick_until(supervisor, lambda collector: collector.state == 'running')
+    assert orphan.poll() is not None
+    assert collector.orphan_pid is None
+
+
+def test_takeover_leaves_unrelated_processes_alone(supervisors, tmp_path, script):
+    write_status(tmp_path, os.getpid())
+    
+    supervisor = make_supervisor(supervisors, tmp_path, script('silent'))
+    assert supervisor.collectors['job'].orphan_pid is None
+    assert supervisor._signal_orphan(os.getpid(), supervisor.collectors['job'], signal.SIGKILL) is False
@@ -0,0 +1,56 @@
+from dashboardCache import DashboardCache
+
+
+def payload(score, updated='12:00:00'):
+    return {'score': score, 'text': 'GO OUTSIDE', 'last_updated': updated}
+
+
+def test_update_ignores_volatile_keys():
+    cache = DashboardCache()
+    assert cache.update(payload(70))
+    etag = cache.etag
+    assert not cache.update(payload(70, updated='12:05:00'))
+    assert cache.etag == etag
+    assert cache.update(payload(71))
+    assert cache.etag != etag
+
+
+def test_remote_write_is_retried_until_marked():
+    cache = DashboardCache()
+    cache.update(payload(70))
+    assert cache.needs_remote_write(payload(70))
+    
+    cache.update(payload(70, updated='12:05:00'))
+    assert cache.needs_remote_write(payload(70, updated='12:05:00'))
+    
+    cache.mark_remote_written(payload(70))
+    assert not cache.needs_remote_write(payload(70, updated='12:10:00'))
+    assert cache.needs_remote_write(payload(71))
+
+
+def test_wait_for_score_change_returns_new_score():
+    cache = DashboardCache()
+    cache.update(payload(70))
+    _, _, version = cache.get()
+    
+    _, _, same = cache.wait_for_score_change(version, timeout=0.05)
+    assert same == version
+    
+    cache.update(payload(40))
+    latest, _, changed = cache.wait_for_score_change(version, timeout=1)
+    assert changed != version and latest['score'] == 40
+
+
+def test_follower_sees_score_change_after_leader_handover(tmp_path):
+    shared = str(tmp_path / 'dashboard.json')
+    old_leader = DashboardCache(shared_path=shared, poll_interval=0.01)
+    follower = DashboardCache(shared_path=shared, poll_interval=0.01)
+    
+    old_leader.update(payload(70))
+    _, _, version = follower.get()
+    
+    new_leader = DashboardCache(shared_path=shared, poll_interval=0.01)
+    new_leader.update(payload(30))
+    
+    latest, _, changed = follower.wait_for_score_change(version, timeout=1)
+    assert changed != version and latest['score'] == 30
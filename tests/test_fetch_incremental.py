@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+import dataFusionAnalyzer
+from benchmarks.syntheticData import motion_point
+from firebaseAccess import SOURCE_PATHS, partition_key
+
+
+def test_late_point_inside_tolerance_is_fetched(make_analyzer, push_point, now):
+    analyzer = make_analyzer()
+    before = len(analyzer.fetch_incremental(hours_back=8)['motion'])
+    
+    push_point('motion', motion_point((now - timedelta(minutes=5)).timestamp(), 'webcam_002'))
+    
+    assert len(analyzer.fetch_incremental(hours_back=8)['motion']) == before + 1
+    assert len(analyzer.new_points['motion']) == 1
+    assert len(analyzer.fetch_incremental(hours_back=8)['motion']) == before + 1
+
+
+def test_failed_partition_is_fetched_again(make_analyzer, push_point, now, monkeypatch):
+    yesterday_point = motion_point((now - timedelta(hours=20)).timestamp())
+    push_point('motion', yesterday_point)
+    analyzer = make_analyzer()
+    expected = len(make_analyzer().fetch_incremental(hours_back=24)['motion'])
+    
+    query_partition = dataFusionAnalyzer.query_partition
+    yesterday = partition_key(yesterday_point['unix_time'])
+    
+    def flaky(ref, date_key, *args):
+        if ref.path == '/' + SOURCE_PATHS['motion'] and date_key == yesterday:
+            raise TimeoutError('read timed out')
+        return query_partition(ref, date_key, *args)
+    
+    monkeypatch.setattr(dataFusionAnalyzer, 'query_partition', flaky)
+    first = analyzer.fetch_incremental(hours_back=24)
+    monkeypatch.setattr(dataFusionAnalyzer, 'query_partition', query_partition)
+    
+    assert len(first['motion']) == expected - 1
+    assert ('motion', yesterday) not in analyzer.watermarks
+    assert len(analyzer.fetch_incremental(hours_back=24)['motion']) == expected
@@ -0,0 +1,65 @@
+import pytest
+
+import firebaseAccess
+from firebaseAccess import is_missing_index, query_partition
+
+
+class StubQuery:
+    
+    def __init__(self, error):
+        self.error = error
+    
+    def start_at(self, value):
+        return self
+    
+    def end_at(self, value):
+        return self
+    
+    def get(self):
+        raise self.error
+
+
+class StubRef:
+    
+    def __init__(self, path, points, error):
+        self.path = path
+        self.points = points
+        self.error = error
+    
+    def child(self, key):
+        return self
+    
+    def order_by_child(self, field):
+        return StubQuery(self.error)
+    
+    def get(self):
+        return self.points
+
+
+@pytest.fixture(autouse=True)
+def clear_unindexed():
+    firebaseAccess.unindexed_paths.clear()
+    yield
+    firebaseAccess.unindexed_paths.clear()
+
+
+def test_is_missing_index_matches_only_the_firebase_message():
+    assert is_missing_index(Exception('Index not defined, add ".indexOn": "unix_time", for path "/sensor_data/2026-07-01", to the rules'))
+    assert not is_missing_index(Exception('list index out of range'))
+    assert not is_missing_index(Exception('Invalid index value'))
+
+
+def test_missing_index_falls_back_to_whole_partition():
+    points = {'a': {'unix_time': 100}, 'b': {'unix_time': 200}}
+    ref = StubRef('sensor_data', points, Exception('Index not defined, add ".indexOn"'))
+    
+    assert query_partition(ref, '2026-07-01', 150) == {'b': {'unix_time': 200}}
+    assert 'sensor_data' in firebaseAccess.unindexed_paths
+
+
+def test_other_query_errors_are_raised():
+    ref = StubRef('sensor_data', {}, IndexError('list index out of range'))
+    
+    with pytest.raises(IndexError):
+        query_partition(ref, '2026-07-01', 150)
+    assert not firebaseAccess.unindexed_paths
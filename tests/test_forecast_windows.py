@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from predictiveForecaster import OutdoorForecastPredictor
+
+
+@pytest.fixture
+def predictor():
+    predictor = OutdoorForecastPredictor(None, http_client=object())
+    yield predictor
+    predictor.analyzer.fetch_pool.shutdown(wait=False)
+
+
+@pytest.fixture
+def predictions():
+    timestamps = pd.date_range('2026-07-01 06:00', periods=8, freq='3h')
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'hour_label': timestamps.strftime('%H:%M'),
+        'weather': ['Clear'] * 8,
+        'outdoor_score': [80, 88, 50, 75, 85, 95, 60, 72]
+    })
+
+
+def test_windows_are_runs_above_threshold(predictor, predictions):
+    windows = predictor.identify_optimal_windows(predictions, min_score=70, min_duration_hours=6)
+    
+    assert [window['scores'] for window in windows] == [[75, 85, 95], [80, 88]]
+    assert [window['duration_hours'] for window in windows] == [9, 6]
+    assert windows[0]['max_score'] == 95
+    assert windows[0]['end_time'] == pd.Timestamp('2026-07-01 21:00')
+    assert 'is_good' not in predictions.columns
+
+
+def test_window_running_to_the_last_slot(predictor, predictions):
+    windows = predictor.identify_optimal_windows(predictions, min_score=60, min_duration_hours=3)
+    
+    assert [window['scores'] for window in windows] == [[80, 88], [75, 85, 95, 60, 72]]
+    assert windows[1]['avg_score'] == pytest.approx(77.4)
+    assert windows[1]['duration_hours'] == 15
+    assert windows[1]['end_time'] == pd.Timestamp('2026-07-02 03:00')
+
+
+def test_threshold_sweep_matches_single_thresholds(predictor, predictions):
+    sweep = predictor.identify_windows_by_threshold(predictions, [50, 70, 90], min_duration_hours=3)
+    
+    for threshold, windows in sweep.items():
+        assert windows == predictor.identify_optimal_windows(predictions, threshold, 3)
+    assert [window['scores'] for window in sweep[90.0]] == [[95]]
+
+
+def test_duration_uses_forecast_spacing(predictor, predictions):
+    hourly = predictions.assign(timestamp=pd.date_range('2026-07-01 06:00', periods=8, freq='1h'))
+    
+    windows = predictor.identify_optimal_windows(hourly, min_score=70, min_duration_hours=2)
+    
+    assert [window['duration_hours'] for window in windows] == [3, 2]
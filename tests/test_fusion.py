@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataFusionAnalyzer import DataFusionAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = DataFusionAnalyzer(None)
+    yield analyzer
+    analyzer.fetch_pool.shutdown(wait=False)
+
+
+def test_fill_gaps_respects_tolerance_across_missing_bins(analyzer):
+    hours = pd.to_datetime(['2026-07-01 08:00', '2026-07-01 09:00', '2026-07-01 13:00', '2026-07-01 14:00'])
+    merged = pd.DataFrame({
+        'hour': hours,
+        'temperature': [15.0, np.nan, np.nan, np.nan],
+        'total_bikes_available': [10.0, np.nan, np.nan, 4.0]
+    })
+    
+    filled = analyzer.fill_gaps(merged)
+    
+    assert filled['temperature'].tolist()[:2] == [15.0, 15.0]
+    assert filled['temperature'].iloc[2:].isna().all()
+    assert filled['total_bikes_available'].tolist()[:2] == [10.0, 10.0]
+    assert np.isnan(filled['total_bikes_available'].iloc[2])
+    assert filled['total_bikes_available'].iloc[3] == 4.0
+
+
+def reading(moment, **values):
+    return dict(values, timestamp=moment.isoformat(), unix_time=int(moment.timestamp()))
+
+
+def test_fuse_asof_uses_the_latest_reading_within_tolerance(analyzer):
+    start = pd.Timestamp('2026-07-01 08:00')
+    raw_data = {
+        'motion': [reading(start + pd.Timedelta(minutes=10 * i), motion_detected=1, motion_intensity=1.0,
+                           motion_area=100, brightness=90.0, device_id='webcam_001') for i in range(36)],
+        'weather': [reading(start + pd.Timedelta(minutes=5), temperature=11.0, humidity=80, wind_speed=3.0,
+                            weather='Rain', weather_description='rain'),
+                    reading(start + pd.Timedelta(minutes=65), temperature=13.0, humidity=70, wind_speed=2.0,
+                            weather='Clouds', weather_description='clouds')],
+        'air_quality': [],
+        'bikes': [reading(start + pd.Timedelta(minutes=30), total_bikes_available=7, average_occupancy=0.5)]
+    }
+    
+    fused = analyzer.fuse_asof(raw_data).set_index('hour')
+    
+    assert fused.loc[start, 'temperature'] == 11.0
+    assert fused.loc[start + pd.Timedelta(hours=1), 'temperature'] == 13.0
+    assert fused.loc[start + pd.Timedelta(hours=3), 'temperature'] == 13.0
+    assert np.isnan(fused.loc[start + pd.Timedelta(hours=4), 'temperature'])
+    assert fused.loc[start, 'total_bikes_available'] == 7
+    assert np.isnan(fused.loc[start + pd.Timedelta(hours=1), 'total_bikes_available'])
+    assert fused['aqi'].isna().all()
@@ -0,0 +1,45 @@
+import time
+from datetime import datetime
+
+from fusionScheduler import FusionScheduler
+from firebaseAccess import partition_key
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.02)
+
+
+def test_failed_recompute_keeps_dirty_hours():
+    calls = []
+    
+    def recompute(dirty_hours):
+        calls.append(set(dirty_hours))
+        if len(calls) == 1:
+            raise RuntimeError('firebase unavailable')
+    
+    scheduler = FusionScheduler(recompute, debounce=0.05, max_delay=0.2, max_staleness=3600)
+    scheduler.last_run = time.time()
+    scheduler.start()
+    try:
+        unix_time = datetime(2026, 7, 1, 10, 15).timestamp()
+        scheduler.notify('motion', unix_time)
+        wait_for(lambda: len(calls) >= 2)
+    finally:
+        scheduler.stop()
+    
+    hour = datetime(2026, 7, 1, 10)
+    assert calls[:2] == [{hour}, {hour}]
+    assert scheduler.get_stats()['last_error'] is None
+
+
+def test_listens_to_yesterday_and_today(database):
+    scheduler = FusionScheduler(lambda dirty_hours: None, sources={'motion': database.reference('sensor_data')})
+    scheduler._ensure_listeners()
+    
+    now = time.time()
+    expected = sorted(f"motion/{partition_key(moment)}" for moment in (now - 86400, now))
+    assert scheduler.get_stats()['listening'] == expected
+    scheduler._close_listeners()
@@ -0,0 +1,63 @@
+import os
+import shutil
+from datetime import datetime, timezone
+
+from benchmarks.syntheticData import motion_point
+from firebaseAccess import partition_key
+from historyStore import HistoryStore, _write_marker
+
+
+def _points(start, count, step=600):
+    return [motion_point(start + i * step) for i in range(count)]
+
+
+def test_partitions_follow_utc_dates(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    midnight = int(datetime(2026, 7, 1, tzinfo=timezone.utc).timestamp())
+    
+    store.append('motion', _points(midnight - 1200, 4))
+    
+    assert sorted(os.listdir(tmp_path / 'motion')) == [
+        f'date={partition_key(midnight - 1)}', f'date={partition_key(midnight)}'
+    ]
+    assert len(store.read('motion', midnight, midnight + 3600)) == 2
+
+
+def test_compact_merges_partition(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    start = int(datetime(2026, 7, 1, 6, tzinfo=timezone.utc).timestamp())
+    for i in range(3):
+        store.append('motion', _points(start + i * 3600, 2))
+    
+    assert store.compact('motion', partition_key(start)) == 1
+    
+    partition_dir = tmp_path / 'motion' / f'date={partition_key(start)}'
+    assert [name for name in os.listdir(partition_dir) if name.endswith('.parquet')] == [
+        name for name in os.listdir(partition_dir) if name.startswith('part-compacted-')
+    ]
+    assert store.read('motion', start, start + 86400)['unix_time'].tolist() == [
+        start, start + 600, start + 3600, start + 4200, start + 7200, start + 7800
+    ]
+
+
+def test_interrupted_compaction_never_duplicates_rows(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    start = int(datetime(2026, 7, 1, 6, tzinfo=timezone.utc).timestamp())
+    store.append('motion', _points(start, 2))
+    store.append('motion', _points(start + 3600, 2))
+    
+    partition_dir = str(tmp_path / 'motion' / f'date={partition_key(start)}')
+    inputs = sorted(os.listdir(partition_dir))
+    merged = os.path.join(partition_dir, 'part-compacted-test.parquet')
+    
+    # Output written but not yet renamed into place: readers use the inputs
+    shutil.copy(os.path.join(partition_dir, inputs[0]), merged + '.tmp')
+    _write_marker(partition_dir, {'output': 'part-compacted-test.parquet', 'inputs': inputs})
+    assert len(store.read('motion', start, start + 86400)) == 4
+    
+    # Output in place but inputs not yet removed: readers use only the output
+    os.replace(merged + '.tmp', merged)
+    assert len(store.read('motion', start, start + 86400)) == 2
+    
+    store.compact('motion', partition_key(start))
+    assert sorted(os.listdir(partition_dir)) == ['part-compacted-test.parquet']
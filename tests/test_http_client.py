@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from httpClient import CachedHttpClient
+
+
+class StubResponse:
+    
+    def __init__(self, data):
+        self.data = data
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.data
+
+
+class StubSession:
+    
+    def __init__(self, gate=None):
+        self.calls = 0
+        self.gate = gate
+        self.fail = False
+    
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise ConnectionError('offline')
+        return StubResponse({'call': self.calls})
+    
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_client(tmp_path):
+    clients = []
+    
+    def make(session=None, **kwargs):
+        kwargs.setdefault('cache_path', str(tmp_path / 'http_cache.json'))
+        client = CachedHttpClient(**kwargs)
+        client.session = session or StubSession()
+        clients.append(client)
+        return client
+    
+    yield make
+    for client in clients:
+        client.close()
+
+
+def _get(client, lat=53.3498):
+    return client.get_json('https://example.invalid/weather', {'lat': lat}, 'weather', lat=lat, lon=-6.2603)
+
+
+def test_fresh_entries_are_served_from_cache(make_client):
+    client = make_client()
+    
+    assert _get(client) == {'call': 1}
+    assert _get(client, lat=53.34981) == {'call': 1}
+    assert client.session.calls == 1
+    assert client.get_stats()['hits'] == 1
+
+
+def test_stale_entry_is_returned_and_refreshed_in_background(make_client):
+    client = make_client(ttl=60)
+    _get(client)
+    client.cache[client.cache_key('weather', 53.3498, -6.2603)]['fetched'] -= 120
+    
+    assert _get(client) == {'call': 1}
+    client.refresh_pool.shutdown(wait=True)
+    
+    assert client.session.calls == 2
+    assert _get(client) == {'call': 2}
+    assert client.get_stats()['stale_hits'] == 1
+
+
+def test_concurrent_misses_share_one_request(make_client):
+    gate = threading.Event()
+    client = make_client(session=StubSession(gate))
+    results = []
+    
+    threads = [threading.Thread(target=lambda: results.append(_get(client))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while client.get_stats()['coalesced'] < 3:
+        time.sleep(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    
+    assert results == [{'call': 1}] * 4
+    assert client.session.calls == 1
+
+
+def test_cache_persists_across_clients(make_client):
+    _get(make_client())
+    
+    reloaded = make_client()
+    assert _get(reloaded) == {'call': 1}
+    assert reloaded.session.calls == 0
+
+
+def test_failed_fetch_is_not_cached(make_client):
+    client = make_client()
+    client.session.fail = True
+    
+    with pytest.raises(ConnectionError):
+        _get(client)
+    
+    client.session.fail = False
+    assert _get(client) == {'call': 2}
+    assert client.get_stats()['errors'] == 1
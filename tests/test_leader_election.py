@@ -0,0 +1,82 @@
+import os
+import time
+import threading
+
+from leaderElection import FileLock, LeaderElector, CommandSpool
+
+
+def test_only_one_lock_holder(tmp_path):
+    path = str(tmp_path / 'job.lock')
+    first, second = FileLock(path), FileLock(path)
+    
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    assert first.holder()['pid'] == os.getpid()
+    
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def test_leadership_moves_when_the_leader_stops(tmp_path):
+    events = []
+    first = LeaderElector('job', lambda: events.append('first up'), lambda: events.append('first down'),
+                          lock_dir=str(tmp_path))
+    second = LeaderElector('job', lambda: events.append('second up'), lock_dir=str(tmp_path))
+    
+    assert first.try_elect()
+    assert not second.try_elect()
+    
+    first.stop()
+    assert second.try_elect()
+    assert events == ['first up', 'first down', 'second up']
+    second.stop()
+
+
+def test_failed_start_up_releases_the_lock(tmp_path):
+    def broken():
+        raise RuntimeError('no camera')
+    
+    elector = LeaderElector('job', broken, lock_dir=str(tmp_path))
+    assert not elector.try_elect()
+    assert not elector.is_leader
+    assert FileLock(str(tmp_path / 'job.lock')).try_acquire()
+
+
+def serve(spool, stop, handled):
+    def handle(command):
+        handled.append(command)
+        if command['action'] == 'explode':
+            raise ValueError('bad command')
+        return {'status': 'ok', 'echo': command['action']}
+    
+    while not stop.is_set():
+        spool.drain(handle)
+        time.sleep(0.02)
+
+
+def test_spool_round_trip_and_errors(tmp_path):
+    spool = CommandSpool(str(tmp_path / 'commands'))
+    stop, handled = threading.Event(), []
+    server = threading.Thread(target=serve, args=(spool, stop, handled), daemon=True)
+    server.start()
+    try:
+        assert spool.submit({'action': 'ping'}, timeout=2) == {'status': 'ok', 'echo': 'ping'}
+        assert spool.submit({'action': 'explode'}, timeout=2) == {'status': 'error', 'message': 'bad command'}
+    finally:
+        stop.set()
+        server.join()
+    
+    assert handled[0]['pid'] == os.getpid()
+    assert os.listdir(tmp_path / 'commands') == []
+
+
+def test_spool_drops_expired_commands(tmp_path):
+    spool = CommandSpool(str(tmp_path / 'commands'), ttl=0)
+    assert spool.submit({'action': 'ping'}, timeout=0.05) is None
+    
+    time.sleep(0.01)
+    handled = []
+    spool.drain(handled.append)
+    assert handled == []
+    assert os.listdir(tmp_path / 'commands') == []
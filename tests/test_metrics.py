@@ -0,0 +1,54 @@
+import json
+import os
+
+from metrics import Registry, MultiprocessExporter, collect, mark_process_dead
+
+
+DEAD_PID = 999999
+
+
+def dump(directory, pid, registry, updated=1.0):
+    with open(os.path.join(directory, f'{pid}.json'), 'w') as f:
+        json.dump({'pid': pid, 'updated': updated, 'metrics': registry.snapshot()}, f)
+
+
+def worker_registry(requests, depth):
+    registry = Registry()
+    registry.counter('requests_total', 'Requests', ('route',)).inc(requests, route='/')
+    registry.gauge('queue_depth', 'Queue depth').set(depth)
+    registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0)).observe(0.05)
+    return registry
+
+
+def test_collect_sums_counters_and_skips_dead_gauges(tmp_path):
+    exporter = MultiprocessExporter(worker_registry(3, 7), str(tmp_path))
+    exporter.dump()
+    dump(str(tmp_path), DEAD_PID, worker_registry(2, 99))
+    
+    merged = collect(str(tmp_path))
+    assert merged.metrics['requests_total'].get(route='/') == 5
+    assert merged.metrics['latency_seconds'].summary()['count'] == 2
+    assert merged.metrics['queue_depth'].values[()] == 7
+
+
+def test_dead_worker_counters_survive_folding(tmp_path):
+    dump(str(tmp_path), DEAD_PID, worker_registry(2, 99))
+    MultiprocessExporter(worker_registry(3, 7), str(tmp_path)).dump()
+    
+    mark_process_dead(str(tmp_path), DEAD_PID)
+    
+    assert not os.path.exists(tmp_path / f'{DEAD_PID}.json')
+    assert collect(str(tmp_path)).metrics['requests_total'].get(route='/') == 5
+
+
+def test_exporter_start_discards_dumps_from_a_previous_run(tmp_path):
+    dump(str(tmp_path), DEAD_PID, worker_registry(2, 99))
+    mark_process_dead(str(tmp_path), DEAD_PID)
+    dump(str(tmp_path), DEAD_PID, worker_registry(4, 99))
+    
+    exporter = MultiprocessExporter(worker_registry(3, 7), str(tmp_path), interval=60)
+    exporter.start()
+    try:
+        assert 'requests_total 3' in exporter.render().replace('{route="/"}', '')
+    finally:
+        exporter.stop()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from motionDetectors import DETECTORS, MotionDetector, create_detector
+
+
+def frames(count=30, motion_from=10):
+    rng = np.random.default_rng(0)
+    sequence = []
+    for i in range(count):
+        frame = (rng.random((240, 320)) * 10).astype(np.uint8)
+        if i >= motion_from:
+            left = 40 + 4 * (i - motion_from)
+            frame[60:140, left:left + 80] = 255
+        sequence.append(frame)
+    return sequence
+
+
+def test_base_detector_is_abstract():
+    with pytest.raises(TypeError):
+        MotionDetector()
+
+
+@pytest.mark.parametrize('name', sorted(DETECTORS))
+def test_motion_area_is_the_same_with_and_without_boxes(name):
+    detector = create_detector(name)
+    sequence = frames()
+    detector.detect(sequence[0])
+    for frame in sequence[1:]:
+        detected, area, boxes = detector.detect(frame, want_boxes=True)
+        assert detector._contours(detector.mask, False)[:2] == (detected, area)
+        assert bool(boxes) == bool(detected)
+
+
+@pytest.mark.parametrize('name', sorted(DETECTORS))
+def test_every_engine_sees_a_moving_block(name):
+    detector = create_detector(name)
+    results = [detector.detect(frame, want_boxes=False) for frame in frames()]
+    assert not any(detected for detected, _, _ in results[3:10])
+    assert any(detected for detected, _, _ in results[10:])
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.syntheticData import motion_point
+from recordSchema import MotionRecord, local_times, to_array, to_columns, to_frame
+
+
+START = 1782900000
+
+
+def test_columns_use_the_record_dtypes():
+    columns = to_columns('motion', [motion_point(START + i * 60) for i in range(3)])
+    
+    assert columns['unix_time'].dtype == np.int64
+    assert columns['motion_detected'].dtype == np.int8
+    assert columns['motion_intensity'].dtype == np.float32
+    assert columns['device_id'].dtype == object
+    assert columns['unix_time'].tolist() == [START, START + 60, START + 120]
+
+
+def test_missing_integers_stay_nullable():
+    points = [motion_point(START), dict(motion_point(START + 60), motion_area=None)]
+    
+    area = to_columns('motion', points)['motion_area']
+    
+    assert area.dtype == np.float64
+    assert area[0] == 100 and np.isnan(area[1])
+
+
+def test_unix_time_falls_back_to_timestamp():
+    point = motion_point(START)
+    legacy = {key: value for key, value in point.items() if key != 'unix_time'}
+    legacy['timestamp'] = datetime.fromtimestamp(START + 60).isoformat()
+    
+    columns = to_columns('motion', [point, legacy])
+    
+    assert columns['unix_time'].dtype == np.int64
+    assert columns['unix_time'].tolist() == [START, START + 60]
+
+
+def test_frame_times_are_local_and_strings_categorical():
+    records = [motion_point(START + i * 3600, f'webcam_00{i % 2}') for i in range(4)]
+    
+    frame = to_frame('motion', records)
+    
+    assert frame['timestamp'].tolist() == [pd.Timestamp(datetime.fromtimestamp(START + i * 3600)) for i in range(4)]
+    assert isinstance(frame['device_id'].dtype, pd.CategoricalDtype)
+    assert to_frame('motion', []).empty
+
+
+def test_local_times_matches_fromtimestamp():
+    unix_times = [START + i * 1800 for i in range(-100, 100)]
+    
+    expected = [np.datetime64(datetime.fromtimestamp(unix_time), 'ns') for unix_time in unix_times]
+    assert local_times(unix_times).tolist() == pd.to_datetime(expected).to_numpy().tolist()
+
+
+def test_records_round_trip_through_dicts_and_arrays():
+    record = MotionRecord.from_dict(motion_point(START))
+    
+    assert MotionRecord.from_dict(record.to_dict()).to_dict() == record.to_dict()
+    assert to_array('motion', [record])['motion_area'].tolist() == [100]
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from benchmarks.syntheticData import motion_point
+
+
+def motion_events(scored, hour):
+    return scored.loc[scored['hour'] == hour, 'motion_events'].iloc[0]
+
+
+def test_refresh_hours_recounts_dirty_hour(make_analyzer, push_point, now):
+    analyzer = make_analyzer()
+    hour = (now - timedelta(hours=5)).replace(minute=0)
+    scored, _, _ = analyzer.refresh_hours(hours_back=8)
+    before = motion_events(scored, hour)
+    
+    push_point('motion', motion_point((hour + timedelta(minutes=20)).timestamp()))
+    
+    scored, _, _ = analyzer.refresh_hours({hour}, hours_back=8)
+    assert motion_events(scored, hour) == before + 1
+    
+    scored, _, _ = analyzer.refresh_hours({hour}, hours_back=8)
+    assert motion_events(scored, hour) == before + 1
+
+
+def test_late_point_reaching_closed_hour_is_counted(make_analyzer, push_point, now):
+    analyzer = make_analyzer()
+    hour = (now - timedelta(hours=3)).replace(minute=0)
+    scored, _, _ = analyzer.refresh_hours(hours_back=8)
+    before = motion_events(scored, hour)
+    
+    point = motion_point((hour + timedelta(minutes=59)).timestamp())
+    for partition in analyzer.watermarks:
+        if partition[0] == 'motion':
+            analyzer.watermarks[partition] = point['unix_time'] + analyzer.late_tolerance - 1
+    push_point('motion', point)
+    
+    scored, _, _ = analyzer.refresh_hours(hours_back=8)
+    assert motion_events(scored, hour) == before + 1
+    assert analyzer.aggregator.get_stats()['pending_late'] == 0
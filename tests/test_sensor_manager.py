@@ -0,0 +1,31 @@
+import pytest
+
+from sensorManager import SensorManager, resolve_source
+
+
+NAMED = {'lobby': 'rtsp://10.0.0.5/stream'}
+
+
+@pytest.mark.parametrize('source, expected', [(0, 0), ('2', 2), ('lobby', 'rtsp://10.0.0.5/stream')])
+def test_resolve_source_accepts_indexes_and_named_sources(source, expected):
+    assert resolve_source(source, NAMED) == expected
+
+
+@pytest.mark.parametrize('source', ['/etc/passwd', 'http://169.254.169.254/', 'rtsp://evil/stream', -1, 99, True, None])
+def test_resolve_source_rejects_anything_else(source):
+    with pytest.raises(ValueError):
+        resolve_source(source, NAMED)
+
+
+@pytest.fixture
+def manager(database):
+    manager = SensorManager(camera_config={'sources': NAMED, 'max_devices': 0})
+    yield manager
+    manager.stop_all()
+
+
+def test_start_device_rejects_bad_requests_without_spawning(manager):
+    assert manager.start_device('cam1', '/etc/passwd')['status'] == 'rejected'
+    assert manager.start_device('../cam', 0)['status'] == 'rejected'
+    assert manager.start_device('cam1', 0)['status'] == 'rejected'
+    assert manager.workers == {}
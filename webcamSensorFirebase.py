@@ -1,23 +1,50 @@
 import cv2
 import numpy as np
-import csv
 import os
+import argparse
 from datetime import datetime
 import time
 import firebase_admin
 from firebase_admin import credentials, db
+from batchUploader import BatchUploader
+from motionPipeline import MotionPipeline
+from recordBuffer import MotionRecordBuffer
+from motionDetectors import create_detector
+from firebaseAccess import partition_key
+from collectorSupervisor import heartbeat
+from metrics import MOTION_FRAMES_PROCESSED, MOTION_READ_FAILURES, MOTION_FRAME_SECONDS
 
 class MotionSensorFirebase:
     
-    def __init__(self, firebase_config_path='firebase_config.json'):
+    def __init__(self, firebase_config_path='firebase_config.json', headless=False, process_width=None,
+                 buffer_capacity=10000, rotate_interval=300, source=0, device_id='webcam_001', point_sink=None,
+                 detector=None):
         self.cap = None
-        self.previous_frame = None
-        self.data_points = []
+        self.detector = detector if detector is not None else create_detector('frame_diff')
+        self.source = source
+        self.device_id = device_id
+        self.point_sink = point_sink
+        self.read_failures = 0
+        self.headless = headless
+        self.process_width = process_width
+        self.scale = 1.0
+        self.blur_kernel = (21, 21)
+        self.buffers = None
+        self.data_points = MotionRecordBuffer(
+            capacity=buffer_capacity,
+            rotate_interval=rotate_interval,
+            device_id=device_id
+        )
         self.is_collecting = False
         self.frame_count = 0
+        self.target_points = 1200
+        self.upload_interval = 1
+        self.upload_counter = 0
         self.firebase_enabled = False
         self.db_ref = None
-        self.initialize_firebase(firebase_config_path)
+        self.uploader = None
+        if firebase_config_path is not None:
+            self.initialize_firebase(firebase_config_path)
     
     def initialize_firebase(self, config_path):
         try:
@@ -32,6 +59,8 @@ class MotionSensorFirebase:
             })
             
             self.db_ref = db.reference('sensor_data')
+            self.uploader = BatchUploader(self.db_ref)
+            self.uploader.start()
             self.firebase_enabled = True
             return True
             
@@ -41,55 +70,84 @@ class MotionSensorFirebase:
             return False
     
     def initialize_camera(self):
-        self.cap = cv2.VideoCapture(0)
+        self.cap = cv2.VideoCapture(self.source)
         
         if not self.cap.isOpened():
-            print("Error: Could not open webcam")
+            print(f"Error: Could not open camera source {self.source}")
             return False
         
-        time.sleep(2)
+        if isinstance(self.source, int):
+            time.sleep(2)
         
         ret, frame = self.cap.read()
         if ret:
-            self.previous_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            self.previous_frame = cv2.GaussianBlur(self.previous_frame, (21, 21), 0)
+            self.detector.prime(self._prepare_gray(frame))
             return True
         else:
             print("Error: Could not read from webcam")
             return False
     
-    def detect_motion(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            return None
+    def _allocate_buffers(self, frame):
+        height, width = frame.shape[:2]
+        
+        if self.process_width and self.process_width < width:
+            self.scale = self.process_width / width
+        else:
+            self.scale = 1.0
         
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        size = (max(1, int(round(width * self.scale))), max(1, int(round(height * self.scale))))
+        kernel = max(3, int(21 * self.scale) | 1)
         
-        frame_delta = cv2.absdiff(self.previous_frame, gray)
-        threshold = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
-        threshold = cv2.dilate(threshold, None, iterations=2)
+        self.blur_kernel = (kernel, kernel)
+        self.buffers = {
+            'source_shape': frame.shape,
+            'size': size,
+            'small': np.empty((size[1], size[0], 3), dtype=np.uint8) if self.scale < 1 else None,
+            'gray': np.empty((size[1], size[0]), dtype=np.uint8),
+            'blur': np.empty((size[1], size[0]), dtype=np.uint8)
+        }
         
-        contours, _ = cv2.findContours(
-            threshold.copy(), 
-            cv2.RETR_EXTERNAL, 
-            cv2.CHAIN_APPROX_SIMPLE
-        )
+        self.detector.configure((size[1], size[0]), self.scale)
+    
+    def _prepare_gray(self, frame):
+        if self.buffers is None or self.buffers['source_shape'] != frame.shape:
+            self._allocate_buffers(frame)
         
-        motion_detected = 0
-        total_motion_area = 0
+        buffers = self.buffers
         
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 500:
-                motion_detected = 1
-                total_motion_area += area
-                (x, y, w, h) = cv2.boundingRect(contour)
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        if buffers['small'] is not None:
+            frame = cv2.resize(frame, buffers['size'], dst=buffers['small'], interpolation=cv2.INTER_AREA)
+        
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=buffers['gray'])
+        cv2.GaussianBlur(buffers['gray'], self.blur_kernel, 0, dst=buffers['blur'])
+        
+        return buffers['blur']
+    
+    def process_frame(self, frame):
+        start = time.perf_counter()
+        gray = self._prepare_gray(frame)
+        
+        motion_detected, total_motion_area, boxes = self.detector.detect(gray, want_boxes=not self.headless)
+        
+        if self.scale < 1:
+            total_motion_area /= self.scale * self.scale
+            boxes = [
+                (int(x / self.scale), int(y / self.scale), int(w / self.scale), int(h / self.scale))
+                for (x, y, w, h) in boxes
+            ]
         
         frame_area = frame.shape[0] * frame.shape[1]
         motion_intensity = min(100, (total_motion_area / frame_area) * 1000)
-        brightness = np.mean(gray)
+        brightness = cv2.mean(gray)[0]
+        
+        MOTION_FRAME_SECONDS.observe(time.perf_counter() - start, device_id=self.device_id)
+        MOTION_FRAMES_PROCESSED.inc(device_id=self.device_id)
+        
+        return motion_detected, motion_intensity, total_motion_area, brightness, boxes
+    
+    def draw_overlay(self, frame, motion_detected, motion_intensity, boxes):
+        for (x, y, w, h) in boxes:
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
         
         status_color = (0, 255, 0) if self.firebase_enabled else (0, 165, 255)
         
@@ -97,16 +155,26 @@ class MotionSensorFirebase:
                     (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
         cv2.putText(frame, f"Intensity: {motion_intensity:.1f}", 
                     (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Points: {len(self.data_points)}", 
+        cv2.putText(frame, f"Points: {self.data_points.total_count}", 
                     (10, 110), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
         
         firebase_status = "Firebase: CONNECTED" if self.firebase_enabled else "Firebase: LOCAL ONLY"
         cv2.putText(frame, firebase_status, 
                     (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
+    
+    def detect_motion(self):
+        ret, frame = self.cap.read()
+        if not ret:
+            self.read_failures += 1
+            MOTION_READ_FAILURES.inc(device_id=self.device_id)
+            return None
         
-        cv2.imshow('Motion Sensor', frame)
+        self.read_failures = 0
+        motion_detected, motion_intensity, total_motion_area, brightness, boxes = self.process_frame(frame)
         
-        self.previous_frame = gray
+        if not self.headless:
+            self.draw_overlay(frame, motion_detected, motion_intensity, boxes)
+            cv2.imshow('Motion Sensor', frame)
         
         return motion_detected, motion_intensity, total_motion_area, brightness
     
@@ -115,7 +183,7 @@ class MotionSensorFirebase:
             return False
         
         try:
-            date_key = data_point['timestamp'][:10]
+            date_key = partition_key(data_point['unix_time'])
             self.db_ref.child(date_key).push(data_point)
             return True
             
@@ -123,38 +191,54 @@ class MotionSensorFirebase:
             print(f"Firebase upload failed: {e}")
             return False
     
+    def record_point(self, motion_detected, motion_intensity, motion_area, brightness):
+        now = datetime.now()
+        data_point = {
+            'timestamp': now.isoformat(),
+            'unix_time': int(now.timestamp()),
+            'motion_detected': motion_detected,
+            'motion_intensity': round(motion_intensity, 2),
+            'motion_area': int(motion_area),
+            'brightness': round(brightness, 2),
+            'sensor_type': 'webcam_motion',
+            'device_id': self.device_id
+        }
+        
+        self.data_points.append(data_point, now.timestamp())
+        self.upload_counter += 1
+        heartbeat()
+        
+        if self.upload_counter >= self.upload_interval:
+            if self.point_sink is not None:
+                self.point_sink(data_point)
+            elif self.firebase_enabled:
+                self.uploader.submit(data_point)
+            self.upload_counter = 0
+        
+        if self.target_points and self.data_points.total_count >= self.target_points:
+            print(f"Target reached: {self.data_points.total_count} points")
+            self.is_collecting = False
+        
+        return data_point
+    
     def collect_data(self, target_points=1200, upload_interval=1):
         self.is_collecting = True
-        upload_counter = 0
+        self.data_points.start_rotation()
+        self.target_points = target_points
+        self.upload_interval = upload_interval
+        self.upload_counter = 0
         
         while self.is_collecting:
             result = self.detect_motion()
             
             if result is not None:
-                motion_detected, motion_intensity, motion_area, brightness = result
-                
-                timestamp = datetime.now().isoformat()
-                data_point = {
-                    'timestamp': timestamp,
-                    'unix_time': int(datetime.now().timestamp()),
-                    'motion_detected': motion_detected,
-                    'motion_intensity': round(motion_intensity, 2),
-                    'motion_area': int(motion_area),
-                    'brightness': round(brightness, 2),
-                    'sensor_type': 'webcam_motion',
-                    'device_id': 'webcam_001'
-                }
-                
-                self.data_points.append(data_point)
-                upload_counter += 1
-                
-                if self.firebase_enabled and upload_counter >= upload_interval:
-                    self.upload_to_firebase(data_point)
-                    upload_counter = 0
-                
-                if len(self.data_points) >= target_points:
-                    print(f"Target reached: {len(self.data_points)} points")
-                    self.is_collecting = False
+                self.record_point(*result)
+            elif self.read_failures >= 30:
+                print(f"Camera source {self.source} stopped delivering frames")
+                self.is_collecting = False
+            
+            if self.headless:
+                continue
             
             key = cv2.waitKey(30) & 0xFF
             if key == ord('q') or key == ord('Q'):
@@ -162,38 +246,49 @@ class MotionSensorFirebase:
             elif key == ord('s') or key == ord('S'):
                 self.save_data()
     
+    def collect_data_pipelined(self, target_points=1200, upload_interval=1, display=True):
+        self.is_collecting = True
+        self.data_points.start_rotation()
+        self.target_points = target_points
+        self.upload_interval = upload_interval
+        self.upload_counter = 0
+        
+        pipeline = MotionPipeline(self, display=display and not self.headless)
+        pipeline.run()
+        
+        return pipeline.get_stats()
+    
     def save_data(self):
-        if not self.data_points:
+        if not self.data_points.total_count:
             print("No data to save")
             return
         
-        data_dir = 'data'
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = os.path.join(data_dir, f'motion_sensor_data_{timestamp}.csv')
-        
-        with open(filename, 'w', newline='') as csvfile:
-            fieldnames = [
-                'timestamp', 'unix_time', 'motion_detected', 
-                'motion_intensity', 'motion_area', 
-                'brightness', 'sensor_type', 'device_id'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.data_points)
+        filename = self.data_points.flush()
         
         print("Data saved")
         print(f"File: {filename}")
-        print(f"Points: {len(self.data_points)}")
+        print(f"Points: {self.data_points.total_count}")
         
         return filename
     
     def cleanup(self):
+        self.data_points.stop_rotation()
+        
+        if self.uploader is not None:
+            self.uploader.stop()
+            stats = self.uploader.get_stats()
+            print(f"Uploaded: {stats['uploaded']}, spilled: {stats['spilled']}, dropped: {stats['dropped']}")
+        
         if self.cap is not None:
             self.cap.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
+
+
+def parse_source(source):
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
 
 
 def main():
@@ -201,29 +296,51 @@ def main():
     TARGET_POINTS = 1200
     UPLOAD_INTERVAL = 5
     
-    collector = MotionSensorFirebase(FIREBASE_CONFIG)
+    parser = argparse.ArgumentParser(description='Webcam motion sensor')
+    parser.add_argument('--pipeline', action='store_true', help='run capture and processing as separate stages')
+    parser.add_argument('--no-display', action='store_true', help='disable the preview window (pipeline mode)')
+    parser.add_argument('--headless', action='store_true', help='no GUI, no overlays, no frame throttling')
+    parser.add_argument('--process-width', type=int, default=None, help='downscale frames to this width before detection')
+    parser.add_argument('--source', default='0', help='camera index, RTSP URL or video file')
+    parser.add_argument('--device-id', default='webcam_001')
+    parser.add_argument('--detector', default='frame_diff', help='frame_diff, running_average, mog2 or knn')
+    args = parser.parse_args()
+    
+    collector = MotionSensorFirebase(
+        FIREBASE_CONFIG,
+        headless=args.headless,
+        process_width=args.process_width,
+        source=parse_source(args.source),
+        device_id=args.device_id,
+        detector=create_detector(args.detector)
+    )
     
     if not collector.initialize_camera():
         print("Failed to initialize webcam")
         return
     
     try:
-        collector.collect_data(
-            target_points=TARGET_POINTS,
-            upload_interval=UPLOAD_INTERVAL
-        )
+        if args.pipeline:
+            stats = collector.collect_data_pipelined(
+                target_points=TARGET_POINTS,
+                upload_interval=UPLOAD_INTERVAL,
+                display=not args.no_display
+            )
+            print(f"Pipeline stats: {stats}")
+        else:
+            collector.collect_data(
+                target_points=TARGET_POINTS,
+                upload_interval=UPLOAD_INTERVAL
+            )
         
-        if collector.data_points:
-            print(f"Total data points collected: {len(collector.data_points)}")
-            
-            save_choice = input("Save final data to CSV? (Y/n): ").strip().lower()
-            if save_choice != 'n':
-                collector.save_data()
+        if collector.data_points.total_count:
+            print(f"Total data points collected: {collector.data_points.total_count}")
+            collector.save_data()
         else:
             print("No data collected")
     
     except KeyboardInterrupt:
-        if collector.data_points:
+        if collector.data_points.total_count:
             collector.save_data()
     
     except Exception as e:
@@ -0,0 +1,5 @@
+from app import app, start_background_services
+
+start_background_services()
+
+application = app